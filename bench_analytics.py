@@ -0,0 +1,141 @@
+import argparse
+import json
+import time
+from collections import Counter, defaultdict
+
+from country_analytics import CountryTable, load_countries, np
+
+
+def naive_sum_population(countries):
+    totals = defaultdict(float)
+    for country in countries:
+        if country.get("population") is not None:
+            totals[country.get("region") or ""] += country["population"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def naive_top_density(countries, n=10):
+    rows = []
+    for country in countries:
+        population, area = country.get("population"), country.get("area")
+        if population is not None and area and area > 0:
+            rows.append((country.get("name", {}).get("common", ""), country.get("cca3", ""), population / area))
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:n]
+
+
+def naive_currency_counts(countries):
+    counts = Counter()
+    for country in countries:
+        counts.update((country.get("currencies") or {}).keys())
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def naive_language_counts(countries, region="Europe"):
+    counts = Counter()
+    for country in countries:
+        if country.get("region") == region:
+            counts.update((country.get("languages") or {}).values())
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def naive_gini(countries, bin_width=5.0):
+    values = []
+    for country in countries:
+        gini = country.get("gini") or {}
+        if gini:
+            values.append(gini[max(gini)])
+    if not values:
+        return {"count": 0}
+    values.sort()
+    quartiles = []
+    for percent in (25, 50, 75):
+        position = (len(values) - 1) * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        quartiles.append(values[lower] + (values[upper] - values[lower]) * (position - lower))
+    histogram = Counter()
+    low = values[0] // bin_width * bin_width
+    for value in values:
+        histogram[low + (value - low) // bin_width * bin_width] += 1
+    return {"count": len(values), "min": values[0], "max": values[-1], "quartiles": quartiles,
+            "mean": sum(values) / len(values), "histogram": sorted(histogram.items())}
+
+
+NAIVE_QUERIES = {
+    "sum population by region": naive_sum_population,
+    "top 10 by density": naive_top_density,
+    "currency counts": naive_currency_counts,
+    "language counts (Europe)": naive_language_counts,
+    "gini distribution": naive_gini,
+}
+
+
+def columnar_queries(table):
+    """
+    Те же запросы, что и NAIVE_QUERIES, над CountryTable.
+    """
+    return {
+        "sum population by region": lambda: table.sum_by("population", "region"),
+        "top 10 by density": lambda: table.top("density", 10),
+        "currency counts": lambda: table.counts("currencies"),
+        "language counts (Europe)": lambda: table.counts("languages", table.mask(region="Europe")),
+        "gini distribution": lambda: table.describe("gini"),
+    }
+
+
+def measure(func, repeat):
+    """
+    Лучшее время одного вызова из repeat (миллисекунды).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(countries, repeat=20):
+    """
+    Замеряет запросы по списку словарей и по столбцам (array и, если есть, NumPy).
+    
+    Returns:
+        dict: {запрос: {"dicts": мс, "array": мс, "numpy": мс}} и время построения таблиц
+    """
+    results = {name: {"dicts": measure(lambda: query(countries), repeat)} for name, query in NAIVE_QUERIES.items()}
+    backends = [("array", False)] + ([("numpy", True)] if np is not None else [])
+    build = {}
+    for backend, use_numpy in backends:
+        started = time.perf_counter()
+        table = CountryTable.from_countries(countries, use_numpy=use_numpy)
+        build[backend] = (time.perf_counter() - started) * 1000
+        for name, query in columnar_queries(table).items():
+            results[name][backend] = measure(query, repeat)
+    return {"rows": len(countries), "build_ms": build, "queries": results}
+
+
+def main(argv=None):
+    """
+    Сравнение аналитических запросов: перебор словарей против столбцов.
+    """
+    parser = argparse.ArgumentParser(description="Замер аналитических запросов по странам")
+    parser.add_argument("--scale", type=int, default=1, help="во сколько раз размножить набор стран")
+    parser.add_argument("--repeat", type=int, default=20, help="число повторов каждого запроса")
+    parser.add_argument("--json", action="store_true", help="вывод итогов в формате JSON")
+    args = parser.parse_args(argv)
+    
+    countries = load_countries() * max(1, args.scale)
+    report = run(countries, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    backends = list(report["build_ms"])
+    print(f"Стран: {report['rows']}; построение таблицы: "
+          + ", ".join(f"{backend} {ms:.1f} мс" for backend, ms in report["build_ms"].items()))
+    print(f"{'запрос':<28}{'dicts':>10}" + "".join(f"{backend:>10}" for backend in backends) + "   (мс)")
+    for name, timings in report["queries"].items():
+        print(f"{name:<28}{timings['dicts']:>10.3f}" + "".join(f"{timings[b]:>10.3f}" for b in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import zlib
+
+from http_client import HttpClient, supported_encodings
+from http_metrics import MetricsRegistry
+from stub_server import DEFAULT_PAYLOADS_PATH, StubServer, load_payloads
+
+# Ответ, на котором сравниваются кодировки (самый большой ответ проекта:
+# /all с самыми объемными полями, API принимает не больше 10 полей)
+DEFAULT_URL = "https://restcountries.com/v3.1/all?fields=name,cca3,translations,currencies,languages,timezones,maps"
+
+
+def _decoder(encoding):
+    # Распаковка тела так же, как это делает urllib3 для Content-Encoding
+    if encoding == "gzip":
+        return lambda data: zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompress
+    if encoding == "br":
+        import brotli
+        return brotli.decompress
+    if encoding == "zstd":
+        import zstandard
+        return lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return bytes
+
+
+def measure(url, encoding, iterations=20, host_overrides=None):
+    """
+    Замеряет загрузку url с Accept-Encoding: encoding.
+    
+    Returns:
+        dict: Байт по сети и после распаковки, медиана времени запроса и
+        время распаковки тела на клиенте (мс)
+    """
+    metrics = MetricsRegistry()
+    client = HttpClient(headers={"Accept-Encoding": encoding}, metrics=metrics, host_overrides=host_overrides)
+    try:
+        # Сжатое тело как есть - для замера распаковки отдельно от сети
+        response = client.get(url, stream=True)
+        response.raise_for_status()
+        received = response.headers.get("Content-Encoding", "identity").strip().lower() or "identity"
+        raw = response.raw.read(decode_content=False)
+        response.close()
+        
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = client.get(url)
+            response.raise_for_status()
+            timings.append(time.perf_counter() - started)
+    finally:
+        client.close()
+    
+    decode = _decoder(received)
+    decoded = decode(raw)
+    decode_timings = []
+    for _ in range(max(iterations, 5)):
+        started = time.perf_counter()
+        decode(raw)
+        decode_timings.append(time.perf_counter() - started)
+    
+    totals = metrics.transfer_totals()
+    return {
+        "requested": encoding,
+        "encoding": received,
+        "wire_bytes": totals["wire_bytes"] // iterations,
+        "decoded_bytes": len(decoded),
+        "ratio": len(decoded) / len(raw) if raw else 1.0,
+        "request_ms": statistics.median(timings) * 1000,
+        "decode_ms": statistics.median(decode_timings) * 1000,
+    }
+
+
+def break_even_mbit(result, identity):
+    """
+    Скорость канала (Мбит/с), ниже которой сжатие выгодно: сэкономленные
+    байты передаются дольше, чем тело распаковывается.
+    
+    Returns:
+        float: Мбит/с или None, если сжатие не уменьшает ответ
+    """
+    saved = identity["wire_bytes"] - result["wire_bytes"]
+    if saved <= 0:
+        return None
+    decode_seconds = max(result["decode_ms"] - identity["decode_ms"], 1e-6) / 1000
+    return saved * 8 / decode_seconds / 1e6
+
+
+def main(argv=None):
+    """
+    Сравнение кодировок сжатия ответа: размер по сети, время запроса и
+    стоимость распаковки.
+    """
+    parser = argparse.ArgumentParser(description="Замер сжатия ответов API (Accept-Encoding)")
+    parser.add_argument("--url", default=DEFAULT_URL, help="адрес ответа для замера")
+    parser.add_argument("--live", action="store_true", help="обращаться к настоящему API, а не к заглушке")
+    parser.add_argument("--payloads", default=DEFAULT_PAYLOADS_PATH, help="записанные ответы для заглушки")
+    parser.add_argument("-n", "--iterations", type=int, default=20, help="запросов на кодировку")
+    parser.add_argument("--json", action="store_true", help="вывод в формате JSON")
+    args = parser.parse_args(argv)
+    
+    encodings = ("identity",) + supported_encodings()
+    stub = None
+    try:
+        overrides = None
+        if not args.live:
+            stub = StubServer(load_payloads(args.payloads)).start()
+            overrides = stub.overrides()
+            encodings = ("identity",) + tuple(e for e in supported_encodings() if e in stub.encodings)
+        results = [measure(args.url, encoding, args.iterations, overrides) for encoding in encodings]
+    except (OSError, ValueError) as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        print(f"Ошибка: {e}")
+        return 1
+    finally:
+        if stub is not None:
+            stub.stop()
+    
+    identity = results[0]
+    for result in results:
+        result["break_even_mbit"] = break_even_mbit(result, identity) if result is not identity else None
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'кодировка':<10}{'по сети':>12}{'распак.':>12}{'сжатие':>8}{'запрос':>10}{'распак.':>10}  окупается до")
+    for result in results:
+        break_even = result["break_even_mbit"]
+        print(f"{result['encoding']:<10}{result['wire_bytes']:>12}{result['decoded_bytes']:>12}"
+              f"{result['ratio']:>7.1f}x{result['request_ms']:>8.2f}мс{result['decode_ms']:>8.3f}мс  "
+              + (f"{break_even:.0f} Мбит/с" if break_even else "-"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from colorama import Fore, Style
+from colorama.ansitowin32 import AnsiToWin32
+
+from country_render import (format_currency, format_languages, format_list, render_country_card,
+                            render_short_card, write_card)
+from country_snapshot import DEFAULT_SNAPSHOT_PATH, CountrySnapshot
+
+# Запись страны для замеров, если локального снимка нет
+SAMPLE_COUNTRY = {
+    "name": {"common": "Norway", "official": "Kingdom of Norway"},
+    "cca2": "NO",
+    "cca3": "NOR",
+    "region": "Europe",
+    "subregion": "Northern Europe",
+    "continents": ["Europe"],
+    "latlng": [62.0, 10.0],
+    "area": 323802.0,
+    "borders": ["FIN", "SWE", "RUS"],
+    "landlocked": False,
+    "population": 5379475,
+    "gini": {"2018": 27.7},
+    "capital": ["Oslo"],
+    "capitalInfo": {"latlng": [59.92, 10.75]},
+    "independent": True,
+    "unMember": True,
+    "currencies": {"NOK": {"name": "Norwegian krone", "symbol": "kr"}},
+    "languages": {"nno": "Norwegian Nynorsk", "nob": "Norwegian Bokmål", "smi": "Sami"},
+    "idd": {"root": "+4", "suffixes": ["7"]},
+    "timezones": ["UTC+01:00"],
+    "startOfWeek": "monday",
+    "maps": {"googleMaps": "https://goo.gl/maps/htWRrphA7vNgQDFdA",
+             "openStreetMaps": "https://www.openstreetmap.org/relation/2978650"},
+}
+
+
+def legacy_full(country_data, status_code, out):
+    """
+    Прежняя реализация display_country_info: отдельный print на каждую строку.
+    """
+    def p(*args, **kwargs):
+        print(*args, file=out, **kwargs)
+    
+    name = country_data.get('name', {})
+    common_name = name.get('common', 'Неизвестно')
+    official_name = name.get('official', 'Неизвестно')
+    p(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*70}")
+    p(f"{Fore.CYAN}{Style.BRIGHT}{common_name.upper():^70}")
+    p(f"{Fore.CYAN}{Style.BRIGHT}{'='*70}\n")
+    if status_code is not None:
+        status_color = Fore.GREEN if 200 <= status_code < 300 else Fore.RED
+        p(f"{Fore.YELLOW}{Style.BRIGHT}HTTP Status Code:{Style.RESET_ALL} {status_color}{status_code}\n")
+    p(f"{Fore.YELLOW}{Style.BRIGHT}Официальное название:{Style.RESET_ALL} {Fore.WHITE}{official_name}")
+    p(f"{Fore.YELLOW}{Style.BRIGHT}Регион:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('region', 'Не указано')}")
+    p(f"{Fore.YELLOW}{Style.BRIGHT}Подрегион:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('subregion', 'Не указано')}")
+    p(f"{Fore.YELLOW}{Style.BRIGHT}Континент:{Style.RESET_ALL} {Fore.WHITE}{format_list(country_data.get('continents', []))}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Географическая информация:{Style.RESET_ALL}")
+    latlng = country_data.get('latlng', [])
+    if latlng and len(latlng) >= 2:
+        p(f"  {Fore.YELLOW}Координаты:{Style.RESET_ALL} {Fore.WHITE}Широта: {latlng[0]}, Долгота: {latlng[1]}")
+    p(f"  {Fore.YELLOW}Площадь:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('area', 'Не указано'):,} км²" if country_data.get('area') else f"  {Fore.YELLOW}Площадь:{Style.RESET_ALL} {Fore.WHITE}Не указано")
+    p(f"  {Fore.YELLOW}Граничит с:{Style.RESET_ALL} {Fore.WHITE}{format_list(country_data.get('borders', []))}")
+    p(f"  {Fore.YELLOW}Выход к морю:{Style.RESET_ALL} {Fore.WHITE}{'Нет' if country_data.get('landlocked', False) else 'Да'}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Демографическая информация:{Style.RESET_ALL}")
+    population = country_data.get('population', 0)
+    if population:
+        p(f"  {Fore.YELLOW}Население:{Style.RESET_ALL} {Fore.WHITE}{population:,} человек")
+    else:
+        p(f"  {Fore.YELLOW}Население:{Style.RESET_ALL} {Fore.WHITE}Не указано")
+    gini = country_data.get('gini', {})
+    if gini:
+        year = list(gini.keys())[0] if gini else None
+        value = list(gini.values())[0] if gini else None
+        if year and value:
+            p(f"  {Fore.YELLOW}Коэффициент Джини ({year}):{Style.RESET_ALL} {Fore.WHITE}{value}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Политическая информация:{Style.RESET_ALL}")
+    p(f"  {Fore.YELLOW}Столица:{Style.RESET_ALL} {Fore.WHITE}{format_list(country_data.get('capital', []))}")
+    capital_info = country_data.get('capitalInfo', {})
+    if capital_info.get('latlng'):
+        cap_latlng = capital_info['latlng']
+        p(f"  {Fore.YELLOW}Координаты столицы:{Style.RESET_ALL} {Fore.WHITE}Широта: {cap_latlng[0]}, Долгота: {cap_latlng[1]}")
+    p(f"  {Fore.YELLOW}Независимость:{Style.RESET_ALL} {Fore.WHITE}{'Да' if country_data.get('independent', False) else 'Нет'}")
+    p(f"  {Fore.YELLOW}Член ООН:{Style.RESET_ALL} {Fore.WHITE}{'Да' if country_data.get('unMember', False) else 'Нет'}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Экономическая информация:{Style.RESET_ALL}")
+    p(f"  {Fore.YELLOW}Валюта:{Style.RESET_ALL} {Fore.WHITE}{format_currency(country_data.get('currencies', {}))}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Культурная информация:{Style.RESET_ALL}")
+    p(f"  {Fore.YELLOW}Языки:{Style.RESET_ALL} {Fore.WHITE}{format_languages(country_data.get('languages', {}))}")
+    p(f"\n{Fore.GREEN}{Style.BRIGHT}Коды и идентификаторы:{Style.RESET_ALL}")
+    p(f"  {Fore.YELLOW}ISO 3166-1 alpha-2:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('cca2', 'Не указано')}")
+    p(f"  {Fore.YELLOW}ISO 3166-1 alpha-3:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('cca3', 'Не указано')}")
+    p(f"  {Fore.YELLOW}Телефонный код:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('idd', {}).get('root', '')}{country_data.get('idd', {}).get('suffixes', [''])[0] if country_data.get('idd', {}).get('suffixes') else ''}")
+    if country_data.get('timezones'):
+        p(f"  {Fore.YELLOW}Часовые пояса:{Style.RESET_ALL} {Fore.WHITE}{format_list(country_data.get('timezones', []))}")
+    if country_data.get('startOfWeek'):
+        p(f"  {Fore.YELLOW}Начало недели:{Style.RESET_ALL} {Fore.WHITE}{country_data.get('startOfWeek', 'Не указано').capitalize()}")
+    maps = country_data.get('maps', {})
+    if maps:
+        p(f"\n{Fore.GREEN}{Style.BRIGHT}Ссылки:{Style.RESET_ALL}")
+        if maps.get('googleMaps'):
+            p(f"  {Fore.YELLOW}Google Maps:{Style.RESET_ALL} {Fore.BLUE}{maps['googleMaps']}")
+        if maps.get('openStreetMaps'):
+            p(f"  {Fore.YELLOW}OpenStreetMap:{Style.RESET_ALL} {Fore.BLUE}{maps['openStreetMaps']}")
+    p(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*70}\n")
+
+
+def legacy_short(country_data, status_code, out):
+    """
+    Прежняя реализация display_short_country_info.
+    """
+    common_name = country_data.get('name', {}).get('common', 'Неизвестно')
+    capital = country_data.get('capital', [])
+    capital_str = capital[0] if capital and len(capital) > 0 else 'Не указано'
+    population = country_data.get('population', 0)
+    population_str = f"{population:,} человек" if population else 'Не указано'
+    currency_str = format_currency(country_data.get('currencies', {}))
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*50}", file=out)
+    print(f"{Fore.CYAN}{Style.BRIGHT}{common_name.upper():^50}", file=out)
+    print(f"{Fore.CYAN}{Style.BRIGHT}{'='*50}\n", file=out)
+    if status_code is not None:
+        status_color = Fore.GREEN if 200 <= status_code < 300 else Fore.RED
+        print(f"{Fore.YELLOW}{Style.BRIGHT}HTTP Status Code:{Style.RESET_ALL} {status_color}{status_code}\n", file=out)
+    print(f"{Fore.YELLOW}{Style.BRIGHT}Столица:{Style.RESET_ALL} {Fore.WHITE}{capital_str}", file=out)
+    print(f"{Fore.YELLOW}{Style.BRIGHT}Население:{Style.RESET_ALL} {Fore.WHITE}{population_str}", file=out)
+    print(f"{Fore.YELLOW}{Style.BRIGHT}Валюта:{Style.RESET_ALL} {Fore.WHITE}{currency_str}", file=out)
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*50}\n", file=out)
+
+
+VIEWS = {
+    "full": (legacy_full, render_country_card),
+    "short": (legacy_short, render_short_card),
+}
+
+
+def load_countries(use_snapshot=True):
+    """
+    Записи для замеров: страны из локального снимка или SAMPLE_COUNTRY.
+    """
+    snapshot = CountrySnapshot.load(DEFAULT_SNAPSHOT_PATH) if use_snapshot else None
+    if snapshot is not None and len(snapshot):
+        return snapshot.countries
+    return [SAMPLE_COUNTRY]
+
+
+def bench(render_one, countries, cards):
+    """
+    Выводит cards карточек функцией render_one и возвращает карточек в секунду.
+    """
+    started = time.perf_counter()
+    for i in range(cards):
+        render_one(countries[i % len(countries)])
+    elapsed = time.perf_counter() - started
+    return cards / elapsed if elapsed else 0.0
+
+
+def run(view, cards, color, output, countries):
+    """
+    Сравнивает прежний вывод через print и colorama с буферизованным рендерером.
+    
+    Args:
+        view: "full" или "short"
+        cards: число выводимых карточек
+        color: выводить ли цвета (как в терминале)
+        output: текстовый поток для вывода карточек
+        countries: записи стран
+    
+    Returns:
+        dict: {"before": карточек/с, "after": карточек/с, "speedup": ускорение}
+    """
+    legacy, render = VIEWS[view]
+    # Так выглядит sys.stdout после colorama.init(autoreset=True)
+    wrapped = AnsiToWin32(output, autoreset=True).stream
+    before = bench(lambda country: legacy(country, 200, wrapped), countries, cards)
+    after = bench(lambda country: write_card(render(country, 200, color), output, color), countries, cards)
+    return {"before": before, "after": after, "speedup": after / before if before else 0.0}
+
+
+def main(argv=None):
+    """
+    Замер скорости вывода карточек стран: до и после буферизованного рендерера.
+    """
+    parser = argparse.ArgumentParser(description="Скорость вывода карточек стран (карточек в секунду)")
+    parser.add_argument("-n", "--cards", type=int, default=5000, help="число карточек для каждого замера")
+    parser.add_argument("--view", choices=sorted(VIEWS) + ["all"], default="all", help="вид карточки")
+    parser.add_argument("--plain", action="store_true", help="вывод без цветов (как в файл или канал)")
+    parser.add_argument("--tty", action="store_true", help="выводить карточки в терминал (stdout)")
+    parser.add_argument("--no-snapshot", action="store_true", help="не использовать локальный снимок стран")
+    parser.add_argument("--json", action="store_true", help="вывод итогов в формате JSON")
+    args = parser.parse_args(argv)
+    
+    countries = load_countries(not args.no_snapshot)
+    views = sorted(VIEWS) if args.view == "all" else [args.view]
+    results = {}
+    if args.tty:
+        output = sys.stdout
+        for view in views:
+            results[view] = run(view, args.cards, not args.plain, output, countries)
+        output.flush()
+        report = sys.stderr
+    else:
+        with open(os.devnull, "w", encoding="utf-8") as output:
+            for view in views:
+                results[view] = run(view, args.cards, not args.plain, output, countries)
+        report = sys.stdout
+    
+    if args.json:
+        print(json.dumps(results, indent=2), file=report)
+        return
+    for view, result in results.items():
+        print(f"{view}: до {result['before']:.0f} карт/с, после {result['after']:.0f} карт/с "
+              f"(x{result['speedup']:.1f})", file=report)
+
+
+if __name__ == "__main__":
+    main()
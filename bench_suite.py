@@ -0,0 +1,250 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from stub_server import DEFAULT_PAYLOADS_PATH, StubServer, load_payloads
+
+# Формат файла результатов (меняется при несовместимых изменениях)
+RESULTS_VERSION = 1
+
+# Показатель, по которому сравниваются прогоны
+COMPARE_METRIC = "p50_ms"
+
+# Замедление, начиная с которого прогон считается регрессией (доля)
+DEFAULT_THRESHOLD = 0.2
+
+# Меньшее абсолютное замедление (мс) регрессией не считается: у операций в
+# несколько микросекунд относительный разброс между прогонами велик
+DEFAULT_MIN_DELTA_MS = 0.05
+
+
+def _isolate_snapshot():
+    # Замеры должны проходить через HTTP, а не через локальный снимок стран.
+    # Путь к снимку читается при импорте country_snapshot, поэтому подменяется
+    # до импорта модулей проекта.
+    os.environ["COUNTRY_SNAPSHOT_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-"), "no-snapshot.json")
+
+
+def build_benchmarks(countries):
+    """
+    Замеряемые операции. Каждая принимает номер итерации и возвращает
+    True при успехе.
+    
+    Returns:
+        dict: {название: функция}
+    """
+    import http_client
+    from country_service import COUNTRY_API_URL
+    from country_info import get_country_info as get_full_country_info
+    from short_country_info import get_country_info as get_short_country_info
+    from country_render import render_country_card, render_short_card
+    from main import get_random_dog
+    
+    names = [country_data["name"]["common"] for country_data in countries]
+    codes = [country_data["cca3"] for country_data in countries]
+    total = len(countries)
+    return {
+        "http_client.get": lambda i: http_client.get(f"{COUNTRY_API_URL}/alpha/{codes[i % total]}") is not None,
+        "country_info.get_country_info": lambda i: get_full_country_info(names[i % total])[1] is not None,
+        "short_country_info.get_country_info": lambda i: get_short_country_info(names[i % total])[1] is not None,
+        "main.get_random_dog": lambda i: get_random_dog() is not None,
+        "render_country_card": lambda i: bool(render_country_card(countries[i % total], 200)),
+        "render_short_card": lambda i: bool(render_short_card(countries[i % total], 200)),
+    }
+
+
+def run_benchmark(func, iterations, warmup, stub):
+    """
+    Выполняет func warmup раз без замера и iterations раз с замером.
+    
+    Returns:
+        dict: Число итераций, ошибок, запросов к заглушке и задержки в мс
+    """
+    from load_test import LatencyHistogram
+    
+    for i in range(warmup):
+        try:
+            func(i)
+        except Exception:
+            pass
+    histogram = LatencyHistogram()
+    errors = Counter()
+    requests_before = stub.requests
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            ok = func(warmup + i)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+            ok = None
+        histogram.record(time.perf_counter() - call_started)
+        if ok is False:
+            errors["failed"] += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "iterations": iterations,
+        "errors": sum(errors.values()),
+        "error_types": dict(errors),
+        "stub_requests": stub.requests - requests_before,
+        "mean_ms": histogram.mean() * 1000,
+        "p50_ms": histogram.percentile(50) * 1000,
+        "p90_ms": histogram.percentile(90) * 1000,
+        "p99_ms": histogram.percentile(99) * 1000,
+        "min_ms": (histogram.min or 0) / 1000,
+        "max_ms": histogram.max / 1000,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+    }
+
+
+def _git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_suite(payloads, iterations=200, warmup=10, latency=0.0, jitter=0.0, error_rate=0.0,
+              error_status=503, seed=1, only=None):
+    """
+    Запускает заглушку API, направляет на нее общий HTTP-клиент и
+    выполняет замеры.
+    
+    Returns:
+        dict: Отчет (окружение, настройки заглушки и результаты по операциям)
+    """
+    from http_client import get_client
+    
+    config = {"iterations": iterations, "warmup": warmup, "latency": latency, "jitter": jitter,
+              "error_rate": error_rate, "error_status": error_status, "seed": seed}
+    report = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.time(),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "payloads": {"source": payloads.get("source"), "countries": len(payloads["countries"])},
+        "results": {},
+    }
+    with StubServer(payloads, latency, jitter, error_rate, error_status, seed) as stub:
+        client = get_client()
+        for host, url in stub.overrides().items():
+            client.override_host(host, url)
+        benchmarks = build_benchmarks(payloads["countries"])
+        for name, func in benchmarks.items():
+            if only and name not in only:
+                continue
+            # Функции проекта печатают результат; в замер вывод не попадает
+            with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+                report["results"][name] = run_benchmark(func, iterations, warmup, stub)
+    return report
+
+
+def compare(baseline, report, threshold=DEFAULT_THRESHOLD, metric=COMPARE_METRIC,
+            min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Сравнивает отчет с предыдущим прогоном.
+    
+    Регрессия - замедление больше threshold (доля) и больше min_delta_ms.
+    
+    Returns:
+        list: [(операция, было, стало, изменение в долях, регрессия)]
+    """
+    rows = []
+    for name, result in report["results"].items():
+        old = baseline.get("results", {}).get(name, {}).get(metric)
+        new = result[metric]
+        if not old:
+            rows.append((name, None, new, None, False))
+            continue
+        change = (new - old) / old
+        rows.append((name, old, new, change, change > threshold and new - old > min_delta_ms))
+    return rows
+
+
+def format_report(report):
+    lines = [f"{'операция':<38}{'итер.':>7}{'ошиб.':>7}{'запр.':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'ср.':>10}  (мс)"]
+    for name, result in report["results"].items():
+        lines.append(f"{name:<38}{result['iterations']:>7}{result['errors']:>7}{result['stub_requests']:>7}"
+                     f"{result['p50_ms']:>10.3f}{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                     f"{result['mean_ms']:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Замеры без сети: заглушка API, прогон операций, JSON с результатами
+    и сравнение с предыдущим прогоном.
+    
+    Returns:
+        int: 0 или 1, если при сравнении найдена регрессия
+    """
+    names = ("http_client.get", "country_info.get_country_info", "short_country_info.get_country_info",
+             "main.get_random_dog", "render_country_card", "render_short_card")
+    parser = argparse.ArgumentParser(description="Набор замеров с локальной заглушкой API")
+    parser.add_argument("-n", "--iterations", type=int, default=200, help="замеров на операцию")
+    parser.add_argument("--warmup", type=int, default=10, help="итераций прогрева")
+    parser.add_argument("--payloads", default=DEFAULT_PAYLOADS_PATH,
+                        help="записанные ответы API (python stub_server.py --record FILE)")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответов заглушки, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов с ошибкой (0..1)")
+    parser.add_argument("--error-status", type=int, default=503, help="статус ответов с ошибкой")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора задержек и ошибок")
+    parser.add_argument("--only", action="append", choices=names, help="замерить только эту операцию")
+    parser.add_argument("-o", "--output", help="сохранить результаты в JSON файл")
+    parser.add_argument("--json", action="store_true", help="вывести результаты в формате JSON")
+    parser.add_argument("--compare", metavar="FILE", help="сравнить с результатами предыдущего прогона")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое замедление p50 при сравнении (доля)")
+    args = parser.parse_args(argv)
+    
+    try:
+        payloads = load_payloads(args.payloads)
+        baseline = None
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        return 1
+    
+    _isolate_snapshot()
+    report = run_suite(payloads, args.iterations, args.warmup, args.latency, args.jitter, args.error_rate,
+                       args.error_status, args.seed, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    
+    if baseline is None:
+        return 0
+    # При --json итоги сравнения не смешиваются с JSON на stdout
+    out = sys.stderr if args.json else sys.stdout
+    regressions = 0
+    print(f"\nСравнение с {args.compare} ({COMPARE_METRIC}, порог {args.threshold:.0%}):", file=out)
+    for name, old, new, change, regressed in compare(baseline, report, args.threshold):
+        if old is None:
+            print(f"  {name:<38}{'-':>10}{new:>10.3f}  нет в предыдущем прогоне", file=out)
+            continue
+        regressions += regressed
+        mark = "  РЕГРЕССИЯ" if regressed else ""
+        print(f"  {name:<38}{old:>10.3f}{new:>10.3f}{change:>+9.1%}{mark}", file=out)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import argparse
+
+
+def parse_header(value):
+    """
+    Разбирает аргумент -H/--header вида 'Имя: значение' (тип для argparse).
+    
+    Returns:
+        tuple: (имя, значение) без пробелов по краям
+    
+    Raises:
+        argparse.ArgumentTypeError: Если в аргументе нет двоеточия со значением
+    """
+    name, _, header_value = value.partition(":")
+    if not header_value:
+        raise argparse.ArgumentTypeError(f"Заголовок должен иметь вид 'Имя: значение': {value}")
+    return name.strip(), header_value.strip()
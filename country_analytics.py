@@ -0,0 +1,453 @@
+import argparse
+import json
+import math
+import operator
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import nlargest, nsmallest
+from itertools import compress
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from country_snapshot import all_countries
+
+# Поля записи, нужные аналитике (API /all принимает не больше 10 полей)
+ANALYTICS_FIELDS = ("name", "cca3", "region", "subregion", "population", "area", "gini",
+                    "currencies", "languages", "landlocked")
+
+# Числовые столбцы; отсутствующие значения хранятся как NaN
+NUMERIC_COLUMNS = ("population", "area", "density", "gini")
+
+# Строковые столбцы с одним значением на страну
+CATEGORY_COLUMNS = ("region", "subregion")
+
+# Столбцы с несколькими значениями на страну
+MULTI_COLUMNS = ("currencies", "languages")
+
+MISSING = float("nan")
+
+# Больше корзин гистограмма describe не строит
+MAX_BINS = 1000
+
+
+class Categories:
+    """
+    Словарь значений строкового столбца: строка <-> целочисленный код.
+    
+    Строки интернируются, поэтому одинаковые значения во всех столбцах
+    хранятся в памяти один раз.
+    """
+    
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def code(self, value):
+        value = sys.intern(value or "")
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def find(self, value):
+        """
+        Код значения без учета регистра (None, если значения нет).
+        """
+        code = self._codes.get(value)
+        if code is not None:
+            return code
+        folded = value.casefold()
+        for code, known in enumerate(self.values):
+            if known.casefold() == folded:
+                return code
+        return None
+
+
+def _percentile(sorted_values, percent):
+    # Линейная интерполяция между соседними значениями (как numpy.percentile)
+    if not sorted_values:
+        return MISSING
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class CountryTable:
+    """
+    Данные о странах в виде столбцов.
+    
+    Числа хранятся в array('d'), строковые значения - кодами в array('H')
+    со словарем Categories, значения с несколькими элементами на страну
+    (валюты, языки) - парами массивов (номер строки, код значения).
+    Если установлен NumPy, операции выполняются над представлениями этих
+    массивов (numpy.frombuffer, без копирования); иначе - встроенными
+    функциями над array.
+    
+    Args:
+        use_numpy: использовать ли NumPy (None - если установлен)
+    """
+    
+    def __init__(self, use_numpy=None):
+        self.use_numpy = np is not None if use_numpy is None else bool(use_numpy and np is not None)
+        self.names = []
+        self.codes = []
+        self.numeric = {column: array("d") for column in NUMERIC_COLUMNS}
+        self.categories = {column: Categories() for column in CATEGORY_COLUMNS + MULTI_COLUMNS}
+        self.category_codes = {column: array("H") for column in CATEGORY_COLUMNS}
+        self.multi_rows = {column: array("I") for column in MULTI_COLUMNS}
+        self.multi_codes = {column: array("H") for column in MULTI_COLUMNS}
+        self.landlocked = array("b")
+        self._views = {}
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @classmethod
+    def from_countries(cls, countries, use_numpy=None):
+        """
+        Строит таблицу по записям REST Countries.
+        """
+        table = cls(use_numpy)
+        for country in countries:
+            table.append(country)
+        return table
+    
+    def append(self, country):
+        row = len(self.names)
+        self.names.append(sys.intern(country.get("name", {}).get("common", "")))
+        self.codes.append(sys.intern(country.get("cca3", "")))
+        
+        population = country.get("population")
+        area = country.get("area")
+        gini = country.get("gini") or {}
+        self.numeric["population"].append(float(population) if population is not None else MISSING)
+        self.numeric["area"].append(float(area) if area and area > 0 else MISSING)
+        self.numeric["density"].append(population / area if population is not None and area and area > 0 else MISSING)
+        # Берем последний год, за который есть коэффициент Джини
+        self.numeric["gini"].append(float(gini[max(gini)]) if gini else MISSING)
+        
+        for column in CATEGORY_COLUMNS:
+            self.category_codes[column].append(self.categories[column].code(country.get(column)))
+        for column, values in (("currencies", (country.get("currencies") or {}).keys()),
+                               ("languages", (country.get("languages") or {}).values())):
+            for value in values:
+                self.multi_rows[column].append(row)
+                self.multi_codes[column].append(self.categories[column].code(value))
+        self.landlocked.append(1 if country.get("landlocked") else 0)
+        self._views.clear()
+    
+    def _view(self, values):
+        # Представление NumPy поверх array без копирования данных
+        key = id(values)
+        view = self._views.get(key)
+        if view is None or len(view) != len(values):
+            view = self._views[key] = np.frombuffer(values, dtype=values.typecode)
+        return view
+    
+    def _check_numeric(self, column):
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"Неизвестный числовой столбец: {column} (есть: {', '.join(NUMERIC_COLUMNS)})")
+        return self.numeric[column]
+    
+    def mask(self, region=None, subregion=None, min_population=None, landlocked=None):
+        """
+        Фильтр строк.
+        
+        Args:
+            region, subregion: значение столбца (без учета регистра)
+            min_population: минимальное население
+            landlocked: True - только без выхода к морю, False - только с выходом
+        
+        Returns:
+            Маска строк (numpy.ndarray или bytes) или None, если фильтров нет
+        
+        Raises:
+            ValueError: Если такого региона или подрегиона нет
+        """
+        conditions = []
+        for column, value in (("region", region), ("subregion", subregion)):
+            if value is None:
+                continue
+            code = self.categories[column].find(value)
+            if code is None:
+                raise ValueError(f"Неизвестное значение {column}: {value}")
+            conditions.append((self.category_codes[column], "==", code))
+        if min_population is not None:
+            conditions.append((self.numeric["population"], ">=", float(min_population)))
+        if landlocked is not None:
+            conditions.append((self.landlocked, "==", 1 if landlocked else 0))
+        if not conditions:
+            return None
+        
+        if self.use_numpy:
+            result = np.ones(len(self), dtype=bool)
+            for values, op, operand in conditions:
+                view = self._view(values)
+                result &= (view == operand) if op == "==" else (view >= operand)
+            return result
+        result = None
+        for values, op, operand in conditions:
+            # operand.__le__(v) означает v >= operand
+            matches = map(operand.__eq__ if op == "==" else operand.__le__, values)
+            result = bytes(matches) if result is None else bytes(map(operator.and_, result, matches))
+        return result
+    
+    def sum_by(self, column, by="region", mask=None):
+        """
+        Сумма числового столбца по группам.
+        
+        Returns:
+            list: [(группа, сумма)] по убыванию суммы
+        """
+        values = self._check_numeric(column)
+        if by not in CATEGORY_COLUMNS:
+            raise ValueError(f"Группировать можно по: {', '.join(CATEGORY_COLUMNS)}")
+        groups = self.categories[by]
+        codes = self.category_codes[by]
+        
+        if self.use_numpy:
+            view = self._view(values)
+            codes_view = self._view(codes)
+            selected = ~np.isnan(view)
+            if mask is not None:
+                selected &= mask
+            sums = np.bincount(codes_view[selected], weights=view[selected], minlength=len(groups))
+            present = np.bincount(codes_view[selected], minlength=len(groups)) > 0
+            totals = [(groups.values[code], float(sums[code])) for code in np.flatnonzero(present)]
+        else:
+            sums = [0.0] * len(groups)
+            present = [False] * len(groups)
+            rows = zip(codes, values) if mask is None else compress(zip(codes, values), mask)
+            for code, value in rows:
+                if value == value:
+                    sums[code] += value
+                    present[code] = True
+            totals = [(groups.values[code], sums[code]) for code in range(len(groups)) if present[code]]
+        return sorted(totals, key=lambda item: item[1], reverse=True)
+    
+    def top(self, column, n=10, ascending=False, mask=None):
+        """
+        Первые n стран по значению числового столбца (страны без значения пропускаются).
+        
+        Returns:
+            list: [(название, cca3, значение)]
+        """
+        values = self._check_numeric(column)
+        if self.use_numpy:
+            view = self._view(values)
+            selected = ~np.isnan(view)
+            if mask is not None:
+                selected &= mask
+            rows = np.flatnonzero(selected)
+            keys = view[rows] if ascending else -view[rows]
+            if len(rows) > n:
+                part = np.argpartition(keys, n - 1)[:n]
+                rows, keys = rows[part], keys[part]
+            order = rows[np.argsort(keys, kind="stable")]
+            return [(self.names[row], self.codes[row], float(view[row])) for row in order]
+        
+        rows = (row for row, value in enumerate(values) if value == value)
+        if mask is not None:
+            rows = (row for row in rows if mask[row])
+        pick = nsmallest if ascending else nlargest
+        return [(self.names[row], self.codes[row], values[row]) for row in pick(n, rows, key=values.__getitem__)]
+    
+    def counts(self, column, mask=None):
+        """
+        Сколько стран использует каждое значение (валюту, язык, регион).
+        
+        Returns:
+            list: [(значение, число стран)] по убыванию
+        """
+        if column in MULTI_COLUMNS:
+            rows, codes = self.multi_rows[column], self.multi_codes[column]
+        elif column in CATEGORY_COLUMNS:
+            rows, codes = None, self.category_codes[column]
+        else:
+            raise ValueError(f"Считать можно по: {', '.join(MULTI_COLUMNS + CATEGORY_COLUMNS)}")
+        values = self.categories[column]
+        
+        if self.use_numpy:
+            codes_view = self._view(codes)
+            if mask is not None:
+                codes_view = codes_view[mask[self._view(rows)] if rows is not None else mask]
+            counts = np.bincount(codes_view, minlength=len(values))
+            result = [(values.values[code], int(counts[code])) for code in np.flatnonzero(counts)]
+        else:
+            if mask is not None:
+                codes = compress(codes, map(mask.__getitem__, rows) if rows is not None else mask)
+            result = [(values.values[code], count) for code, count in Counter(codes).items()]
+        return sorted(result, key=lambda item: (-item[1], item[0]))
+    
+    def describe(self, column="gini", mask=None, bin_width=5.0):
+        """
+        Распределение числового столбца: квартили, среднее и гистограмма.
+        
+        Returns:
+            dict: count, min, p25, median, p75, max, mean и histogram - список
+            (нижняя граница, верхняя граница, число стран)
+        
+        Raises:
+            ValueError: Если столбец не числовой или шаг дает больше MAX_BINS корзин
+        """
+        values = self._check_numeric(column)
+        if not bin_width > 0:
+            raise ValueError(f"Шаг гистограммы должен быть положительным: {bin_width}")
+        if self.use_numpy:
+            view = self._view(values)
+            selected = ~np.isnan(view)
+            if mask is not None:
+                selected &= mask
+            data = np.sort(view[selected])
+            if not len(data):
+                return {"count": 0}
+            p25, median, p75 = (float(v) for v in np.percentile(data, (25, 50, 75)))
+            low, bins = _histogram_bins(float(data[0]), float(data[-1]), bin_width)
+            counts, edges = np.histogram(data, bins=low + np.arange(bins + 1) * bin_width)
+            histogram = [(float(edges[i]), float(edges[i + 1]), int(count))
+                         for i, count in enumerate(counts) if count]
+            mean = float(data.mean())
+        else:
+            data = sorted(value for value in (values if mask is None else compress(values, mask))
+                          if value == value)
+            if not data:
+                return {"count": 0}
+            p25, median, p75 = (_percentile(data, p) for p in (25, 50, 75))
+            low, bins = _histogram_bins(data[0], data[-1], bin_width)
+            # Данные отсортированы: границы корзин ищутся двоичным поиском,
+            # последняя корзина включает правую границу (как numpy.histogram)
+            bounds = [bisect_left(data, low + i * bin_width) for i in range(bins)] + [len(data)]
+            histogram = [(low + i * bin_width, low + (i + 1) * bin_width, bounds[i + 1] - bounds[i])
+                         for i in range(bins) if bounds[i + 1] > bounds[i]]
+            mean = math.fsum(data) / len(data)
+        return {
+            "count": len(data),
+            "min": float(data[0]),
+            "p25": p25,
+            "median": median,
+            "p75": p75,
+            "max": float(data[-1]),
+            "mean": mean,
+            "histogram": histogram,
+        }
+
+
+def _histogram_bins(minimum, maximum, bin_width):
+    # Нижняя граница кратна шагу; число корзин ограничено MAX_BINS
+    low = math.floor(minimum / bin_width) * bin_width
+    bins = max(1, math.ceil((maximum - low) / bin_width))
+    if bins > MAX_BINS:
+        raise ValueError(f"Шаг {bin_width:g} дает {bins} корзин (не больше {MAX_BINS})")
+    return low, bins
+
+
+def load_countries():
+    """
+    Записи стран для аналитики: из локального снимка (любого возраста)
+    или, если его нет, одним запросом /all только с нужными полями.
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    return all_countries(ANALYTICS_FIELDS)
+
+
+def load_table(use_numpy=None):
+    """
+    Таблица по всем странам (см. load_countries).
+    """
+    return CountryTable.from_countries(load_countries(), use_numpy)
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) >= 1000:
+        return f"{int(value):,}"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return f"{value:,}"
+
+
+def main(argv=None):
+    """
+    Аналитические запросы по данным о странах из командной строки.
+    """
+    # Фильтры и формат вывода общие для всех запросов
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--region", help="только страны региона")
+    common.add_argument("--subregion", help="только страны подрегиона")
+    common.add_argument("--min-population", type=int, help="только страны с населением не меньше")
+    common.add_argument("--landlocked", action="store_true", default=None, help="только страны без выхода к морю")
+    common.add_argument("--json", action="store_true", help="вывод в формате JSON")
+    common.add_argument("--no-numpy", action="store_true", help="не использовать NumPy")
+    
+    parser = argparse.ArgumentParser(description="Аналитика по данным о странах")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="запрос")
+    
+    sum_command = commands.add_parser("sum", parents=[common],
+                                      help="сумма по группам (например, население по регионам)")
+    sum_command.add_argument("column", choices=NUMERIC_COLUMNS)
+    sum_command.add_argument("--by", choices=CATEGORY_COLUMNS, default="region")
+    
+    top_command = commands.add_parser("top", parents=[common], help="первые N стран по столбцу")
+    top_command.add_argument("column", choices=NUMERIC_COLUMNS)
+    top_command.add_argument("-n", type=int, default=10)
+    top_command.add_argument("--asc", action="store_true", help="по возрастанию")
+    
+    count_command = commands.add_parser("count", parents=[common], help="число стран по валютам, языкам, регионам")
+    count_command.add_argument("column", choices=MULTI_COLUMNS + CATEGORY_COLUMNS)
+    count_command.add_argument("-n", type=int, default=20)
+    
+    describe_command = commands.add_parser("describe", parents=[common], help="распределение числового столбца")
+    describe_command.add_argument("column", choices=NUMERIC_COLUMNS, nargs="?", default="gini")
+    describe_command.add_argument("--bin-width", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    
+    try:
+        table = load_table(use_numpy=False if args.no_numpy else None)
+        mask = table.mask(args.region, args.subregion, args.min_population, args.landlocked)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        print(f"Ошибка загрузки данных: {e}")
+        return
+    
+    if args.command == "sum":
+        result = table.sum_by(args.column, args.by, mask)
+        rows = [(group or "-", _format_number(total)) for group, total in result]
+    elif args.command == "top":
+        result = table.top(args.column, args.n, args.asc, mask)
+        rows = [(f"{name} ({code})", _format_number(value)) for name, code, value in result]
+    elif args.command == "count":
+        result = table.counts(args.column, mask)[:args.n]
+        rows = [(value or "-", str(count)) for value, count in result]
+    else:
+        try:
+            result = table.describe(args.column, mask, args.bin_width)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            return
+        rows = [(name, _format_number(value)) for name, value in result.items() if name != "histogram"]
+        rows += [(f"[{low:g}, {high:g})", str(count)) for low, high, count in result.get("histogram", [])]
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    width = max((len(label) for label, _ in rows), default=0)
+    for label, value in rows:
+        print(f"{label:<{width}}  {value:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from country_borders import border_names
+from country_info import get_country_info as get_full_country_info, display_country_info
+from short_country_info import get_country_info as get_short_country_info, display_short_country_info
+
+# Количество одновременных запросов по умолчанию
+DEFAULT_MAX_WORKERS = 8
+
+# Функции получения и отображения данных для каждого вида
+VIEWS = {
+    "full": (get_full_country_info, display_country_info),
+    "short": (get_short_country_info, display_short_country_info),
+}
+
+
+def read_country_names(source):
+    """
+    Читает названия стран из файла или stdin (по одному на строку).
+    
+    Args:
+        source: путь к файлу или '-' для чтения из stdin
+    
+    Yields:
+        str: Название страны (пустые строки пропускаются)
+    """
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            name = line.strip()
+            if name:
+                yield name
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def fetch_countries(countries, view="full", max_workers=DEFAULT_MAX_WORKERS, fields=None):
+    """
+    Параллельно получает информацию о нескольких странах.
+    
+    Запросы выполняются в пуле из max_workers потоков через общий
+    HTTP-клиент, результаты возвращаются в порядке входных названий.
+    Каждая страна запрашивается один раз, сколько бы раз она ни
+    повторялась во входных данных.
+    
+    Args:
+        countries: итерируемый набор названий стран
+        view: 'full' или 'short' - какую функцию get_country_info использовать
+        max_workers: максимальное число одновременных запросов
+        fields: поля записи для запроса (по умолчанию - поля, нужные отображению view)
+    
+    Returns:
+        list: Список кортежей (country, status_code, data) в порядке ввода
+    """
+    fetch, _ = VIEWS[view]
+    if fields is not None:
+        fetch = partial(fetch, fields=fields)
+    countries = list(countries)
+    if not countries:
+        return []
+    # Повторяющиеся названия (без учета регистра) запрашиваются один раз
+    first_spelling = {}
+    for country in countries:
+        first_spelling.setdefault(country.casefold(), country)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        fetched = dict(zip(first_spelling, executor.map(fetch, first_spelling.values())))
+    return [(country, *fetched[country.casefold()]) for country in countries]
+
+
+def display_batch_results(results, view="full", as_json=False, output=None):
+    """
+    Выводит результаты пакетного запроса.
+    
+    Args:
+        results: список кортежей (country, status_code, data)
+        view: 'full' или 'short' - каким отображением выводить карточки
+        as_json: выводить ли результаты в формате NDJSON вместо карточек
+        output: поток для NDJSON вывода (по умолчанию stdout)
+    """
+    if as_json:
+        output = output or sys.stdout
+        for country, status_code, data in results:
+            record = {"query": country, "status_code": status_code, "data": data}
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
+    
+    _, display = VIEWS[view]
+    if view == "full":
+        # Названия соседей всех карточек разрешаются один раз, до вывода:
+        # сам вывод к сети не обращается
+        names = border_names(*(data for _, _, data in results if data))
+        display = partial(display, names=names)
+    for country, status_code, data in results:
+        if data:
+            display(data, status_code)
+        else:
+            print(f"Не удалось получить информацию о стране '{country}' (статус: {status_code})")
+
+
+def main(argv=None):
+    """
+    Пакетный режим: читает названия стран из файла или stdin и выводит результаты.
+    
+    Returns:
+        int: 0 или 1, если хотя бы одну страну получить не удалось
+    """
+    parser = argparse.ArgumentParser(description="Пакетное получение информации о странах")
+    parser.add_argument("source", nargs="?", default="-",
+                        help="файл с названиями стран (по одному на строку), '-' для stdin")
+    view_group = parser.add_mutually_exclusive_group()
+    view_group.add_argument("--full", dest="view", action="store_const", const="full",
+                            help="полная информация (по умолчанию)")
+    view_group.add_argument("--short", dest="view", action="store_const", const="short",
+                            help="краткая информация")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"число одновременных запросов (по умолчанию {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--json", action="store_true",
+                        help="вывод в формате NDJSON вместо карточек")
+    parser.add_argument("--fields",
+                        help="поля записи через запятую (по умолчанию - поля выбранного вида)")
+    parser.set_defaults(view="full")
+    args = parser.parse_args(argv)
+    
+    names = read_country_names(args.source)
+    fields = tuple(field.strip() for field in args.fields.split(",") if field.strip()) if args.fields else None
+    if args.json:
+        # Сообщения об ошибках уходят в stderr, чтобы не портить NDJSON вывод
+        with contextlib.redirect_stdout(sys.stderr):
+            results = fetch_countries(names, view=args.view, max_workers=args.workers, fields=fields)
+    else:
+        results = fetch_countries(names, view=args.view, max_workers=args.workers, fields=fields)
+    display_batch_results(results, view=args.view, as_json=args.json)
+    return 1 if any(data is None for _, _, data in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+from country_snapshot import SNAPSHOT_URL, all_countries, get_snapshot
+
+# Базовый URL REST Countries API
+COUNTRY_API_URL = "https://restcountries.com/v3.1"
+
+# Поля записи, нужные графу границ
+BORDER_FIELDS = ("name", "cca3", "borders")
+
+# Сколько кодов передается в одном запросе /alpha?codes=
+MAX_CODES_PER_REQUEST = 100
+
+
+class BorderGraph:
+    """
+    Граф сухопутных границ стран по полю borders.
+    
+    Списки смежности строятся один раз (граница считается двусторонней,
+    даже если указана только у одной из стран); обход в ширину, поиск
+    пути и компоненты связности выполняются в памяти.
+    
+    Args:
+        adjacency: словарь {cca3: множество соседних cca3}
+        names: словарь {cca3: название страны}
+    """
+    
+    def __init__(self, adjacency, names=None):
+        self.adjacency = {code: frozenset(neighbours) for code, neighbours in adjacency.items()}
+        self.names = dict(names or {})
+        self._components = None
+    
+    def __len__(self):
+        return len(self.adjacency)
+    
+    def __contains__(self, cca3):
+        return cca3 in self.adjacency
+    
+    @classmethod
+    def from_countries(cls, countries):
+        adjacency = {}
+        names = {}
+        for country_data in countries:
+            code = country_data.get("cca3")
+            if not code:
+                continue
+            names[code] = country_data.get("name", {}).get("common", code)
+            adjacency.setdefault(code, set())
+            for neighbour in country_data.get("borders") or []:
+                adjacency[code].add(neighbour)
+                adjacency.setdefault(neighbour, set()).add(code)
+        return cls(adjacency, names)
+    
+    def _check(self, cca3):
+        code = cca3.upper()
+        if code not in self.adjacency:
+            raise ValueError(f"Страны с кодом {cca3} нет в графе")
+        return code
+    
+    def name(self, cca3):
+        return self.names.get(cca3, cca3)
+    
+    def neighbours(self, cca3):
+        """
+        Непосредственные соседи страны (отсортированы по коду).
+        
+        Raises:
+            ValueError: Если страны нет в графе
+        """
+        return sorted(self.adjacency[self._check(cca3)])
+    
+    def within_hops(self, cca3, hops=1):
+        """
+        Страны, до которых не больше hops пересечений границ.
+        
+        Returns:
+            dict: {cca3: число пересечений} без самой страны, по возрастанию
+        
+        Raises:
+            ValueError: Если страны нет в графе
+        """
+        start = self._check(cca3)
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            code = queue.popleft()
+            if distances[code] >= hops:
+                continue
+            for neighbour in self.adjacency[code]:
+                if neighbour not in distances:
+                    distances[neighbour] = distances[code] + 1
+                    queue.append(neighbour)
+        del distances[start]
+        return dict(sorted(distances.items(), key=lambda item: (item[1], item[0])))
+    
+    def shortest_path(self, source, target):
+        """
+        Кратчайший сухопутный путь (по числу пересечений границ).
+        
+        Поиск в ширину ведется одновременно с двух концов, поэтому
+        просматривается лишь небольшая часть графа.
+        
+        Returns:
+            list: Коды стран от source до target или None, если пути нет
+        
+        Raises:
+            ValueError: Если одной из стран нет в графе
+        """
+        source, target = self._check(source), self._check(target)
+        if source == target:
+            return [source]
+        if self.component_of(source) is not self.component_of(target):
+            return None
+        parents = ({source: None}, {target: None})
+        frontiers = ([source], [target])
+        while frontiers[0] and frontiers[1]:
+            # Расширяется меньший фронт
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, other = parents[side], parents[1 - side]
+            next_frontier = []
+            for code in frontiers[side]:
+                for neighbour in sorted(self.adjacency[code]):
+                    if neighbour in seen:
+                        continue
+                    seen[neighbour] = code
+                    if neighbour in other:
+                        return self._join(parents, neighbour)
+                    next_frontier.append(neighbour)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return None
+    
+    @staticmethod
+    def _join(parents, meeting):
+        path = []
+        code = meeting
+        while code is not None:
+            path.append(code)
+            code = parents[0][code]
+        path.reverse()
+        code = parents[1][meeting]
+        while code is not None:
+            path.append(code)
+            code = parents[1][code]
+        return path
+    
+    def components(self):
+        """
+        Компоненты связности (страны, связанные сухопутными границами).
+        
+        Returns:
+            list: frozenset кодов, от больших компонент к меньшим
+        """
+        if self._components is None:
+            components = []
+            by_code = {}
+            for start in sorted(self.adjacency):
+                if start in by_code:
+                    continue
+                component = {start}
+                queue = deque([start])
+                while queue:
+                    for neighbour in self.adjacency[queue.popleft()]:
+                        if neighbour not in component:
+                            component.add(neighbour)
+                            queue.append(neighbour)
+                component = frozenset(component)
+                components.append(component)
+                by_code.update(dict.fromkeys(component, component))
+            components.sort(key=lambda component: (-len(component), min(component)))
+            self._components = (components, by_code)
+        return list(self._components[0])
+    
+    def component_of(self, cca3):
+        """
+        Компонента связности, в которую входит страна.
+        
+        Raises:
+            ValueError: Если страны нет в графе
+        """
+        code = self._check(cca3)
+        self.components()
+        return self._components[1][code]
+
+
+_names = {}
+_names_source = None
+_names_lock = threading.Lock()
+
+
+def _snapshot_names():
+    # Названия по cca3 из локального снимка (строятся один раз на снимок)
+    global _names_source
+    snapshot = get_snapshot(max_age=float("inf"))
+    if snapshot is not None and _names_source is not snapshot:
+        with _names_lock:
+            if _names_source is not snapshot:
+                for country_data in snapshot.countries:
+                    if country_data.get("cca3"):
+                        _names[country_data["cca3"]] = country_data.get("name", {}).get("common", country_data["cca3"])
+                _names_source = snapshot
+    return _names
+
+
+def resolve_codes(codes):
+    """
+    Названия стран по кодам cca3 (например, для поля borders).
+    
+    Коды ищутся в локальном снимке и в уже полученных ранее названиях;
+    остальные запрашиваются одним запросом /alpha?codes=... (по
+    MAX_CODES_PER_REQUEST кодов), а не отдельным запросом на каждый код.
+    
+    Args:
+        codes: коды cca3
+    
+    Returns:
+        dict: {cca3: название}; неизвестные API коды в результат не входят
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    codes = list(dict.fromkeys(code.upper() for code in codes if code))
+    names = _snapshot_names()
+    missing = [code for code in codes if code not in names]
+    if missing:
+        from http_client import get_client
+        
+        for start in range(0, len(missing), MAX_CODES_PER_REQUEST):
+            chunk = missing[start:start + MAX_CODES_PER_REQUEST]
+            response = get_client().get(f"{COUNTRY_API_URL}/alpha",
+                                        params={"codes": ",".join(chunk), "fields": "name,cca3"})
+            if response.status_code == 404:
+                # Ни один код из пачки не найден
+                continue
+            response.raise_for_status()
+            remember_names(response.json())
+    return {code: names[code] for code in codes if code in names}
+
+
+def remember_names(countries):
+    """
+    Запоминает названия стран из уже полученных записей (с полями name и
+    cca3), чтобы resolve_codes не запрашивал их повторно.
+    
+    Args:
+        countries: словари с данными о странах
+    """
+    with _names_lock:
+        for country_data in countries:
+            if country_data.get("cca3"):
+                _names[country_data["cca3"]] = country_data.get("name", {}).get("common", country_data["cca3"])
+
+
+def border_names(*countries):
+    """
+    Названия соседей стран для вывода в карточках.
+    
+    Коды из поля borders всех записей объединяются и разрешаются одним
+    вызовом resolve_codes, поэтому пакет карточек стоит не больше одного
+    запроса, а не запроса на каждую карточку.
+    
+    Args:
+        countries: словари с данными о странах
+    
+    Returns:
+        dict: {cca3: название} или пустой словарь, если границ нет или
+        названия получить не удалось (тогда выводятся коды)
+    """
+    borders = [code for country_data in countries if country_data
+               for code in country_data.get("borders") or []]
+    if not borders:
+        return {}
+    try:
+        return resolve_codes(borders)
+    except OSError:
+        # requests.exceptions.RequestException - подкласс OSError
+        return {}
+
+
+def load_countries():
+    """
+    Записи стран с границами: из локального снимка (любого возраста)
+    или, если его нет, одним запросом /all только с нужными полями.
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    return all_countries(BORDER_FIELDS)
+
+
+_graph = None
+_graph_source = None
+_graph_lock = threading.Lock()
+
+
+def get_border_graph():
+    """
+    Возвращает граф границ, построенный по локальному снимку стран (или
+    по данным, загруженным один раз из API, если снимка нет).
+    
+    Returns:
+        BorderGraph: Граф
+    
+    Raises:
+        requests.exceptions.RequestException: Если снимка нет, а загрузка не удалась
+    """
+    global _graph, _graph_source
+    snapshot = get_snapshot(max_age=float("inf"))
+    source = snapshot if snapshot is not None else SNAPSHOT_URL
+    if _graph is None or _graph_source is not source:
+        with _graph_lock:
+            if _graph is None or _graph_source is not source:
+                _graph = BorderGraph.from_countries(load_countries())
+                _graph_source = source
+    return _graph
+
+
+def _resolve(graph, query):
+    # Код cca3 по коду или названию страны (названия - через локальный поиск)
+    code = query.strip().upper()
+    if code in graph:
+        return code
+    for cca3, name in graph.names.items():
+        if name.casefold() == query.strip().casefold():
+            return cca3
+    from country_search import resolve_country_code
+    
+    code = resolve_country_code(query)
+    if code is None or code not in graph:
+        raise ValueError(f"Страна не найдена: {query}")
+    return code
+
+
+def main(argv=None):
+    """
+    Соседи, кратчайший сухопутный путь и компоненты связности графа границ.
+    
+    Returns:
+        int: 0 или 1, если страна не найдена или данные загрузить не удалось
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="вывод в формате JSON")
+    
+    parser = argparse.ArgumentParser(description="Граф сухопутных границ стран")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="запрос")
+    
+    neighbours_command = commands.add_parser("neighbours", parents=[common],
+                                             help="страны в пределах k пересечений границ")
+    neighbours_command.add_argument("country", help="название или код страны")
+    neighbours_command.add_argument("-k", "--hops", type=int, default=1, help="число пересечений границ")
+    
+    path_command = commands.add_parser("path", parents=[common], help="кратчайший сухопутный путь")
+    path_command.add_argument("source", help="откуда (название или код)")
+    path_command.add_argument("target", help="куда (название или код)")
+    
+    components_command = commands.add_parser("components", parents=[common], help="компоненты связности")
+    components_command.add_argument("-n", type=int, default=10, help="сколько компонент вывести")
+    
+    names_command = commands.add_parser("names", parents=[common], help="названия стран по кодам cca3")
+    names_command.add_argument("codes", nargs="+", help="коды cca3")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == "names":
+            result = resolve_codes(args.codes)
+            lines = [f"{code}  {name}" for code, name in result.items()] or ["Ничего не найдено"]
+        else:
+            graph = get_border_graph()
+            if args.command == "neighbours":
+                country = _resolve(graph, args.country)
+            elif args.command == "path":
+                source, target = _resolve(graph, args.source), _resolve(graph, args.target)
+            started = time.perf_counter()
+            if args.command == "neighbours":
+                result = graph.within_hops(country, args.hops)
+                lines = [f"{hops}  {graph.name(code)} ({code})" for code, hops in result.items()]
+                lines = lines or [f"У {graph.name(country)} нет сухопутных соседей"]
+            elif args.command == "path":
+                result = graph.shortest_path(source, target)
+                lines = [" -> ".join(f"{graph.name(code)} ({code})" for code in result) if result
+                         else f"Сухопутного пути между {graph.name(source)} и {graph.name(target)} нет"]
+            else:
+                components = graph.components()
+                result = [sorted(component) for component in components[:args.n]]
+                lines = [f"{len(component):4}  " + ", ".join(graph.name(code) for code in component[:8])
+                         + (", ..." if len(component) > 8 else "") for component in result]
+                lines.append(f"Всего компонент: {len(components)}")
+            lines.append(f"Запрос: {(time.perf_counter() - started) * 1000:.3f} мс")
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return 1
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        print(f"Ошибка загрузки данных: {e}")
+        return 1
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print("\n".join(lines))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
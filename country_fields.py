@@ -0,0 +1,119 @@
+import argparse
+import json
+import time
+
+
+def renders_fields(*fields):
+    """
+    Декоратор для функций отображения: запоминает, какие поля записи они читают.
+    
+    Список полей сохраняется в атрибуте fields функции и используется
+    fields_for() для построения параметра fields= запроса.
+    """
+    def decorator(func):
+        func.fields = tuple(fields)
+        return func
+    return decorator
+
+
+def fields_for(*renderers):
+    """
+    Возвращает минимальный набор полей, нужный всем переданным отображениям.
+    
+    Args:
+        *renderers: функции отображения (с атрибутом fields) или наборы полей
+    
+    Returns:
+        tuple: Отсортированный набор полей или None, если хотя бы одному
+        отображению нужна вся запись
+    """
+    result = set()
+    for renderer in renderers:
+        fields = getattr(renderer, "fields", renderer)
+        if fields is None:
+            return None
+        result.update(fields)
+    return tuple(sorted(result))
+
+
+def fields_params(fields):
+    """
+    Строит параметры запроса для REST Countries API.
+    
+    Args:
+        fields: набор полей или None (вся запись)
+    
+    Returns:
+        dict: {'fields': 'a,b,c'} или None
+    """
+    if not fields:
+        return None
+    return {"fields": ",".join(fields)}
+
+
+def project(country_data, fields):
+    """
+    Оставляет в записи о стране только указанные поля.
+    
+    Args:
+        country_data: словарь с данными о стране
+        fields: набор полей или None (запись возвращается без изменений)
+    
+    Returns:
+        dict: Запись только с нужными полями
+    """
+    if not fields or country_data is None:
+        return country_data
+    return {key: country_data[key] for key in fields if key in country_data}
+
+
+def measure_payload(country, fields):
+    """
+    Сравнивает размер ответа и время разбора JSON без проекции и с проекцией.
+    
+    Args:
+        country: название страны
+        fields: набор полей для проекции
+    
+    Returns:
+        dict: Размеры тел ответов в байтах и время json.loads в миллисекундах
+    """
+    from http_client import get_client
+    
+    url = f"https://restcountries.com/v3.1/name/{country}"
+    client = get_client()
+    report = {"country": country, "fields": list(fields)}
+    for label, params in (("full", None), ("projected", fields_params(fields))):
+        response = client.get(url, params=params, headers={"Cache-Control": "no-cache"})
+        response.raise_for_status()
+        started = time.perf_counter()
+        json.loads(response.content)
+        report[f"{label}_bytes"] = len(response.content)
+        report[f"{label}_parse_ms"] = (time.perf_counter() - started) * 1000
+    report["saved_percent"] = 100 * (1 - report["projected_bytes"] / report["full_bytes"]) if report["full_bytes"] else 0
+    return report
+
+
+def main(argv=None):
+    """
+    Выводит размер ответа для полной и краткой карточки по сравнению с полной записью.
+    """
+    parser = argparse.ArgumentParser(description="Размер ответа REST Countries с проекцией полей")
+    parser.add_argument("country", help="название страны")
+    parser.add_argument("--json", action="store_true", help="вывод в формате JSON")
+    args = parser.parse_args(argv)
+    
+    from country_render import FULL_VIEW_FIELDS, SHORT_VIEW_FIELDS
+    
+    reports = [measure_payload(args.country, fields) for fields in (FULL_VIEW_FIELDS, SHORT_VIEW_FIELDS)]
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+        return
+    for view, report in zip(("полная карточка", "краткая карточка"), reports):
+        print(f"{view}: {report['full_bytes']:,} -> {report['projected_bytes']:,} байт "
+              f"(-{report['saved_percent']:.1f}%), разбор JSON "
+              f"{report['full_parse_ms']:.3f} -> {report['projected_parse_ms']:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+import argparse
+import heapq
+import json
+import math
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from country_snapshot import SNAPSHOT_URL, all_countries, get_snapshot
+
+# Средний радиус Земли (км)
+EARTH_RADIUS_KM = 6371.0088
+
+# Поля записи, нужные геоиндексу
+GEO_FIELDS = ("name", "cca2", "cca3", "latlng", "capital", "capitalInfo")
+
+# Наборы точек: центры стран и столицы
+KINDS = ("country", "capital")
+
+# Сколько точек хранится в листе KD-дерева
+LEAF_SIZE = 8
+
+# Точка индекса: страна и, для столиц, название столицы (для центра страны - None)
+GeoPoint = namedtuple("GeoPoint", ["cca3", "country", "capital", "lat", "lng"])
+
+# Результат запроса: точка и расстояние до нее по поверхности Земли
+GeoResult = namedtuple("GeoResult", ["point", "distance_km"])
+
+
+def unit_vector(lat, lng):
+    """
+    Точка на единичной сфере для широты и долготы в градусах.
+    
+    Raises:
+        ValueError: Если координаты вне допустимых пределов
+    """
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise ValueError(f"Координаты вне допустимых пределов: {lat}, {lng}")
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def chord_to_km(chord):
+    """
+    Расстояние по поверхности Земли для длины хорды единичной сферы.
+    """
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(distance_km):
+    """
+    Длина хорды единичной сферы для расстояния по поверхности Земли.
+    """
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Расстояние между двумя точками по формуле гаверсинусов (км).
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def country_points(country_data):
+    """
+    Точки страны: центр (latlng) и столица (capitalInfo.latlng), если они есть.
+    
+    Returns:
+        dict: {'country': GeoPoint, 'capital': GeoPoint}
+    """
+    cca3 = country_data.get("cca3")
+    name = country_data.get("name", {}).get("common") or cca3
+    points = {}
+    latlng = country_data.get("latlng") or []
+    if cca3 and len(latlng) == 2:
+        points["country"] = GeoPoint(cca3, name, None, float(latlng[0]), float(latlng[1]))
+    capital_latlng = (country_data.get("capitalInfo") or {}).get("latlng") or []
+    if cca3 and len(capital_latlng) == 2:
+        capital = (country_data.get("capital") or [name])[0]
+        points["capital"] = GeoPoint(cca3, name, capital, float(capital_latlng[0]), float(capital_latlng[1]))
+    return points
+
+
+def _squared_distance(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class KDTree:
+    """
+    KD-дерево по точкам единичной сферы в трехмерных координатах.
+    
+    Расстояние по хорде монотонно связано с расстоянием по дуге большого
+    круга, поэтому ближайшие по хорде точки - ближайшие и на поверхности
+    Земли, а поиск в радиусе сводится к поиску в шаре радиуса km_to_chord.
+    
+    Внутренний узел - кортеж (ось, граница, левое поддерево, правое
+    поддерево), лист - список номеров точек (не больше LEAF_SIZE).
+    
+    Args:
+        vectors: последовательность точек (x, y, z)
+    """
+    
+    def __init__(self, vectors):
+        self.vectors = list(vectors)
+        self._root = self._build(list(range(len(self.vectors))))
+    
+    def __len__(self):
+        return len(self.vectors)
+    
+    def _build(self, ids):
+        if len(ids) <= LEAF_SIZE:
+            return ids
+        # Делим по оси с наибольшим разбросом координат
+        spreads = [max(self.vectors[i][axis] for i in ids) - min(self.vectors[i][axis] for i in ids)
+                   for axis in range(3)]
+        axis = spreads.index(max(spreads))
+        ids.sort(key=lambda i: self.vectors[i][axis])
+        middle = len(ids) // 2
+        return (axis, self.vectors[ids[middle]][axis], self._build(ids[:middle]), self._build(ids[middle:]))
+    
+    def nearest(self, vector, k=1):
+        """
+        k ближайших точек.
+        
+        Returns:
+            list: [(квадрат хорды, номер точки)] по возрастанию расстояния
+        """
+        if k <= 0:
+            return []
+        # Куча из k лучших с обратным знаком: в вершине - самая дальняя из них
+        best = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                for i in node:
+                    distance = _squared_distance(vector, self.vectors[i])
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, -i))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, -i))
+                continue
+            axis, split, left, right = node
+            diff = vector[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Дальнее поддерево нужно, только если граница ближе худшего из найденных
+            if len(best) < k or diff * diff < -best[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return sorted((-distance, -i) for distance, i in best)
+    
+    def within(self, vector, radius):
+        """
+        Все точки на расстоянии (по хорде) не больше radius.
+        
+        Returns:
+            list: [(квадрат хорды, номер точки)] по возрастанию расстояния
+        """
+        limit = radius * radius
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                for i in node:
+                    distance = _squared_distance(vector, self.vectors[i])
+                    if distance <= limit:
+                        found.append((distance, i))
+                continue
+            axis, split, left, right = node
+            diff = vector[axis] - split
+            if diff <= radius:
+                stack.append(left)
+            if diff >= -radius:
+                stack.append(right)
+        found.sort()
+        return found
+
+
+class CountryGeoIndex:
+    """
+    Пространственный индекс центров стран и столиц.
+    
+    Для каждого набора точек (KINDS) строится свое KD-дерево; запросы
+    выполняются в памяти, без обращения к сети.
+    
+    Args:
+        points: словарь {набор: [GeoPoint]}
+        codes: словарь {код или название в нижнем регистре: cca3} для resolve
+    """
+    
+    def __init__(self, points, codes=None):
+        self.points = {kind: list(points.get(kind, [])) for kind in KINDS}
+        self._trees = {kind: KDTree(unit_vector(p.lat, p.lng) for p in kind_points)
+                       for kind, kind_points in self.points.items()}
+        self._by_code = {kind: {p.cca3: p for p in kind_points} for kind, kind_points in self.points.items()}
+        self._codes = codes or {}
+    
+    def __len__(self):
+        return len(self.points["country"])
+    
+    @classmethod
+    def from_countries(cls, countries):
+        points = {kind: [] for kind in KINDS}
+        codes = {}
+        for country_data in countries:
+            for kind, point in country_points(country_data).items():
+                points[kind].append(point)
+            cca3 = country_data.get("cca3")
+            if cca3:
+                name = country_data.get("name", {})
+                for key in (cca3, country_data.get("cca2"), name.get("common"), name.get("official")):
+                    if key:
+                        codes.setdefault(key.casefold(), cca3)
+        return cls(points, codes)
+    
+    def _check_kind(self, kind):
+        if kind not in self._trees:
+            raise ValueError(f"Неизвестный набор точек: {kind} (доступны: {', '.join(KINDS)})")
+        return self._trees[kind]
+    
+    def _results(self, kind, found):
+        return [GeoResult(self.points[kind][i], chord_to_km(math.sqrt(distance))) for distance, i in found]
+    
+    def nearest(self, lat, lng, k=5, kind="country"):
+        """
+        k ближайших к точке стран (kind='country') или столиц (kind='capital').
+        
+        Returns:
+            list: GeoResult по возрастанию расстояния
+        
+        Raises:
+            ValueError: Если координаты вне пределов или набор точек неизвестен
+        """
+        tree = self._check_kind(kind)
+        return self._results(kind, tree.nearest(unit_vector(lat, lng), k))
+    
+    def within(self, lat, lng, radius_km, kind="country"):
+        """
+        Все страны (или столицы) не дальше radius_km от точки.
+        
+        Returns:
+            list: GeoResult по возрастанию расстояния
+        
+        Raises:
+            ValueError: Если координаты вне пределов или набор точек неизвестен
+        """
+        tree = self._check_kind(kind)
+        return self._results(kind, tree.within(unit_vector(lat, lng), km_to_chord(max(0.0, radius_km))))
+    
+    def locate(self, lat, lng):
+        """
+        Обратный поиск: страна, ближайшая к точке.
+        
+        Учитываются и центры стран, и столицы: для точки рядом со столицей
+        большой страны ее столица ближе, чем центры соседей.
+        
+        Returns:
+            GeoResult: Ближайшая точка (или None, если индекс пуст)
+        """
+        candidates = [result for kind in KINDS for result in self.nearest(lat, lng, 1, kind)]
+        return min(candidates, key=lambda result: result.distance_km, default=None)
+    
+    def point(self, cca3, kind="country"):
+        """
+        Точка страны по коду cca3 (или None).
+        """
+        self._check_kind(kind)
+        return self._by_code[kind].get(cca3.upper())
+    
+    def neighbours(self, cca3, k=5, kind="country"):
+        """
+        k ближайших к стране (или ее столице) других стран (столиц).
+        
+        Returns:
+            list: GeoResult по возрастанию расстояния
+        
+        Raises:
+            ValueError: Если для страны нет координат
+        """
+        origin = self.point(cca3, kind)
+        if origin is None:
+            raise ValueError(f"Нет координат для {cca3}")
+        results = self.nearest(origin.lat, origin.lng, k + 1, kind)
+        return [result for result in results if result.point.cca3 != origin.cca3][:k]
+    
+    def resolve(self, query):
+        """
+        Код cca3 по коду или названию страны (без учета регистра, затем
+        через локальный поиск с опечатками).
+        
+        Returns:
+            str: cca3 или None
+        """
+        cca3 = self._codes.get(query.strip().casefold())
+        if cca3 is not None:
+            return cca3
+        from country_search import resolve_country_code
+        
+        return resolve_country_code(query)
+
+
+def load_countries():
+    """
+    Записи стран с координатами: из локального снимка (любого возраста)
+    или, если его нет, одним запросом /all только с нужными полями.
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    return all_countries(GEO_FIELDS)
+
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def get_geo_index():
+    """
+    Возвращает геоиндекс, построенный по локальному снимку стран (или по
+    данным, загруженным один раз из API, если снимка нет).
+    
+    Returns:
+        CountryGeoIndex: Индекс
+    
+    Raises:
+        requests.exceptions.RequestException: Если снимка нет, а загрузка не удалась
+    """
+    global _index, _index_source
+    snapshot = get_snapshot(max_age=float("inf"))
+    source = snapshot if snapshot is not None else SNAPSHOT_URL
+    if _index is None or _index_source is not source:
+        with _index_lock:
+            if _index is None or _index_source is not source:
+                _index = CountryGeoIndex.from_countries(load_countries())
+                _index_source = source
+    return _index
+
+
+def _describe_point(point):
+    if point.capital is None:
+        return f"{point.country} ({point.cca3})"
+    return f"{point.capital} - {point.country} ({point.cca3})"
+
+
+def main(argv=None):
+    """
+    Ближайшие страны, страны в радиусе и обратный поиск страны по координатам.
+    
+    Returns:
+        int: 0 или 1, если страна не найдена или данные загрузить не удалось
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--capitals", action="store_true", help="искать по столицам, а не по центрам стран")
+    common.add_argument("--json", action="store_true", help="вывод в формате JSON")
+    
+    parser = argparse.ArgumentParser(description="Геопоиск по странам и столицам")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="запрос")
+    
+    near_command = commands.add_parser("near", parents=[common], help="ближайшие к стране страны")
+    near_command.add_argument("country", help="название или код страны")
+    near_command.add_argument("-k", type=int, default=5, help="число результатов")
+    
+    nearest_command = commands.add_parser("nearest", parents=[common], help="ближайшие к точке страны")
+    nearest_command.add_argument("lat", type=float)
+    nearest_command.add_argument("lng", type=float)
+    nearest_command.add_argument("-k", type=int, default=5, help="число результатов")
+    
+    within_command = commands.add_parser("within", parents=[common], help="страны в радиусе от точки")
+    within_command.add_argument("lat", type=float)
+    within_command.add_argument("lng", type=float)
+    within_command.add_argument("-r", "--radius", type=float, default=1000, help="радиус, км")
+    
+    locate_command = commands.add_parser("locate", parents=[common], help="страна, ближайшая к точке")
+    locate_command.add_argument("lat", type=float)
+    locate_command.add_argument("lng", type=float)
+    args = parser.parse_args(argv)
+    
+    kind = "capital" if args.capitals else "country"
+    try:
+        index = get_geo_index()
+        if args.command == "near":
+            cca3 = index.resolve(args.country)
+            if cca3 is None:
+                print(f"Страна не найдена: {args.country}")
+                return 1
+        started = time.perf_counter()
+        if args.command == "near":
+            results = index.neighbours(cca3, args.k, kind)
+        elif args.command == "nearest":
+            results = index.nearest(args.lat, args.lng, args.k, kind)
+        elif args.command == "within":
+            results = index.within(args.lat, args.lng, args.radius, kind)
+        else:
+            results = [result for result in [index.locate(args.lat, args.lng)] if result is not None]
+        elapsed = time.perf_counter() - started
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return 1
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        print(f"Ошибка загрузки данных: {e}")
+        return 1
+    
+    if args.json:
+        print(json.dumps([{**result.point._asdict(), "distance_km": round(result.distance_km, 1)}
+                          for result in results], ensure_ascii=False, indent=2))
+        return 0
+    if not results:
+        print("Ничего не найдено")
+    for result in results:
+        print(f"{result.distance_km:10.1f} км  {_describe_point(result.point)}")
+    print(f"Запрос: {elapsed * 1000:.3f} мс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
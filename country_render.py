@@ -0,0 +1,333 @@
+import os
+import sys
+from string import Formatter
+
+from colorama import Fore, Style
+from colorama.ansitowin32 import StreamWrapper
+
+from country_fields import fields_for, renders_fields
+
+# Цвета элементов карточки для вывода в терминал
+COLOR_PALETTE = {
+    "title": Fore.CYAN + Style.BRIGHT,
+    "label": Fore.YELLOW + Style.BRIGHT,
+    "sublabel": Fore.YELLOW,
+    "section": Fore.GREEN + Style.BRIGHT,
+    "value": Fore.WHITE,
+    "link": Fore.BLUE,
+    "ok": Fore.GREEN,
+    "error": Fore.RED,
+    "reset": Style.RESET_ALL,
+}
+
+# Для вывода в файл или канал цвета не нужны
+PLAIN_PALETTE = {name: "" for name in COLOR_PALETTE}
+
+NOT_SPECIFIED = "Не указано"
+
+FULL_WIDTH = 70
+SHORT_WIDTH = 50
+
+
+def format_currency(currencies):
+    """
+    Форматирует информацию о валютах.
+    """
+    if not currencies:
+        return NOT_SPECIFIED
+    result = []
+    for code, info in currencies.items():
+        result.append(f"{code} - {info.get('name', '')} ({info.get('symbol', '')})")
+    return ", ".join(result)
+
+
+def format_languages(languages):
+    """
+    Форматирует информацию о языках.
+    """
+    if not languages:
+        return NOT_SPECIFIED
+    return ", ".join(languages.values())
+
+
+def format_list(items):
+    """
+    Форматирует список в строку.
+    """
+    if not items:
+        return NOT_SPECIFIED
+    if isinstance(items, list):
+        return ", ".join(str(item) for item in items)
+    return str(items)
+
+
+def compile_template(template, palette):
+    """
+    Подставляет в шаблон цвета палитры, оставляя поля данных для str.format.
+    
+    Args:
+        template: шаблон вида "{label}Регион:{reset} {value}{region}"
+        palette: словарь {имя цвета: escape-последовательность}
+    
+    Returns:
+        str: Шаблон, в котором остались только поля данных
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field in palette:
+            parts.append(palette[field])
+        else:
+            parts.append("{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+    return "".join(parts)
+
+
+class CardTemplates:
+    """
+    Набор шаблонов строк карточки, скомпилированных для цветного и простого вывода.
+    
+    Args:
+        templates: словарь {имя строки: шаблон с полями цветов и данных}
+    """
+    
+    def __init__(self, templates):
+        self.color = {name: compile_template(t, COLOR_PALETTE) for name, t in templates.items()}
+        self.plain = {name: compile_template(t, PLAIN_PALETTE) for name, t in templates.items()}
+    
+    def select(self, color):
+        return self.color if color else self.plain
+
+
+_COMMON_TEMPLATES = {
+    "no_data": "{error}Нет данных для отображения{reset}\n",
+    "status": "{label}HTTP Status Code:{reset} {status_color}{status_code}{reset}\n\n",
+    "status_ok": "{ok}",
+    "status_error": "{error}",
+}
+
+FULL_CARD = CardTemplates({
+    **_COMMON_TEMPLATES,
+    "header": "\n{title}" + "=" * FULL_WIDTH + "{reset}\n"
+              "{title}{name:^" + str(FULL_WIDTH) + "}{reset}\n"
+              "{title}" + "=" * FULL_WIDTH + "{reset}\n\n",
+    "main": "{label}Официальное название:{reset} {value}{official_name}{reset}\n"
+            "{label}Регион:{reset} {value}{region}{reset}\n"
+            "{label}Подрегион:{reset} {value}{subregion}{reset}\n"
+            "{label}Континент:{reset} {value}{continents}{reset}\n",
+    "geo": "\n{section}Географическая информация:{reset}\n",
+    "coordinates": "  {sublabel}Координаты:{reset} {value}Широта: {lat}, Долгота: {lng}{reset}\n",
+    "geo_details": "  {sublabel}Площадь:{reset} {value}{area}{reset}\n"
+                   "  {sublabel}Граничит с:{reset} {value}{borders}{reset}\n"
+                   "  {sublabel}Выход к морю:{reset} {value}{sea_access}{reset}\n",
+    "demography": "\n{section}Демографическая информация:{reset}\n"
+                  "  {sublabel}Население:{reset} {value}{population}{reset}\n",
+    "gini": "  {sublabel}Коэффициент Джини ({gini_year}):{reset} {value}{gini_value}{reset}\n",
+    "politics": "\n{section}Политическая информация:{reset}\n"
+                "  {sublabel}Столица:{reset} {value}{capital}{reset}\n",
+    "capital_coordinates": "  {sublabel}Координаты столицы:{reset} {value}Широта: {lat}, Долгота: {lng}{reset}\n",
+    "politics_details": "  {sublabel}Независимость:{reset} {value}{independent}{reset}\n"
+                        "  {sublabel}Член ООН:{reset} {value}{un_member}{reset}\n",
+    "economy_culture_codes": "\n{section}Экономическая информация:{reset}\n"
+                             "  {sublabel}Валюта:{reset} {value}{currency}{reset}\n"
+                             "\n{section}Культурная информация:{reset}\n"
+                             "  {sublabel}Языки:{reset} {value}{languages}{reset}\n"
+                             "\n{section}Коды и идентификаторы:{reset}\n"
+                             "  {sublabel}ISO 3166-1 alpha-2:{reset} {value}{cca2}{reset}\n"
+                             "  {sublabel}ISO 3166-1 alpha-3:{reset} {value}{cca3}{reset}\n"
+                             "  {sublabel}Телефонный код:{reset} {value}{phone}{reset}\n",
+    "timezones": "  {sublabel}Часовые пояса:{reset} {value}{timezones}{reset}\n",
+    "start_of_week": "  {sublabel}Начало недели:{reset} {value}{start_of_week}{reset}\n",
+    "links": "\n{section}Ссылки:{reset}\n",
+    "google_maps": "  {sublabel}Google Maps:{reset} {link}{url}{reset}\n",
+    "open_street_map": "  {sublabel}OpenStreetMap:{reset} {link}{url}{reset}\n",
+    "footer": "\n{title}" + "=" * FULL_WIDTH + "{reset}\n\n",
+})
+
+SHORT_CARD = CardTemplates({
+    **_COMMON_TEMPLATES,
+    "header": "\n{title}" + "=" * SHORT_WIDTH + "{reset}\n"
+              "{title}{name:^" + str(SHORT_WIDTH) + "}{reset}\n"
+              "{title}" + "=" * SHORT_WIDTH + "{reset}\n\n",
+    "body": "{label}Столица:{reset} {value}{capital}{reset}\n"
+            "{label}Население:{reset} {value}{population}{reset}\n"
+            "{label}Валюта:{reset} {value}{currency}{reset}\n",
+    "footer": "\n{title}" + "=" * SHORT_WIDTH + "{reset}\n\n",
+})
+
+
+def _status_line(templates, status_code):
+    if status_code is None:
+        return ""
+    status_color = templates["status_ok"] if 200 <= status_code < 300 else templates["status_error"]
+    return templates["status"].format(status_color=status_color, status_code=status_code)
+
+
+@renders_fields("name", "region", "subregion", "continents", "latlng", "area", "borders", "landlocked",
+                "population", "gini", "capital", "capitalInfo", "independent", "unMember", "currencies",
+                "languages", "cca2", "cca3", "idd", "timezones", "startOfWeek", "maps")
+def render_country_card(country_data, status_code=None, color=True, border_names=None):
+    """
+    Собирает полную карточку страны в одну строку.
+    
+    Args:
+        country_data: словарь с данными о стране
+        status_code: HTTP статус код ответа
+        color: добавлять ли цветовые escape-последовательности
+        border_names: словарь {cca3: название} для соседей (без него выводятся коды)
+    
+    Returns:
+        str: Готовый текст карточки
+    """
+    t = FULL_CARD.select(color)
+    if not country_data:
+        return t["no_data"]
+    get = country_data.get
+    name = get("name", {})
+    parts = [
+        t["header"].format(name=name.get("common", "Неизвестно").upper()),
+        _status_line(t, status_code),
+        t["main"].format(
+            official_name=name.get("official", "Неизвестно"),
+            region=get("region", NOT_SPECIFIED),
+            subregion=get("subregion", NOT_SPECIFIED),
+            continents=format_list(get("continents", [])),
+        ),
+        t["geo"],
+    ]
+    
+    latlng = get("latlng", [])
+    if latlng and len(latlng) >= 2:
+        parts.append(t["coordinates"].format(lat=latlng[0], lng=latlng[1]))
+    area = get("area")
+    borders = get("borders", [])
+    if borders and border_names:
+        borders = [border_names.get(code, code) for code in borders]
+    parts.append(t["geo_details"].format(
+        area=f"{area:,} км²" if area else NOT_SPECIFIED,
+        borders=format_list(borders),
+        sea_access="Нет" if get("landlocked", False) else "Да",
+    ))
+    
+    population = get("population", 0)
+    parts.append(t["demography"].format(population=f"{population:,} человек" if population else NOT_SPECIFIED))
+    gini = get("gini", {})
+    if gini:
+        gini_year, gini_value = next(iter(gini.items()))
+        if gini_year and gini_value:
+            parts.append(t["gini"].format(gini_year=gini_year, gini_value=gini_value))
+    
+    parts.append(t["politics"].format(capital=format_list(get("capital", []))))
+    capital_latlng = get("capitalInfo", {}).get("latlng")
+    if capital_latlng:
+        parts.append(t["capital_coordinates"].format(lat=capital_latlng[0], lng=capital_latlng[1]))
+    parts.append(t["politics_details"].format(
+        independent="Да" if get("independent", False) else "Нет",
+        un_member="Да" if get("unMember", False) else "Нет",
+    ))
+    
+    idd = get("idd", {})
+    suffixes = idd.get("suffixes")
+    parts.append(t["economy_culture_codes"].format(
+        currency=format_currency(get("currencies", {})),
+        languages=format_languages(get("languages", {})),
+        cca2=get("cca2", NOT_SPECIFIED),
+        cca3=get("cca3", NOT_SPECIFIED),
+        phone=f"{idd.get('root', '')}{suffixes[0] if suffixes else ''}",
+    ))
+    if get("timezones"):
+        parts.append(t["timezones"].format(timezones=format_list(get("timezones"))))
+    if get("startOfWeek"):
+        parts.append(t["start_of_week"].format(start_of_week=get("startOfWeek").capitalize()))
+    
+    maps = get("maps", {})
+    if maps:
+        parts.append(t["links"])
+        if maps.get("googleMaps"):
+            parts.append(t["google_maps"].format(url=maps["googleMaps"]))
+        if maps.get("openStreetMaps"):
+            parts.append(t["open_street_map"].format(url=maps["openStreetMaps"]))
+    
+    parts.append(t["footer"])
+    return "".join(parts)
+
+
+@renders_fields("name", "capital", "population", "currencies")
+def render_short_card(country_data, status_code=None, color=True):
+    """
+    Собирает краткую карточку страны (столица, население, валюта) в одну строку.
+    
+    Args:
+        country_data: словарь с данными о стране
+        status_code: HTTP статус код ответа
+        color: добавлять ли цветовые escape-последовательности
+    
+    Returns:
+        str: Готовый текст карточки
+    """
+    t = SHORT_CARD.select(color)
+    if not country_data:
+        return t["no_data"]
+    get = country_data.get
+    capital = get("capital", [])
+    population = get("population", 0)
+    return "".join((
+        t["header"].format(name=get("name", {}).get("common", "Неизвестно").upper()),
+        _status_line(t, status_code),
+        t["body"].format(
+            capital=capital[0] if capital else NOT_SPECIFIED,
+            population=f"{population:,} человек" if population else NOT_SPECIFIED,
+            currency=format_currency(get("currencies", {})),
+        ),
+        t["footer"],
+    ))
+
+
+# Поля записи, которые запрашиваются для карточек: ровно те, что читают
+# функции отображения (объявлены декоратором renders_fields)
+FULL_VIEW_FIELDS = fields_for(render_country_card)
+SHORT_VIEW_FIELDS = fields_for(render_short_card)
+
+
+def _unwrap(stream):
+    # colorama.init() подменяет sys.stdout на StreamWrapper, который после
+    # каждой записи добавляет сброс цвета; карточка уже содержит сбросы,
+    # поэтому она пишется прямо в исходный stdout процесса. Другие потоки
+    # (файл, канал, перенаправленный stdout) не трогаются
+    if stream is sys.stdout and isinstance(stream, StreamWrapper) and sys.__stdout__ is not None:
+        return sys.__stdout__
+    return stream
+
+
+def use_color(stream=None):
+    """
+    Нужен ли цветной вывод: только для терминала и без переменной NO_COLOR.
+    """
+    stream = stream or sys.stdout
+    if os.environ.get("NO_COLOR"):
+        return False
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty())
+
+
+def write_card(text, stream=None, color=False):
+    """
+    Выводит готовую карточку одним вызовом write.
+    
+    На Windows цветной вывод идет через colorama (для преобразования
+    escape-последовательностей), в остальных случаях - напрямую в поток.
+    """
+    stream = stream or sys.stdout
+    if not (color and os.name == "nt"):
+        stream = _unwrap(stream)
+    stream.write(text)
+
+
+def display_card(render, country_data, status_code=None, stream=None):
+    """
+    Рендерит карточку функцией render и выводит ее в stream (по умолчанию stdout).
+    """
+    stream = stream or sys.stdout
+    color = use_color(stream)
+    write_card(render(country_data, status_code, color), stream, color)
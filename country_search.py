@@ -0,0 +1,302 @@
+import argparse
+import threading
+import unicodedata
+from collections import Counter, defaultdict, namedtuple
+
+from country_snapshot import get_snapshot
+
+# Результат поиска: код страны, совпавшее написание и оценка (меньше - лучше)
+SearchResult = namedtuple("SearchResult", ["cca3", "name", "score"])
+
+# Оценки типов совпадений; для нечетких к SCORE_FUZZY прибавляется расстояние
+SCORE_EXACT = 0
+SCORE_PREFIX = 1
+SCORE_FUZZY = 2
+
+# Сколько кандидатов по n-граммам проверяется расстоянием редактирования
+FUZZY_CANDIDATES = 40
+
+_TERMINAL = None
+
+
+def normalize(text):
+    """
+    Приводит название к виду для поиска: нижний регистр, без диакритики,
+    с одиночными пробелами.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Расстояние Левенштейна между строками.
+    
+    Args:
+        a, b: сравниваемые строки
+        max_distance: если задано, расчет прекращается, как только расстояние
+            гарантированно превысит это значение
+    
+    Returns:
+        int: Расстояние (или max_distance + 1 при досрочном выходе)
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, 1):
+        current = [i]
+        for j, ch_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch_a != ch_b)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def country_names(country_data):
+    """
+    Возвращает все написания страны: общее и официальное название,
+    названия на родных языках, переводы и альтернативные написания.
+    """
+    name = country_data.get("name", {})
+    names = [name.get("common"), name.get("official")]
+    for native in name.get("nativeName", {}).values():
+        names.extend((native.get("common"), native.get("official")))
+    for translation in country_data.get("translations", {}).values():
+        names.extend((translation.get("common"), translation.get("official")))
+    names.extend(country_data.get("altSpellings", []))
+    names.extend(country_data.get(code) for code in ("cca2", "cca3", "ccn3"))
+    return [value for value in names if value]
+
+
+class CountrySearchIndex:
+    """
+    Локальный индекс для префиксного и нечеткого поиска стран по названию.
+    
+    Префиксный поиск идет по префиксному дереву (trie), в которое добавлены
+    названия целиком и их окончания с каждого слова ("korea" находит
+    "North Korea"). Нечеткий поиск отбирает кандидатов по общим триграммам
+    и ранжирует их расстоянием Левенштейна.
+    """
+    
+    def __init__(self):
+        self._names = []
+        self._exact = {}
+        self._trie = {}
+        self._grams = defaultdict(set)
+    
+    def __len__(self):
+        return len(self._names)
+    
+    @classmethod
+    def from_countries(cls, countries):
+        index = cls()
+        for country_data in countries:
+            cca3 = country_data.get("cca3")
+            if not cca3:
+                continue
+            for name in country_names(country_data):
+                index.add(name, cca3)
+        return index
+    
+    def add(self, name, cca3):
+        """
+        Добавляет написание страны в индекс.
+        
+        Args:
+            name: название или код
+            cca3: код ISO 3166-1 alpha-3 страны
+        """
+        key = normalize(name)
+        if not key or self._exact.get(key) == cca3:
+            return
+        # При совпадении написаний побеждает первая добавленная страна
+        self._exact.setdefault(key, cca3)
+        name_id = len(self._names)
+        self._names.append((key, name, cca3))
+        
+        words = key.split(" ")
+        for start in range(len(words)):
+            node = self._trie
+            for ch in " ".join(words[start:]):
+                node = node.setdefault(ch, {})
+            node.setdefault(_TERMINAL, []).append(name_id)
+        
+        for gram in trigrams(key):
+            self._grams[gram].add(name_id)
+    
+    def prefix(self, query, limit=10):
+        """
+        Ищет написания, начинающиеся с query (или слово которых начинается с query).
+        
+        Returns:
+            list: SearchResult, более короткие совпадения первыми
+        """
+        node = self._trie
+        for ch in normalize(query):
+            node = node.get(ch)
+            if node is None:
+                return []
+        results = []
+        seen = set()
+        level = [node]
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                for key, child in current.items():
+                    if key is _TERMINAL:
+                        for name_id in child:
+                            if name_id not in seen:
+                                seen.add(name_id)
+                                _, name, cca3 = self._names[name_id]
+                                results.append(SearchResult(cca3, name, SCORE_PREFIX))
+                    else:
+                        next_level.append(child)
+            level = next_level
+        return results[:limit]
+    
+    def fuzzy(self, query, limit=10, max_distance=None):
+        """
+        Ищет написания с опечатками.
+        
+        Args:
+            query: искомая строка
+            limit: максимальное число результатов
+            max_distance: допустимое расстояние Левенштейна (по умолчанию
+                зависит от длины запроса)
+        
+        Returns:
+            list: SearchResult, отсортированные по расстоянию
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(key) // 3)
+        counts = Counter()
+        for gram in trigrams(key):
+            counts.update(self._grams.get(gram, ()))
+        results = []
+        for name_id, _ in counts.most_common(FUZZY_CANDIDATES):
+            candidate, name, cca3 = self._names[name_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                results.append(SearchResult(cca3, name, SCORE_FUZZY + distance))
+        results.sort(key=lambda result: (result.score, len(result.name)))
+        return results[:limit]
+    
+    def search(self, query, limit=5):
+        """
+        Ранжированный поиск: точные совпадения, затем префиксные, затем нечеткие.
+        Каждая страна встречается в результатах один раз.
+        
+        Returns:
+            list: SearchResult, лучшие первыми
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        candidates = []
+        exact = self._exact.get(key)
+        if exact:
+            candidates.append(SearchResult(exact, query, SCORE_EXACT))
+        candidates.extend(self.prefix(key, limit * 4))
+        candidates.extend(self.fuzzy(key, limit * 4))
+        
+        best = {}
+        for result in candidates:
+            current = best.get(result.cca3)
+            if current is None or (result.score, len(result.name)) < (current.score, len(current.name)):
+                best[result.cca3] = result
+        ranked = sorted(best.values(), key=lambda result: (result.score, len(result.name)))
+        return ranked[:limit]
+    
+    def resolve(self, query):
+        """
+        Однозначно определяет код страны по названию.
+        
+        Returns:
+            str: cca3, если совпадение точное или лучший кандидат однозначен,
+            иначе None
+        """
+        results = self.search(query, limit=2)
+        if not results:
+            return None
+        top = results[0]
+        if top.score == SCORE_EXACT:
+            return top.cca3
+        if len(results) > 1 and results[1].score <= top.score:
+            return None
+        return top.cca3
+
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Возвращает индекс поиска, построенный по локальному снимку стран.
+    
+    Для поиска по названиям возраст снимка не важен, поэтому используется
+    и устаревший снимок.
+    
+    Returns:
+        CountrySearchIndex: Индекс или None, если снимка нет
+    """
+    global _index, _index_source
+    snapshot = get_snapshot(max_age=float("inf"))
+    if snapshot is None:
+        return None
+    if _index_source is not snapshot:
+        with _index_lock:
+            if _index_source is not snapshot:
+                _index = CountrySearchIndex.from_countries(snapshot.countries)
+                _index_source = snapshot
+    return _index
+
+
+def resolve_country_code(country):
+    """
+    Определяет cca3 страны по названию без обращения к сети.
+    
+    Returns:
+        str: cca3 или None (нет снимка или название неоднозначно)
+    """
+    index = get_search_index()
+    if index is None:
+        return None
+    return index.resolve(country)
+
+
+def main(argv=None):
+    """
+    Поиск стран по префиксу или с опечатками в локальном индексе.
+    """
+    parser = argparse.ArgumentParser(description="Локальный поиск стран по названию")
+    parser.add_argument("query", help="название, префикс или название с опечаткой")
+    parser.add_argument("-n", "--limit", type=int, default=5, help="число результатов")
+    args = parser.parse_args(argv)
+    
+    index = get_search_index()
+    if index is None:
+        print("Снимок стран не найден (python country_snapshot.py --update)")
+        return
+    results = index.search(args.query, limit=args.limit)
+    if not results:
+        print("Ничего не найдено")
+    for result in results:
+        print(f"{result.cca3}  {result.name}  (оценка {result.score})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import threading
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from colorama import Fore
+
+from http_metrics import REGISTRY
+from country_borders import border_names, remember_names
+from country_snapshot import lookup_country
+from country_search import resolve_country_code
+from country_fields import fields_params, project
+from country_render import FULL_VIEW_FIELDS
+
+# Базовый URL REST Countries API
+COUNTRY_API_URL = "https://restcountries.com/v3.1"
+
+REGISTRY.describe("country_lookups_total", "Поиск страны по источнику: snapshot, prefetch или network")
+REGISTRY.describe("country_fetch_coalesced_total", "Запросы стран, присоединенные к уже идущему запросу")
+
+# Поля соседних стран, загружаемых заранее: полная карточка и ключи
+# для поиска по названию. Ограничение числа полей (MAX_FIELDS_PER_REQUEST)
+# действует только для /all, поэтому /alpha запрашивается одним запросом
+PREFETCH_FIELDS = tuple(sorted(set(FULL_VIEW_FIELDS) | {"altSpellings"}))
+
+# Сколько стран держит кэш упреждающей загрузки
+PREFETCH_MAX_ENTRIES = 64
+
+# Сколько карточка ждет названия соседей из упреждающей загрузки (секунды)
+PREFETCH_WAIT = 5.0
+
+_flight = None
+_flight_lock = threading.Lock()
+_prefetch = None
+
+
+def _get_flight():
+    # HTTP-клиент (и requests) загружается при первом запросе к API, поэтому
+    # страны из локального снимка выводятся без импорта сетевых модулей
+    global _flight
+    if _flight is None:
+        from http_client import SingleFlight
+        
+        with _flight_lock:
+            if _flight is None:
+                _flight = SingleFlight()
+    return _flight
+
+
+def _get_prefetch():
+    global _prefetch
+    if _prefetch is None:
+        from http_prefetch import PrefetchCache
+        
+        with _flight_lock:
+            if _prefetch is None:
+                _prefetch = PrefetchCache(PREFETCH_MAX_ENTRIES)
+    return _prefetch
+
+
+def _country_aliases(country_data):
+    name = country_data.get("name") or {}
+    return [country_data.get("cca2"), name.get("common"), name.get("official"),
+            *(country_data.get("altSpellings") or [])]
+
+
+def _fetch_codes(codes):
+    from http_client import get_client
+    
+    params = {"codes": ",".join(codes), **fields_params(PREFETCH_FIELDS)}
+    response = get_client().get(f"{COUNTRY_API_URL}/alpha", params=params)
+    REGISTRY.inc("country_lookups_total", view="prefetch", source="network")
+    response.raise_for_status()
+    countries = [item for item in response.json() if item.get("cca3")]
+    # Те же записи дают названия соседей для карточки: отдельный запрос
+    # /alpha?codes=...&fields=name,cca3 не нужен
+    remember_names(countries)
+    return {country_data["cca3"]: country_data for country_data in countries}
+
+
+def prefetch_neighbours(country_data):
+    """
+    Заранее загружает в фоне соседние страны (поле borders) одним
+    запросом /alpha?codes=..., пока пользователь читает карточку: следующий поиск соседа берет запись
+    из кэша без обращения к сети. Названия соседей из этих записей
+    запоминаются для карточки (см. load_neighbours).
+    
+    Ничего не делает, если есть свежий локальный снимок (соседи и так
+    ищутся без сети). Не начатая загрузка для прошлой карточки отменяется.
+    
+    Args:
+        country_data: словарь с данными о показанной стране
+    
+    Returns:
+        concurrent.futures.Future: Загрузка или None, если она не нужна
+    """
+    from country_snapshot import get_snapshot
+    
+    codes = (country_data or {}).get("borders") or []
+    if not codes or get_snapshot() is not None:
+        return None
+    return _get_prefetch().schedule(codes, _fetch_codes, _country_aliases)
+
+
+def load_neighbours(country_data, wait=PREFETCH_WAIT):
+    """
+    Названия соседей для полной карточки и упреждающая загрузка соседей
+    одной загрузкой.
+    
+    Запускается prefetch_neighbours, и названия берутся из загруженных ею
+    записей (ждется не больше wait секунд), поэтому одни и те же коды не
+    запрашиваются дважды. Если есть локальный снимок, названия берутся из
+    него без сети; недостающие названия запрашивает border_names.
+    
+    Args:
+        country_data: словарь с данными о показанной стране
+        wait: сколько ждать упреждающую загрузку (секунды)
+    
+    Returns:
+        dict: {cca3: название} для render_country_card
+    """
+    future = prefetch_neighbours(country_data)
+    if future is not None:
+        try:
+            future.result(timeout=wait)
+        except (CancelledError, FutureTimeoutError):
+            pass
+    return border_names(country_data)
+
+
+def cancel_prefetch():
+    """
+    Отменяет еще не начатые упреждающие загрузки (например, при выходе из меню).
+    """
+    if _prefetch is not None:
+        _prefetch.close()
+
+
+def _prefetched(key, fields):
+    # Запись из упреждающей загрузки годится, только если в ней есть все поля
+    if _prefetch is None or not fields or not set(fields) <= set(PREFETCH_FIELDS):
+        return None
+    return project(_prefetch.get(key), fields)
+
+
+def _request_country(url, fields, view):
+    import requests
+    from http_client import get_client
+    
+    try:
+        response = get_client().get(url, params=fields_params(fields))
+        REGISTRY.inc("country_lookups_total", view=view, source="network")
+        status_code = response.status_code
+        if status_code == 200:
+            with REGISTRY.timer("country_json_parse_seconds", view=view):
+                data = response.json()
+            # API возвращает список, берем первый элемент
+            if isinstance(data, list) and len(data) > 0:
+                return (status_code, data[0])
+            return (status_code, data)
+        else:
+            print(f"{Fore.RED}Ошибка: Статус код {status_code}")
+            return (status_code, None)
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Ошибка при запросе: {e}")
+        return (None, None)
+
+
+def fetch_country(country: str, fields=FULL_VIEW_FIELDS, view="full"):
+    """
+    Получает информацию о стране: из локального снимка или через API.
+    
+    Сначала страна ищется в локальном снимке (country_snapshot), запрос
+    к API выполняется только если снимка нет, он устарел или страна не найдена.
+    Неполные названия и опечатки по возможности заранее сводятся к коду cca3
+    локальным поиском (country_search), и тогда запрашивается /alpha/{cca3}.
+    
+    Соседи последней показанной страны могут быть уже загружены заранее
+    (prefetch_neighbours) - тогда запись берется из кэша упреждающей загрузки.
+    
+    Одновременные запросы одной и той же страны с одинаковым набором полей
+    (из разных потоков) объединяются: к API уходит один запрос, а все
+    вызывающие получают его результат (общий словарь - не изменяйте его).
+    
+    Args:
+        country: Название страны
+        fields: поля записи, которые нужно запросить (None - вся запись)
+        view: вид карточки для меток метрик ('full' или 'short')
+    
+    Returns:
+        tuple: (status_code, data) - статус код и данные о стране, или (None, None) в случае ошибки
+    """
+    country_data = lookup_country(country)
+    if country_data is not None:
+        REGISTRY.inc("country_lookups_total", view=view, source="snapshot")
+        return (200, project(country_data, fields))
+    
+    code = resolve_country_code(country)
+    if code:
+        country_data = lookup_country(code)
+        if country_data is not None:
+            REGISTRY.inc("country_lookups_total", view=view, source="snapshot")
+            return (200, project(country_data, fields))
+        url = f"{COUNTRY_API_URL}/alpha/{code}"
+    else:
+        url = f"{COUNTRY_API_URL}/name/{country}"
+    
+    country_data = _prefetched(code or country, fields)
+    if country_data is not None:
+        REGISTRY.inc("country_lookups_total", view=view, source="prefetch")
+        return (200, country_data)
+    
+    key = (url.lower(), tuple(fields) if fields else None)
+    result, shared = _get_flight().do(key, _request_country, url, fields, view)
+    if shared:
+        REGISTRY.inc("country_fetch_coalesced_total", view=view)
+    return result
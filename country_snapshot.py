@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from country_render import FULL_VIEW_FIELDS
+
+# Источник полного набора данных о странах
+SNAPSHOT_URL = "https://restcountries.com/v3.1/all"
+
+# Больше полей API /all за один запрос не принимает (без fields= - отказ)
+MAX_FIELDS_PER_REQUEST = 10
+
+# Поля записей снимка: все, что выводит полная карточка, и ключи поиска
+# (коды, альтернативные написания, переводы названий)
+SNAPSHOT_FIELDS = tuple(sorted(set(FULL_VIEW_FIELDS) | {"ccn3", "altSpellings", "translations"}))
+
+# Файл снимка по умолчанию (можно переопределить переменной окружения)
+DEFAULT_SNAPSHOT_PATH = os.environ.get("COUNTRY_SNAPSHOT_PATH", ".country_snapshot.json")
+
+# Через сколько секунд снимок считается устаревшим (7 дней)
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _normalize(value):
+    return " ".join(str(value).split()).casefold()
+
+
+def index_keys(country_data):
+    """
+    Возвращает все ключи, по которым страна ищется в индексе.
+    
+    Args:
+        country_data: словарь с данными о стране
+    
+    Returns:
+        set: Нормализованные (casefold) названия и коды страны
+    """
+    name = country_data.get("name", {})
+    values = [name.get("common"), name.get("official")]
+    values.extend(country_data.get(code) for code in ("cca2", "cca3", "ccn3"))
+    values.extend(country_data.get("altSpellings", []))
+    return {_normalize(value) for value in values if value}
+
+
+def field_groups(fields, size=MAX_FIELDS_PER_REQUEST):
+    """
+    Делит поля на группы для запросов /all: не больше size полей в группе,
+    в каждой есть cca3 - по нему записи групп объединяются.
+    
+    Returns:
+        list: Кортежи полей
+    """
+    rest = [field for field in dict.fromkeys(fields) if field != "cca3"]
+    step = size - 1
+    return [("cca3",) + tuple(rest[i:i + step]) for i in range(0, len(rest), step)] or [("cca3",)]
+
+
+def fetch_all(fields, url=SNAPSHOT_URL, timeout=30):
+    """
+    Загружает записи всех стран с полями fields через общий HTTP-клиент.
+    
+    API /all принимает не больше MAX_FIELDS_PER_REQUEST полей, поэтому
+    поля запрашиваются группами (field_groups), а ответы объединяются в
+    одну запись на страну по cca3. Группы запрашиваются одновременно, так
+    что загрузка длится примерно как один запрос. Порядок стран - как в
+    ответе первой группы; страны из следующих ответов, которых не было в
+    первом, добавляются в конец. Записи без cca3 объединить нельзя, они
+    пропускаются.
+    
+    Args:
+        fields: нужные поля записи (cca3 добавляется всегда)
+        url: адрес /all
+        timeout: таймаут каждого запроса в секундах
+    
+    Returns:
+        list: Список словарей с данными о странах
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    # HTTP-клиент (и requests) нужен только для загрузки
+    from concurrent.futures import ThreadPoolExecutor
+    
+    from http_client import get_client
+    from country_fields import fields_params
+    
+    def fetch_group(group):
+        response = get_client().get(url, params=fields_params(group), timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    groups = field_groups(fields)
+    if len(groups) == 1:
+        responses = [fetch_group(groups[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            responses = list(executor.map(fetch_group, groups))
+    records = {}
+    for countries in responses:
+        for country_data in countries:
+            code = country_data.get("cca3")
+            if code:
+                records.setdefault(code, {}).update(country_data)
+    return list(records.values())
+
+
+class CountrySnapshot:
+    """
+    Локальный снимок всех стран с индексом для поиска без обращения к сети.
+    
+    Индекс строится по общему и официальному названию, кодам cca2, cca3,
+    ccn3 и альтернативным написаниям, без учета регистра.
+    
+    Args:
+        countries: список словарей с данными о странах
+        downloaded_at: unix-время загрузки снимка
+    """
+    
+    def __init__(self, countries, downloaded_at=None):
+        self.countries = countries
+        self.downloaded_at = downloaded_at if downloaded_at is not None else time.time()
+        self.index = {}
+        for country_data in countries:
+            for key in index_keys(country_data):
+                # При совпадении ключей побеждает первая страна в наборе
+                self.index.setdefault(key, country_data)
+    
+    def __len__(self):
+        return len(self.countries)
+    
+    def age(self):
+        return time.time() - self.downloaded_at
+    
+    def is_stale(self, max_age=DEFAULT_MAX_AGE):
+        return self.age() > max_age
+    
+    def lookup(self, query):
+        """
+        Ищет страну по названию или коду.
+        
+        Args:
+            query: название, официальное название, код или альтернативное написание
+        
+        Returns:
+            dict: Данные о стране или None, если страна не найдена
+        """
+        return self.index.get(_normalize(query))
+    
+    def save(self, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Сохраняет снимок в JSON файл (через временный файл).
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"downloaded_at": self.downloaded_at, "countries": self.countries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Загружает снимок из файла.
+        
+        Returns:
+            CountrySnapshot: Снимок или None, если файла нет или он поврежден
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+            return cls(payload["countries"], payload.get("downloaded_at"))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    @classmethod
+    def download(cls, url=SNAPSHOT_URL, timeout=30, fields=SNAPSHOT_FIELDS):
+        """
+        Загружает набор стран с полями fields (несколькими запросами /all,
+        см. fetch_all).
+        
+        Returns:
+            CountrySnapshot: Новый снимок
+        
+        Raises:
+            requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+        """
+        return cls(fetch_all(fields, url, timeout))
+
+
+_snapshot = None
+_snapshot_path = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(path=DEFAULT_SNAPSHOT_PATH, max_age=DEFAULT_MAX_AGE):
+    """
+    Возвращает загруженный снимок, если он есть и не устарел.
+    
+    Снимок читается с диска один раз (отсутствие файла тоже запоминается)
+    и дальше хранится в памяти.
+    
+    Args:
+        path: путь к файлу снимка
+        max_age: максимальный возраст снимка в секундах
+    
+    Returns:
+        CountrySnapshot: Свежий снимок или None
+    """
+    global _snapshot, _snapshot_path
+    if _snapshot_path != path:
+        with _snapshot_lock:
+            if _snapshot_path != path:
+                _snapshot = CountrySnapshot.load(path)
+                _snapshot_path = path
+    if _snapshot is None or _snapshot.is_stale(max_age):
+        return None
+    return _snapshot
+
+
+def refresh_snapshot(path=DEFAULT_SNAPSHOT_PATH, url=SNAPSHOT_URL):
+    """
+    Загружает свежий снимок, сохраняет его на диск и делает текущим.
+    
+    Returns:
+        CountrySnapshot: Новый снимок
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    global _snapshot, _snapshot_path
+    snapshot = CountrySnapshot.download(url)
+    snapshot.save(path)
+    with _snapshot_lock:
+        _snapshot = snapshot
+        _snapshot_path = path
+    return snapshot
+
+
+def lookup_country(country, path=DEFAULT_SNAPSHOT_PATH, max_age=DEFAULT_MAX_AGE):
+    """
+    Ищет страну в локальном снимке.
+    
+    Args:
+        country: название или код страны
+    
+    Returns:
+        dict: Данные о стране или None (нет снимка, снимок устарел или страна не найдена)
+    """
+    snapshot = get_snapshot(path, max_age)
+    if snapshot is None:
+        return None
+    return snapshot.lookup(country)
+
+
+def all_countries(fields=None, path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Записи всех стран: из локального снимка (любого возраста) или, если
+    его нет, запросами /all только с нужными полями (fetch_all).
+    
+    Args:
+        fields: поля записи, нужные вызывающему (None - поля снимка)
+        path: путь к файлу снимка
+    
+    Returns:
+        list: Список словарей с данными о странах
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    snapshot = get_snapshot(path, max_age=float("inf"))
+    if snapshot is not None:
+        return snapshot.countries
+    return fetch_all(fields or SNAPSHOT_FIELDS)
+
+
+def main(argv=None):
+    """
+    Обновление и проверка локального снимка стран.
+    """
+    parser = argparse.ArgumentParser(description="Локальный снимок данных о странах")
+    parser.add_argument("--path", default=DEFAULT_SNAPSHOT_PATH, help="путь к файлу снимка")
+    parser.add_argument("--update", action="store_true", help="загрузить свежий снимок")
+    args = parser.parse_args(argv)
+    
+    if args.update:
+        snapshot = refresh_snapshot(args.path)
+        print(f"Снимок обновлен: {len(snapshot)} стран, файл {args.path}")
+        return
+    
+    snapshot = CountrySnapshot.load(args.path)
+    if snapshot is None:
+        print(f"Снимок не найден: {args.path} (используйте --update)")
+        return
+    state = "устарел" if snapshot.is_stale() else "актуален"
+    print(f"Снимок {args.path}: {len(snapshot)} стран, ключей в индексе {len(snapshot.index)}, "
+          f"возраст {snapshot.age() / 3600:.1f} ч ({state})")
+
+
+if __name__ == "__main__":
+    main()
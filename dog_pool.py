@@ -0,0 +1,321 @@
+import argparse
+import threading
+import time
+from collections import deque
+
+import requests
+
+from http_client import get_client
+from http_metrics import REGISTRY
+
+# Базовый URL Dog API
+DOG_API_URL = "https://dog.ceo/api"
+
+# Больше изображений за один запрос /random/{n} API не отдает
+MAX_IMAGES_PER_REQUEST = 50
+
+# Размер буфера и порог дозагрузки по умолчанию
+DEFAULT_CAPACITY = 50
+DEFAULT_LOW_WATER = 10
+
+# Сколько хранится список пород (секунды)
+BREEDS_TTL = 24 * 60 * 60
+
+# Случайные изображения не должны попадать в HTTP кэш
+NO_STORE = {"Cache-Control": "no-store"}
+
+REGISTRY.describe("dog_pool_served_total", "Выданные изображения собак: buffer - сразу из буфера, wait - после ожидания")
+REGISTRY.describe("dog_pool_refills_total", "Запросы дозагрузки буфера изображений собак")
+
+
+def random_images_url(breed, count):
+    """
+    URL для count случайных изображений: /breeds/image/random/{n} или
+    /breed/{порода}[/{подпорода}]/images/random/{n}.
+    """
+    if not breed:
+        return f"{DOG_API_URL}/breeds/image/random/{count}"
+    return f"{DOG_API_URL}/breed/{breed.strip('/').lower()}/images/random/{count}"
+
+
+class DogImagePool:
+    """
+    Буфер ссылок на случайные изображения собак с фоновой дозагрузкой.
+    
+    Ссылки выдаются из буфера сразу. Когда в буфере остается меньше
+    low_water ссылок, в фоновом потоке запускается дозагрузка через
+    /random/{n} (до capacity ссылок). Вызывающий ждет сети, только если
+    буфер пуст.
+    
+    Args:
+        breed: порода ('hound' или 'hound/afghan'), None - любая
+        capacity: максимальный размер буфера
+        low_water: порог, ниже которого запускается дозагрузка
+        timeout: сколько ждать ссылку при пустом буфере (секунды)
+    """
+    
+    def __init__(self, breed=None, capacity=DEFAULT_CAPACITY, low_water=DEFAULT_LOW_WATER, timeout=10):
+        self.breed = breed
+        self.capacity = max(1, capacity)
+        self.low_water = min(max(0, low_water), self.capacity - 1)
+        self.timeout = timeout
+        self.last_error = None
+        self._exhausted = False
+        self._buffer = deque()
+        self._refilling = False
+        self._condition = threading.Condition()
+    
+    def __len__(self):
+        with self._condition:
+            return len(self._buffer)
+    
+    def warm(self):
+        """
+        Запускает заполнение буфера, не дожидаясь его окончания.
+        """
+        with self._condition:
+            self._start_refill()
+    
+    def get(self, timeout=None):
+        """
+        Возвращает ссылку на изображение.
+        
+        Args:
+            timeout: сколько ждать при пустом буфере (по умолчанию self.timeout)
+        
+        Returns:
+            str: Ссылка на изображение
+        
+        Raises:
+            requests.exceptions.RequestException: Если буфер пуст, а дозагрузка не удалась
+            TimeoutError: Если ссылки не появились за timeout секунд
+        """
+        images = self.take(1, timeout)
+        if not images:
+            raise requests.exceptions.RequestException("Dog API не вернул изображений")
+        return images[0]
+    
+    def take(self, count, timeout=None):
+        """
+        Возвращает count ссылок (для серии запросов).
+        
+        Сколько есть в буфере - выдается сразу, недостающие ожидаются. Если
+        count больше capacity, буфер дозагружается несколько раз подряд, пока
+        ссылок не хватит. Меньше count возвращается, только если API отдал
+        меньше изображений, чем просили (у породы мало фотографий).
+        
+        Raises:
+            requests.exceptions.RequestException: Если буфер пуст, а дозагрузка не удалась
+            TimeoutError: Если ссылки не появились за timeout секунд
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        images = []
+        waited = False
+        refill_started = False
+        with self._condition:
+            while True:
+                while self._buffer and len(images) < count:
+                    images.append(self._buffer.popleft())
+                if len(images) >= count:
+                    if len(self._buffer) < self.low_water:
+                        self._start_refill()
+                    break
+                if not self._refilling:
+                    if refill_started:
+                        # Дозагрузка завершилась, а ссылок все еще не хватает
+                        if self.last_error is not None:
+                            raise self.last_error
+                        if self._exhausted:
+                            break
+                    self._start_refill()
+                    refill_started = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Нет изображений собак за {timeout} с")
+                waited = True
+                self._condition.wait(remaining)
+        REGISTRY.inc("dog_pool_served_total", len(images), source="wait" if waited else "buffer")
+        return images
+    
+    def _start_refill(self):
+        # Вызывается под self._condition; одновременно идет не больше одной дозагрузки
+        if self._refilling or len(self._buffer) >= self.capacity:
+            return
+        self._refilling = True
+        self.last_error = None
+        self._exhausted = False
+        threading.Thread(target=self._refill, name="dog-pool-refill", daemon=True).start()
+    
+    def _refill(self):
+        try:
+            while True:
+                with self._condition:
+                    missing = self.capacity - len(self._buffer)
+                if missing <= 0:
+                    return
+                count = min(missing, MAX_IMAGES_PER_REQUEST)
+                response = get_client().get(random_images_url(self.breed, count), headers=NO_STORE)
+                REGISTRY.inc("dog_pool_refills_total", breed=self.breed or "any")
+                response.raise_for_status()
+                data = response.json()
+                if data.get("status") != "success":
+                    raise requests.exceptions.RequestException(f"Dog API вернул статус '{data.get('status')}'")
+                images = data.get("message") or []
+                if isinstance(images, str):
+                    images = [images]
+                with self._condition:
+                    self._buffer.extend(images[:self.capacity - len(self._buffer)])
+                    self._condition.notify_all()
+                if len(images) < count:
+                    # Для породы с малым числом фотографий API отдает меньше, чем просили
+                    with self._condition:
+                        self._exhausted = True
+                    return
+        except (requests.exceptions.RequestException, ValueError) as e:
+            with self._condition:
+                self.last_error = e
+        finally:
+            with self._condition:
+                self._refilling = False
+                self._condition.notify_all()
+
+
+_breeds = None
+_breeds_loaded_at = 0.0
+_breeds_lock = threading.Lock()
+
+
+def get_breeds(max_age=BREEDS_TTL):
+    """
+    Список пород из /breeds/list/all (загружается один раз и хранится max_age секунд).
+    
+    Returns:
+        dict: {порода: [подпороды]}
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    global _breeds, _breeds_loaded_at
+    with _breeds_lock:
+        if _breeds is None or time.monotonic() - _breeds_loaded_at > max_age:
+            response = get_client().get(f"{DOG_API_URL}/breeds/list/all")
+            response.raise_for_status()
+            _breeds = response.json().get("message") or {}
+            _breeds_loaded_at = time.monotonic()
+        return _breeds
+
+
+def breed_names():
+    """
+    Все породы и подпороды в виде 'hound' и 'hound/afghan'.
+    """
+    names = []
+    for breed, sub_breeds in sorted(get_breeds().items()):
+        names.append(breed)
+        names.extend(f"{breed}/{sub_breed}" for sub_breed in sub_breeds)
+    return names
+
+
+class DogPools:
+    """
+    Набор буферов изображений: общий и по породам (создаются при первом обращении).
+    
+    Args:
+        capacity: размер буфера каждой породы
+        low_water: порог дозагрузки каждой породы
+    """
+    
+    def __init__(self, capacity=DEFAULT_CAPACITY, low_water=DEFAULT_LOW_WATER):
+        self.capacity = capacity
+        self.low_water = low_water
+        self._pools = {}
+        self._lock = threading.Lock()
+    
+    def pool(self, breed=None):
+        """
+        Буфер для породы (None - любая порода).
+        
+        Raises:
+            ValueError: Если такой породы нет в списке пород
+        """
+        key = breed.strip("/").lower() if breed else None
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+        if key is not None and key not in breed_names():
+            raise ValueError(f"Неизвестная порода: {breed}")
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = DogImagePool(key, self.capacity, self.low_water)
+                pool.warm()
+        return pool
+    
+    def sizes(self):
+        """
+        Текущее число ссылок в буферах.
+        
+        Returns:
+            dict: {порода или 'any': размер буфера}
+        """
+        with self._lock:
+            return {breed or "any": len(pool) for breed, pool in self._pools.items()}
+
+
+_pools = None
+_pools_lock = threading.Lock()
+
+
+def get_dog_pools():
+    """
+    Общий набор буферов процесса.
+    """
+    global _pools
+    if _pools is None:
+        with _pools_lock:
+            if _pools is None:
+                _pools = DogPools()
+                REGISTRY.register_collector(
+                    lambda: {"dog_pool_buffered": sum(_pools.sizes().values())})
+    return _pools
+
+
+def random_dog_image(breed=None):
+    """
+    Ссылка на случайное изображение собаки из общего буфера.
+    
+    Raises:
+        ValueError: Если такой породы нет
+        requests.exceptions.RequestException: Если буфер пуст, а загрузить изображения не удалось
+    """
+    return get_dog_pools().pool(breed).get()
+
+
+def main(argv=None):
+    """
+    Выдает серию ссылок на изображения собак и время выдачи каждой.
+    """
+    parser = argparse.ArgumentParser(description="Буфер случайных изображений собак")
+    parser.add_argument("-n", "--count", type=int, default=10, help="сколько ссылок выдать")
+    parser.add_argument("-b", "--breed", help="порода ('hound' или 'hound/afghan')")
+    parser.add_argument("--breeds", action="store_true", help="вывести список пород")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.breeds:
+            print("\n".join(breed_names()))
+            return
+        pool = get_dog_pools().pool(args.breed)
+        for _ in range(args.count):
+            started = time.perf_counter()
+            image_url = pool.get()
+            print(f"{(time.perf_counter() - started) * 1000:8.2f} ms  {image_url}")
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+    except (requests.exceptions.RequestException, TimeoutError) as e:
+        print(f"Ошибка при запросе: {e}")
+
+
+if __name__ == "__main__":
+    main()
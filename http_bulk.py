@@ -0,0 +1,325 @@
+import argparse
+import json
+import sys
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from cli_args import parse_header
+from http_client import DEFAULT_POOL_MAXSIZE, get_client
+from http_stream import open_stream, stream_to
+
+# Количество одновременных запросов по умолчанию
+DEFAULT_MAX_WORKERS = 8
+
+# Сколько записей на один поток может ждать отправки или вывода: входной
+# файл читается не дальше этого окна, память не зависит от его размера
+WINDOW_PER_WORKER = 4
+
+# Сколько байт начала ответа попадает в результат
+DEFAULT_SNIPPET_BYTES = 200
+
+# Размер блока при потоковой (chunked) отправке файла
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Запрос из строки NDJSON: body - JSON тело (json=), data - строка (data=),
+# error - ошибка разбора строки (запрос не отправляется)
+BulkRequest = namedtuple("BulkRequest", "line method url headers body data error")
+
+
+def parse_request(line_number, line, url=None, method="POST", headers=None):
+    """
+    Разбирает строку NDJSON.
+    
+    Если url задан, вся строка - JSON тело запроса. Иначе строка - запись
+    журнала запросов: {"url": ..., "method": ..., "headers": {...},
+    "json": ... или "data": "..."}.
+    
+    Returns:
+        BulkRequest: Запрос (с заполненным error, если строку разобрать нельзя)
+    """
+    headers = dict(headers or {})
+    try:
+        record = json.loads(line)
+        if url is not None:
+            return BulkRequest(line_number, method, url, headers, record, None, None)
+        if not isinstance(record, dict) or not record.get("url"):
+            raise ValueError("нет поля url (или задайте --url)")
+        headers.update(record.get("headers") or {})
+        data = record.get("data")
+        return BulkRequest(line_number, str(record.get("method") or method).upper(), record["url"], headers,
+                           record.get("json"), data.encode("utf-8") if isinstance(data, str) else data, None)
+    except ValueError as e:
+        return BulkRequest(line_number, method, url, headers, None, None, str(e))
+
+
+def read_requests(source, url=None, method="POST", headers=None):
+    """
+    Лениво читает запросы из файла NDJSON или stdin (по одному на строку).
+    
+    Args:
+        source: путь к файлу или '-' для чтения из stdin
+        url, method, headers: см. parse_request
+    
+    Yields:
+        BulkRequest: Запрос (пустые строки пропускаются)
+    """
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                yield parse_request(line_number, line, url, method, headers)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def send_request(request, snippet_bytes=DEFAULT_SNIPPET_BYTES, timeout=None):
+    """
+    Отправляет один запрос через общий клиент. Ответ читается потоком: в
+    памяти остается только его начало.
+    
+    Returns:
+        dict: Результат для вывода (line, method, url, status, latency_ms,
+        bytes, response или error)
+    """
+    result = {"line": request.line, "method": request.method, "url": request.url}
+    if request.error is not None:
+        result["error"] = f"Некорректная строка: {request.error}"
+        return result
+    kwargs = {"headers": request.headers or None, "timeout": timeout}
+    if request.data is not None:
+        kwargs["data"] = request.data
+    else:
+        kwargs["json"] = request.body
+    try:
+        response, started_at = open_stream(request.method, request.url, **kwargs)
+        stats = stream_to(response, None, started_at, max_buffer_bytes=snippet_bytes)
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        result["error"] = str(e)
+        return result
+    result.update({
+        "status": stats.status_code,
+        "latency_ms": round(stats.elapsed * 1000, 3),
+        "bytes": stats.bytes_received,
+        "response": stats.head.decode("utf-8", "replace"),
+    })
+    return result
+
+
+class BulkSummary:
+    """
+    Итоги пакетной отправки: число запросов, статусы, ошибки и задержки.
+    """
+    
+    def __init__(self):
+        from load_test import LatencyHistogram
+        
+        self.statuses = Counter()
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    @property
+    def requests(self):
+        return sum(self.statuses.values()) + self.errors
+    
+    def record(self, result):
+        if "error" in result:
+            self.errors += 1
+            return
+        self.statuses[result["status"]] += 1
+        self.latency.record(result["latency_ms"] / 1000)
+    
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+    
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "elapsed": self.elapsed,
+            "requests_per_sec": self.requests / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": self.latency.percentile(50) * 1000,
+            "p99_ms": self.latency.percentile(99) * 1000,
+        }
+
+
+def _write_result(output, result):
+    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def send_all(bulk_requests, output, max_workers=DEFAULT_MAX_WORKERS, snippet_bytes=DEFAULT_SNIPPET_BYTES,
+             timeout=None):
+    """
+    Отправляет запросы из итератора одновременно (не больше max_workers)
+    по пулу соединений общего клиента.
+    
+    Результаты пишутся в output в формате NDJSON в порядке входных строк
+    сразу по готовности и не накапливаются; из итератора читается не
+    больше max_workers * WINDOW_PER_WORKER запросов вперед.
+    
+    Args:
+        bulk_requests: итерируемый набор BulkRequest (например, read_requests)
+        output: текстовый поток для результатов
+        max_workers: максимальное число одновременных запросов
+        snippet_bytes: сколько байт начала ответа записать в результат
+        timeout: таймаут запроса в секундах (по умолчанию таймаут клиента)
+    
+    Returns:
+        BulkSummary: Итоги
+    """
+    max_workers = max(1, max_workers)
+    summary = BulkSummary()
+    window = deque()
+    
+    def flush(limit):
+        while len(window) > limit:
+            result = window.popleft().result()
+            summary.record(result)
+            _write_result(output, result)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for request in bulk_requests:
+            window.append(executor.submit(send_request, request, snippet_bytes, timeout))
+            flush(max_workers * WINDOW_PER_WORKER - 1)
+        flush(0)
+    output.flush()
+    return summary.finish()
+
+
+class _CountingReader:
+    # Итератор блоков файла для chunked тела; считает отправленные байты
+    
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.bytes_sent = 0
+    
+    def __iter__(self):
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                return
+            self.bytes_sent += len(chunk)
+            yield chunk
+
+
+def upload(source, url, method="POST", headers=None, snippet_bytes=DEFAULT_SNIPPET_BYTES,
+           chunk_size=UPLOAD_CHUNK_SIZE, timeout=None):
+    """
+    Отправляет файл одним запросом с телом Transfer-Encoding: chunked:
+    файл читается блоками по мере отправки и целиком в память не
+    загружается (например, NDJSON для bulk-эндпоинта).
+    
+    Такой запрос не повторяется при сбое ни для какого метода (в том числе
+    PUT и DELETE): тело - поток, и повтор отправил бы его пустым
+    (см. http_retry.send_with_retry).
+    
+    Args:
+        source: путь к файлу или '-' для чтения из stdin
+        url: адрес запроса
+    
+    Returns:
+        dict: Результат (status, latency_ms, bytes_sent, bytes, response или error)
+    """
+    headers = {"Content-Type": "application/x-ndjson", **(headers or {})}
+    stream = sys.stdin.buffer if source == "-" else open(source, "rb")
+    reader = _CountingReader(stream, chunk_size)
+    result = {"method": method, "url": url}
+    try:
+        response, started_at = open_stream(method, url, data=iter(reader), headers=headers, timeout=timeout)
+        stats = stream_to(response, None, started_at, max_buffer_bytes=snippet_bytes)
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        result.update({"bytes_sent": reader.bytes_sent, "error": str(e)})
+        return result
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    metrics = get_client().metrics
+    if metrics is not None:
+        # Размер chunked тела заранее неизвестен, поэтому записывается здесь
+        metrics.inc("http_request_bytes_total", reader.bytes_sent, host=urlsplit(url).netloc.lower())
+    result.update({
+        "status": stats.status_code,
+        "latency_ms": round(stats.elapsed * 1000, 3),
+        "bytes_sent": reader.bytes_sent,
+        "bytes": stats.bytes_received,
+        "response": stats.head.decode("utf-8", "replace"),
+    })
+    return result
+
+
+def main(argv=None):
+    """
+    Пакетная отправка запросов из NDJSON: по запросу на строку (одновременно)
+    или всего файла одним потоковым запросом (--chunked).
+    
+    Returns:
+        int: 0 или 1, если были ошибки или ответы с кодом 4xx/5xx
+    """
+    parser = argparse.ArgumentParser(description="Пакетная отправка POST запросов из NDJSON")
+    parser.add_argument("source", nargs="?", default="-", help="файл NDJSON, '-' для stdin")
+    parser.add_argument("--url", help="адрес для всех строк (строка - JSON тело); "
+                                      "без него строка - запись {\"url\", \"method\", \"headers\", \"json\"/\"data\"}")
+    parser.add_argument("-X", "--method", default="POST", help="метод (по умолчанию POST)")
+    parser.add_argument("-H", "--header", action="append", type=parse_header, default=[],
+                        help="заголовок 'Имя: значение' (можно повторять)")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"число одновременных запросов (по умолчанию {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--chunked", action="store_true",
+                        help="отправить файл целиком одним запросом с chunked телом (нужен --url)")
+    parser.add_argument("--snippet", type=int, default=DEFAULT_SNIPPET_BYTES,
+                        help="сколько байт ответа записать в результат")
+    parser.add_argument("--timeout", type=float, help="таймаут запроса, с")
+    parser.add_argument("-o", "--output", help="файл для результатов NDJSON (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+    
+    if args.chunked and not args.url:
+        parser.error("--chunked требует --url")
+    method = args.method.upper()
+    headers = dict(args.header)
+    if args.url and args.workers > DEFAULT_POOL_MAXSIZE:
+        # Иначе соединения сверх размера пула закрываются после каждого запроса
+        get_client().set_host_pool_size(urlsplit(args.url).netloc.lower(), args.workers)
+    try:
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    except OSError as e:
+        print(f"Ошибка: {e}")
+        return 1
+    try:
+        if args.chunked:
+            result = upload(args.source, args.url, method, headers, args.snippet, timeout=args.timeout)
+            _write_result(output, result)
+            failed = "error" in result or result["status"] >= 400
+            report = None
+        else:
+            bulk_requests = read_requests(args.source, args.url, method, headers)
+            summary = send_all(bulk_requests, output, args.workers, args.snippet, args.timeout)
+            failed = summary.errors or any(status >= 400 for status in summary.statuses)
+            report = summary.as_dict()
+    except OSError as e:
+        print(f"Ошибка: {e}")
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    if report is not None:
+        # Итоги - в stderr, чтобы не смешиваться с NDJSON на stdout
+        out = sys.stderr if output is sys.stdout else sys.stdout
+        statuses = ", ".join(f"{status}: {count}" for status, count in report["statuses"].items()) or "-"
+        print(f"Запросов: {report['requests']}, ошибок: {report['errors']}, статусы: {statuses}", file=out)
+        print(f"p50: {report['p50_ms']:.1f} мс, p99: {report['p99_ms']:.1f} мс, "
+              f"{report['requests_per_sec']:.1f} запр/с за {report['elapsed']:.2f} с", file=out)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,487 @@
+import calendar
+import email.utils
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Размер памяти под кэш по умолчанию (байты)
+DEFAULT_MEMORY_MAX_BYTES = 16 * 1024 * 1024
+
+# Размер дискового кэша по умолчанию (байты)
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+
+# Статусы, ответы с которыми можно кэшировать без явного разрешения (RFC 9110, 15.1)
+CACHEABLE_STATUSES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+# Верхняя граница эвристической свежести для ответов только с Last-Modified
+MAX_HEURISTIC_FRESHNESS = 24 * 60 * 60
+
+# Заголовки, которые не сохраняются: не имеют смысла для уже декодированного
+# тела или относятся к одному соединению (RFC 9111, 3.1); в нижнем регистре
+_DROPPED_HEADERS = frozenset({"content-encoding", "transfer-encoding", "content-length", "connection",
+                              "keep-alive", "proxy-connection", "te", "trailer", "upgrade"})
+
+# Заголовки ответа 304, которые обновляют сохраненную запись
+_REVALIDATION_HEADERS = ("Cache-Control", "Date", "ETag", "Expires", "Last-Modified", "Vary", "Age")
+
+
+def parse_cache_control(value):
+    """
+    Разбирает заголовок Cache-Control в словарь директив.
+    
+    Args:
+        value: значение заголовка (может быть None)
+    
+    Returns:
+        dict: {директива: значение или True}, имена директив в нижнем регистре
+    """
+    directives = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else True
+    return directives
+
+
+def parse_http_date(value):
+    """
+    Преобразует HTTP дату в unix-время.
+    
+    Returns:
+        float: Время в секундах или None, если дату не удалось разобрать
+    """
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_tz(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return calendar.timegm(parsed[:9]) - (parsed[9] or 0)
+
+
+def _parse_seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry:
+    """
+    Сохраненный ответ вместе с данными для проверки свежести.
+    """
+    
+    def __init__(self, url, status_code, headers, content, vary_values, stored_at=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.vary_values = vary_values
+        self.stored_at = stored_at if stored_at is not None else time.time()
+    
+    @property
+    def size(self):
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+    
+    @property
+    def etag(self):
+        return CaseInsensitiveDict(self.headers).get("ETag")
+    
+    @property
+    def last_modified(self):
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+    
+    def freshness_lifetime(self):
+        """
+        Время свежести ответа в секундах (RFC 9111, 4.2.1).
+        """
+        headers = CaseInsensitiveDict(self.headers)
+        directives = parse_cache_control(headers.get("Cache-Control"))
+        if "no-cache" in directives:
+            return 0
+        if "max-age" in directives:
+            max_age = _parse_seconds(directives["max-age"])
+            return max_age if max_age is not None else 0
+        
+        date = parse_http_date(headers.get("Date")) or self.stored_at
+        expires = headers.get("Expires")
+        if expires is not None:
+            expires_at = parse_http_date(expires)
+            return max(0, expires_at - date) if expires_at is not None else 0
+        
+        # Эвристическая свежесть: 10% от возраста документа
+        last_modified = parse_http_date(headers.get("Last-Modified"))
+        if last_modified is not None and last_modified < date:
+            return min((date - last_modified) / 10, MAX_HEURISTIC_FRESHNESS)
+        return 0
+    
+    def current_age(self, now=None):
+        now = now if now is not None else time.time()
+        age_header = _parse_seconds(CaseInsensitiveDict(self.headers).get("Age")) or 0
+        return age_header + max(0, now - self.stored_at)
+    
+    def is_fresh(self, now=None):
+        return self.current_age(now) < self.freshness_lifetime()
+    
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+    
+    def revalidated(self, response):
+        """
+        Возвращает копию записи, обновленную по ответу 304 Not Modified.
+        """
+        headers = CaseInsensitiveDict(self.headers)
+        for name in _REVALIDATION_HEADERS:
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        return CacheEntry(self.url, self.status_code, headers, self.content, self.vary_values)
+    
+    def dumps(self):
+        """
+        Запись для файла: строка JSON с метаданными, затем тело как есть.
+        
+        Returns:
+            bytes: Сериализованная запись
+        """
+        meta = {"url": self.url, "status_code": self.status_code, "headers": self.headers,
+                "vary_values": self.vary_values, "stored_at": self.stored_at}
+        return json.dumps(meta, ensure_ascii=False).encode("utf-8") + b"\n" + self.content
+    
+    @classmethod
+    def loads(cls, data):
+        """
+        Восстанавливает запись из dumps(). В отличие от pickle, чтение файла
+        не может выполнить код, даже если каталог кэша доступен на запись
+        другим пользователям.
+        
+        Raises:
+            ValueError: Если данные повреждены или в другом формате
+        """
+        meta, separator, content = data.partition(b"\n")
+        if not separator:
+            raise ValueError("Нет заголовка записи кэша")
+        meta = json.loads(meta)
+        try:
+            return cls(meta["url"], int(meta["status_code"]), meta["headers"], content,
+                       meta["vary_values"], float(meta["stored_at"]))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Неполная запись кэша: {e}") from e
+    
+    def to_response(self, request):
+        """
+        Собирает requests.Response из сохраненной записи.
+        
+        Args:
+            request: подготовленный запрос, для которого отдается ответ
+        
+        Returns:
+            requests.Response: Ответ с атрибутом from_cache=True
+        """
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.url = self.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = "OK" if self.status_code == 200 else ""
+        response.from_cache = True
+        return response
+
+
+class MemoryCache:
+    """
+    LRU кэш в памяти с вытеснением по суммарному размеру записей.
+    
+    Args:
+        max_bytes: максимальный суммарный размер записей
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MEMORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(self, key, entry):
+        size = entry.size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.size
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.size
+                self.evictions += 1
+    
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.size
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    Дисковый кэш: по файлу на запись, вытеснение самых давно использованных
+    файлов при превышении суммарного размера.
+    
+    Args:
+        directory: каталог для файлов кэша (создается при необходимости)
+        max_bytes: максимальный суммарный размер файлов
+    """
+    
+    def __init__(self, directory, max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.current_bytes = sum(size for _, size, _ in self._scan())
+    
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.cache")
+    
+    def _scan(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".cache"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+    
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = CacheEntry.loads(f.read())
+            # mtime используется как время последнего обращения для LRU
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Поврежденный файл или файл прежнего формата
+            self.delete(key)
+            return None
+    
+    def set(self, key, entry):
+        path = self._path(key)
+        data = entry.dumps()
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.current_bytes += len(data) - old_size
+            if self.current_bytes > self.max_bytes:
+                self._evict()
+    
+    def delete(self, key):
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.current_bytes -= size
+            except OSError:
+                pass
+    
+    def _evict(self):
+        for path, size, _ in sorted(self._scan(), key=lambda item: item[2]):
+            if self.current_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.current_bytes -= size
+            self.evictions += 1
+
+
+class HttpCache:
+    """
+    HTTP кэш для GET запросов с учетом Cache-Control, ETag и Last-Modified.
+    
+    Свежие ответы отдаются без обращения к сети, устаревшие ответы с
+    валидаторами перепроверяются условным запросом (If-None-Match /
+    If-Modified-Since). Записи хранятся в LRU кэше в памяти и, если задан
+    disk_dir, дополнительно на диске.
+    
+    Args:
+        memory_max_bytes: размер кэша в памяти
+        disk_dir: каталог дискового кэша (None - без дискового уровня)
+        disk_max_bytes: размер дискового кэша
+    """
+    
+    def __init__(self, memory_max_bytes=DEFAULT_MEMORY_MAX_BYTES, disk_dir=None,
+                 disk_max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.memory = MemoryCache(memory_max_bytes)
+        self.disk = DiskCache(disk_dir, disk_max_bytes) if disk_dir else None
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidations": 0, "stores": 0}
+    
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+    
+    def stats(self):
+        """
+        Возвращает счетчики кэша.
+        
+        Returns:
+            dict: hits, misses, revalidations, stores, evictions, entries, bytes
+        """
+        with self._stats_lock:
+            result = dict(self._stats)
+        result["memory_entries"] = len(self.memory)
+        result["memory_bytes"] = self.memory.current_bytes
+        result["evictions"] = self.memory.evictions
+        if self.disk is not None:
+            result["disk_bytes"] = self.disk.current_bytes
+            result["evictions"] += self.disk.evictions
+        return result
+    
+    def clear(self):
+        self.memory = MemoryCache(self.memory.max_bytes)
+        if self.disk is not None:
+            for path, _, _ in list(self.disk._scan()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.disk.current_bytes = 0
+    
+    @staticmethod
+    def is_cacheable_request(request):
+        if request.method != "GET":
+            return False
+        directives = parse_cache_control(request.headers.get("Cache-Control"))
+        return "no-store" not in directives
+    
+    def _lookup(self, key, request):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        if entry is None:
+            return None
+        for name, value in entry.vary_values.items():
+            if request.headers.get(name) != value:
+                return None
+        return entry
+    
+    def _store(self, key, entry):
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+        self._count("stores")
+    
+    def _delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+    
+    @staticmethod
+    def _make_entry(request, response):
+        if response.status_code not in CACHEABLE_STATUSES:
+            return None
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in directives:
+            return None
+        vary = response.headers.get("Vary", "")
+        if vary.strip() == "*":
+            return None
+        vary_values = {}
+        for name in vary.split(","):
+            name = name.strip()
+            if name:
+                vary_values[name] = request.headers.get(name)
+        # Заголовки, перечисленные в Connection, тоже относятся только к соединению
+        connection = response.headers.get("Connection", "")
+        dropped = _DROPPED_HEADERS | {name.strip().lower() for name in connection.split(",")}
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in dropped}
+        entry = CacheEntry(response.url, response.status_code, headers, response.content, vary_values)
+        if entry.freshness_lifetime() <= 0 and not entry.has_validators():
+            return None
+        return entry
+    
+    def send(self, request, send):
+        """
+        Отдает ответ из кэша или выполняет запрос с последующим сохранением.
+        
+        Args:
+            request: подготовленный запрос (requests.PreparedRequest)
+            send: функция, отправляющая подготовленный запрос в сеть
+        
+        Returns:
+            requests.Response: Ответ сервера или из кэша (атрибут from_cache)
+        """
+        key = request.url
+        request_directives = parse_cache_control(request.headers.get("Cache-Control"))
+        entry = self._lookup(key, request)
+        
+        if entry is not None and entry.is_fresh() and "no-cache" not in request_directives:
+            self._count("hits")
+            return entry.to_response(request)
+        
+        if entry is not None and entry.has_validators():
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+        
+        response = send(request)
+        
+        if entry is not None and response.status_code == 304:
+            entry = entry.revalidated(response)
+            self._store(key, entry)
+            self._count("revalidations")
+            return entry.to_response(request)
+        
+        self._count("misses")
+        new_entry = self._make_entry(request, response)
+        if new_entry is not None:
+            self._store(key, new_entry)
+        elif entry is not None:
+            self._delete(key)
+        response.from_cache = False
+        return response
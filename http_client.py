@@ -1,4 +1,472 @@
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from http_cache import HttpCache
+from http_limiter import HostLimiters
+from http_metrics import REGISTRY, current_phases, record_phase
+from http_retry import CircuitBreakers, CircuitOpenError, RetryPolicy, send_with_retry
+
+# Таймаут по умолчанию для всех запросов (секунды)
+DEFAULT_TIMEOUT = 10
+
+# Размеры пула соединений по умолчанию
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+
+def supported_encodings():
+    """
+    Кодировки сжатия (Content-Encoding), которые умеет распаковывать
+    urllib3, в порядке предпочтения.
+    
+    br и zstd доступны, только если установлены пакеты brotli (или
+    brotlicffi) и zstandard; gzip и deflate поддерживаются всегда.
+    
+    Returns:
+        tuple: Названия кодировок
+    """
+    import urllib3.response
+    
+    encodings = []
+    if getattr(urllib3.response, "HAS_ZSTD", False):
+        encodings.append("zstd")
+    if getattr(urllib3.response, "brotli", None) is not None:
+        encodings.append("br")
+    encodings += ["gzip", "deflate"]
+    return tuple(encodings)
+
+
+# Значение Accept-Encoding: все кодировки, которые клиент может распаковать
+ACCEPT_ENCODING = ",".join(supported_encodings())
+
+# Заголовки, которые отправляются с каждым запросом
+DEFAULT_HEADERS = {
+    "User-Agent": "VPd01-http-client/1.0",
+    "Accept": "application/json, */*;q=0.8",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# Размеры пулов для часто используемых хостов
+DEFAULT_HOST_POOL_SIZES = {
+    "restcountries.com": 20,
+    "dog.ceo": 10,
+}
+
+# Переменная окружения с подменой хостов для общего клиента, например
+# "restcountries.com=http://127.0.0.1:8766,dog.ceo=http://127.0.0.1:8766"
+HOST_OVERRIDES_ENV = "HTTP_HOST_OVERRIDES"
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """
+    Соединение urllib3, которое отдельно измеряет DNS и установку TCP соединения.
+    """
+    
+    def _new_conn(self):
+        started = time.perf_counter()
+        host = self._dns_host
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            # Ошибку разрешения имени оформит стандартная реализация
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        record_phase("dns", resolved - started)
+        
+        last_error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    last_error = e
+                    continue
+                record_phase("connect", time.perf_counter() - resolved)
+                return sock
+        finally:
+            self._dns_host = host
+        raise last_error
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """
+    HTTPS соединение, дополнительно измеряющее TLS рукопожатие.
+    """
+    
+    def connect(self):
+        timings = current_phases()
+        before = dict(timings) if timings is not None else {}
+        started = time.perf_counter()
+        super().connect()
+        if timings is not None:
+            socket_time = (timings.get("dns", 0.0) - before.get("dns", 0.0)
+                           + timings.get("connect", 0.0) - before.get("connect", 0.0))
+            record_phase("tls", max(0.0, time.perf_counter() - started - socket_time))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, пулы которого используют соединения с замером фаз.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """
+    Общий HTTP-клиент поверх requests.Session.
+    
+    Держит пул keep-alive соединений, поэтому повторные запросы к одному
+    хосту не тратят время на новое TCP/TLS рукопожатие.
+    
+    Args:
+        timeout: таймаут по умолчанию в секундах
+        headers: заголовки по умолчанию (дополняют DEFAULT_HEADERS)
+        pool_connections: количество пулов (хостов), кэшируемых адаптером
+        pool_maxsize: максимальное число соединений в пуле одного хоста
+        host_pool_sizes: словарь {хост: размер пула} для отдельных хостов
+        keep_alive: держать ли соединения открытыми между запросами
+        cache: экземпляр HttpCache для кэширования GET ответов (None - без кэша)
+        retry: RetryPolicy для повторов при сбоях (None - без повторов)
+        breakers: CircuitBreakers для быстрого отказа при недоступном хосте
+        metrics: MetricsRegistry для записи фаз, статусов, объема и повторов запросов
+        host_overrides: словарь {хост: базовый URL}, куда отправлять запросы
+            к хосту (например, на локальный stub_server.py)
+        compress: запрашивать ли сжатые ответы (False - Accept-Encoding: identity)
+        limiter: HostLimiters - ограничение частоты и адаптивный предел
+            одновременных запросов по хостам (None - без ограничений)
+    """
+    
+    def __init__(self, timeout=DEFAULT_TIMEOUT, headers=None,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 host_pool_sizes=None, keep_alive=True, cache=None, retry=None, breakers=None,
+                 metrics=None, host_overrides=None, compress=True, limiter=None):
+        self.timeout = timeout
+        self.limiter = limiter
+        self.cache = cache
+        self.retry = retry
+        self.breakers = breakers
+        self.metrics = metrics
+        self.host_overrides = {}
+        for host, base_url in (host_overrides or {}).items():
+            self.override_host(host, base_url)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        if not compress:
+            self.session.headers["Accept-Encoding"] = "identity"
+        
+        adapter = InstrumentedAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        if host_pool_sizes is None:
+            host_pool_sizes = DEFAULT_HOST_POOL_SIZES
+        for host, size in host_pool_sizes.items():
+            self.set_host_pool_size(host, size)
+    
+    def set_host_pool_size(self, host, size):
+        """
+        Задает размер пула соединений для конкретного хоста.
+        
+        Args:
+            host: имя хоста (например, 'restcountries.com')
+            size: максимальное число одновременных соединений к хосту
+        """
+        adapter = InstrumentedAdapter(pool_connections=1, pool_maxsize=size)
+        self.session.mount(f"https://{host}", adapter)
+        self.session.mount(f"http://{host}", adapter)
+    
+    def override_host(self, host, base_url):
+        """
+        Отправляет запросы к хосту на другой адрес (None - отменить подмену).
+        
+        Args:
+            host: имя хоста (например, 'restcountries.com')
+            base_url: схема и адрес замены (например, 'http://127.0.0.1:8766')
+        """
+        if base_url is None:
+            self.host_overrides.pop(host.lower(), None)
+        else:
+            self.host_overrides[host.lower()] = base_url.rstrip("/")
+    
+    def _override_url(self, url):
+        parts = urlsplit(url)
+        base_url = self.host_overrides.get(parts.netloc.lower())
+        if base_url is None:
+            return url
+        return base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+    
+    def request(self, method, url, timeout=None, allow_redirects=True, proxies=None,
+                stream=None, verify=None, cert=None, **kwargs):
+        """
+        Выполняет HTTP запрос через общую сессию.
+        
+        GET запросы без stream=True проходят через кэш клиента, если он задан.
+        Сетевые запросы повторяются по правилам retry и проверяются
+        предохранителем хоста (breakers); каждая попытка ждет разрешения
+        планировщика хоста (limiter). Разрешение возвращается, когда пришли
+        заголовки ответа: при stream=True загрузка тела в предел
+        одновременных запросов не входит.
+        
+        Args:
+            method: HTTP метод ('GET', 'POST', ...)
+            url: URL для запроса
+            timeout: таймаут в секундах (по умолчанию таймаут клиента)
+            **kwargs: аргументы requests.Request (params, headers, data, json, ...)
+        
+        Returns:
+            requests.Response: Объект ответа (без проверки статуса)
+        
+        Raises:
+            requests.exceptions.RequestException: При ошибках сети или таймауте
+        """
+        if self.host_overrides:
+            url = self._override_url(url)
+        prepared = self.session.prepare_request(requests.Request(method.upper(), url, **kwargs))
+        settings = self.session.merge_environment_settings(prepared.url, proxies or {}, stream, verify, cert)
+        send_kwargs = {
+            "timeout": timeout if timeout is not None else self.timeout,
+            "allow_redirects": allow_redirects,
+            **settings,
+        }
+        
+        def network_send(request):
+            if self.metrics is not None:
+                return self.metrics.record_send(request, lambda r: self.session.send(r, **send_kwargs))
+            return self.session.send(request, **send_kwargs)
+        
+        def transport(request):
+            if self.limiter is None:
+                return network_send(request)
+            permit = self.limiter.acquire(request.url)
+            try:
+                response = network_send(request)
+            except BaseException as e:
+                # Место освобождается при любом исключении (в том числе
+                # KeyboardInterrupt), иначе предел хоста утекает навсегда
+                permit.release(error=e)
+                raise
+            # При stream=True тело еще не загружено, но место освобождается:
+            # держать его до закрытия ответа значило бы потерять место
+            # навсегда, если вызывающий ответ не закроет
+            permit.release(response)
+            return response
+        
+        def send(request):
+            response = send_with_retry(request, transport, self.retry, self.breakers)
+            if self.metrics is not None and response.retries:
+                host = urlsplit(request.url).netloc.lower()
+                self.metrics.inc("http_request_retries_total", response.retries, host=host)
+            return response
+        
+        if self.cache is not None and not stream and self.cache.is_cacheable_request(prepared):
+            return self.cache.send(prepared, send)
+        return send(prepared)
+    
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def preconnect(self, url, timeout=None):
+        """
+        Заранее открывает соединение к хосту url (DNS, TCP и TLS рукопожатие)
+        легким запросом HEAD через сессию клиента: соединение остается в
+        пуле keep-alive, и следующий запрос к хосту сразу отправляется по
+        нему. Если живое соединение уже есть, HEAD идет по нему.
+        
+        Это обычный запрос requests (подмена хоста, прокси и настройки TLS
+        учитываются), но мимо кэша, повторов, лимитов и метрик запросов:
+        статус ответа не важен, важно только соединение.
+        
+        Args:
+            url: URL хоста (лучше базовый URL API - ответ HEAD без тела)
+            timeout: таймаут запроса (по умолчанию таймаут клиента)
+        
+        Returns:
+            int: HTTP статус ответа
+        
+        Raises:
+            requests.exceptions.RequestException: Если соединение установить не удалось
+        """
+        if self.host_overrides:
+            url = self._override_url(url)
+        response = self.session.head(url, timeout=timeout if timeout is not None else self.timeout,
+                                     allow_redirects=False)
+        response.close()
+        return response.status_code
+    
+    def close(self):
+        """
+        Закрывает все соединения пула.
+        """
+        self.session.close()
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых вызовов (singleflight).
+    
+    Пока вызов с ключом key выполняется, остальные вызовы с тем же ключом
+    не запускают функцию повторно, а ждут и получают тот же результат
+    (или то же исключение). После завершения ключ освобождается.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, func, *args, **kwargs):
+        """
+        Выполняет func(*args, **kwargs) или присоединяется к уже идущему вызову.
+        
+        Args:
+            key: ключ вызова (хешируемый)
+            func: функция, результат которой разделяется между вызывающими
+        
+        Returns:
+            tuple: (result, shared) - результат и признак того, что он
+            получен от чужого вызова
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+        
+        try:
+            call["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"], False
+    
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def parse_host_overrides(value):
+    """
+    Разбирает подмену хостов вида 'host=http://addr,host2=http://addr2'.
+    
+    Returns:
+        dict: {хост: базовый URL}
+    """
+    overrides = {}
+    for item in (value or "").split(","):
+        host, _, base_url = item.partition("=")
+        if host.strip() and base_url.strip():
+            overrides[host.strip()] = base_url.strip()
+    return overrides
+
+
+def get_client():
+    """
+    Возвращает общий HTTP-клиент проекта (создается при первом вызове).
+    
+    Подмена хостов (например, для работы с локальным stub_server.py)
+    берется из переменной окружения HTTP_HOST_OVERRIDES.
+    
+    Returns:
+        HttpClient: Общий клиент
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                cache = HttpCache()
+                limiter = HostLimiters()
+                _default_client = HttpClient(cache=cache, retry=RetryPolicy(),
+                                             breakers=CircuitBreakers(), metrics=REGISTRY,
+                                             host_overrides=parse_host_overrides(os.environ.get(HOST_OVERRIDES_ENV)),
+                                             limiter=limiter)
+                REGISTRY.register_collector(
+                    lambda: {f"http_cache_{name}": value for name, value in cache.stats().items()})
+                REGISTRY.register_collector(limiter.gauges)
+    return _default_client
+
+
+def set_client(client):
+    """
+    Заменяет общий HTTP-клиент (например, клиентом с другими настройками пула).
+    
+    Args:
+        client: экземпляр HttpClient
+    """
+    global _default_client
+    with _default_client_lock:
+        old_client = _default_client
+        _default_client = client
+    if old_client is not None and old_client is not client:
+        old_client.close()
+
+
+def cache_stats():
+    """
+    Возвращает счетчики кэша общего клиента (попадания, промахи, перепроверки).
+    
+    Returns:
+        dict: Счетчики HttpCache или пустой словарь, если кэш отключен
+    """
+    cache = get_client().cache
+    return cache.stats() if cache is not None else {}
+
+
+def rate_limits():
+    """
+    Текущие лимиты планировщика общего клиента по хостам.
+    
+    Returns:
+        dict: {хост: {'rate', 'concurrency', 'in_flight', ...}} или пустой
+        словарь, если планировщик отключен
+    """
+    limiter = get_client().limiter
+    return limiter.limits() if limiter is not None else {}
 
 
 def get(url, params=None, timeout=10, headers=None):
@@ -10,16 +478,16 @@ def get(url, params=None, timeout=10, headers=None):
         params: словарь параметров запроса (опционально)
         timeout: таймаут запроса в секундах (по умолчанию 10)
         headers: словарь заголовков (опционально)
-        
+    
     Returns:
         requests.Response: Объект ответа, если запрос успешен
         None: В случае ошибки или неуспешного статуса
-        
+    
     Raises:
         requests.exceptions.RequestException: При ошибках сети или таймауте
     """
     try:
-        response = requests.get(url, params=params, timeout=timeout, headers=headers)
+        response = get_client().get(url, params=params, timeout=timeout, headers=headers)
         
         # Базовая проверка статуса
         if response.status_code >= 200 and response.status_code < 300:
@@ -27,11 +495,13 @@ def get(url, params=None, timeout=10, headers=None):
         else:
             print(f"Ошибка: HTTP статус {response.status_code}")
             return None
-            
+    
     except requests.exceptions.Timeout:
         print(f"Ошибка: Превышено время ожидания ({timeout} секунд)")
         return None
+    except CircuitOpenError as e:
+        print(f"Ошибка: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Ошибка при запросе: {e}")
         return None
-
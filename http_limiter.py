@@ -0,0 +1,448 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from http_retry import RetryPolicy
+
+# Статусы, которыми хост сообщает о перегрузке (429 - о превышении частоты)
+OVERLOAD_STATUSES = frozenset({502, 503, 504})
+
+# Ошибки, которые считаются признаком перегрузки хоста
+OVERLOAD_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+# Вес нового замера в сглаженной задержке
+LATENCY_SMOOTHING = 0.1
+
+# Насколько базовая (минимальная) задержка поднимается с каждым замером,
+# чтобы устаревший минимум не считал нормальную задержку перегрузкой
+BASELINE_DRIFT = 0.002
+
+# Сколько замеров нужно, прежде чем рост задержки считается перегрузкой
+MIN_LATENCY_SAMPLES = 10
+
+# Частота уменьшается не чаще раза в столько секунд: запросы, которые уже
+# ждут токенов по прежней частоте, еще получат 429
+RATE_DECREASE_INTERVAL = 1.0
+
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """
+    Запрос не отправлен: лимит хоста не освободился за max_wait секунд.
+    """
+
+
+class TokenBucket:
+    """
+    Ограничение частоты запросов ("ведро токенов").
+    
+    Токены пополняются со скоростью rate в секунду, но не больше burst.
+    Каждый запрос забирает один токен; если токенов нет, запрос ждет, пока
+    долг не будет погашен.
+    
+    Args:
+        rate: запросов в секунду
+        burst: сколько запросов можно отправить сразу после простоя
+    """
+    
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+    
+    def reserve(self):
+        """
+        Забирает токен.
+        
+        Returns:
+            float: Сколько секунд подождать перед отправкой (0 - можно сразу)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            # updated в будущем - ведро приостановлено (pause)
+            return max(0.0, self.updated - now) + max(0.0, -self.tokens) / self.rate
+    
+    def refund(self):
+        """
+        Возвращает токен запроса, который так и не был отправлен.
+        """
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+    
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+    
+    def pause(self, seconds):
+        """
+        Не выдает новых токенов seconds секунд (например, по Retry-After).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    Адаптивный предел одновременных запросов (AIMD).
+    
+    Пока ответы успешны и задержка не растет, предел увеличивается: в начале
+    на 1 после каждого ответа (быстрый старт), после первой перегрузки - на
+    1/предел (примерно на 1 за "круг" запросов). При перегрузке предел
+    умножается на backoff; при росте сглаженной задержки больше чем в
+    latency_tolerance раз от базовой - на latency_backoff, но не ниже
+    начального (у одного хоста бывают и быстрые, и медленные запросы). Предел
+    уменьшается не чаще одного раза на волну запросов: ответы на запросы,
+    отправленные до последнего уменьшения, его больше не уменьшают.
+    
+    Args:
+        initial: начальный предел
+        minimum, maximum: границы предела
+        backoff: множитель при перегрузке (5xx, сетевые ошибки)
+        latency_backoff: множитель при росте задержки
+        latency_tolerance: во сколько раз задержка может превышать базовую
+    """
+    
+    def __init__(self, initial=8, minimum=1, maximum=32, backoff=0.5, latency_backoff=0.9,
+                 latency_tolerance=2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.initial = self.limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.baseline = None
+        self.smoothed = None
+        self.samples = 0
+        self.slow_start = True
+        self.last_decrease = float("-inf")
+        self._condition = threading.Condition()
+    
+    def acquire(self, timeout=None):
+        """
+        Ждет свободного места в пределе.
+        
+        Returns:
+            bool: False, если место не освободилось за timeout секунд
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+    
+    def cancel(self):
+        """
+        Освобождает место запроса, который так и не был отправлен.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+    
+    def _observe(self, latency):
+        self.samples += 1
+        if self.smoothed is None:
+            self.smoothed = latency
+        else:
+            self.smoothed += LATENCY_SMOOTHING * (latency - self.smoothed)
+        if self.baseline is None:
+            self.baseline = latency
+        else:
+            self.baseline = min(latency, self.baseline * (1 + BASELINE_DRIFT))
+    
+    def latency_congested(self):
+        return (self.samples >= MIN_LATENCY_SAMPLES and self.baseline
+                and self.smoothed > self.baseline * self.latency_tolerance)
+    
+    def release(self, started, latency=None, overloaded=False, grow=True):
+        """
+        Освобождает место и подстраивает предел по исходу запроса.
+        
+        Args:
+            started: время отправки запроса (time.monotonic())
+            latency: задержка ответа в секундах (None - ответа нет)
+            overloaded: хост перегружен (5xx, сетевая ошибка)
+            grow: можно ли увеличить предел (False - запрос сдерживал не он)
+        
+        Returns:
+            str: 'decrease', 'increase' или None - как изменился предел
+        """
+        with self._condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if latency is not None and not overloaded:
+                self._observe(latency)
+            change = None
+            congested = overloaded or self.latency_congested()
+            floor = float(self.minimum) if overloaded else min(self.initial, self.limit)
+            if congested and started >= self.last_decrease and self.limit > floor:
+                factor = self.backoff if overloaded else self.latency_backoff
+                self.limit = max(floor, self.limit * factor)
+                self.last_decrease = time.monotonic()
+                self.slow_start = False
+                change = "decrease"
+            elif not congested and grow and saturated and self.limit < self.maximum:
+                step = 1.0 if self.slow_start else 1.0 / self.limit
+                self.limit = min(float(self.maximum), self.limit + step)
+                change = "increase"
+            if change == "increase":
+                self._condition.notify_all()
+            else:
+                self._condition.notify()
+            return change
+
+
+class Permit:
+    """
+    Разрешение на отправку одного запроса (HostLimiter.acquire).
+    """
+    
+    def __init__(self, limiter, started, throttled):
+        self.limiter = limiter
+        self.started = started
+        self.throttled = throttled
+        self._released = False
+    
+    def release(self, response=None, error=None):
+        """
+        Сообщает исход запроса: ответ или исключение.
+        """
+        if not self._released:
+            self._released = True
+            self.limiter.release(self, response, error)
+
+
+class HostLimiter:
+    """
+    Планировщик запросов к одному хосту: адаптивный предел одновременных
+    запросов (AdaptiveConcurrency) и ограничение частоты (TokenBucket).
+    
+    Пока хост не ответил 429, частота не ограничивается (если rate не
+    задан). После первого 429 включается TokenBucket с частотой backoff *
+    наблюдаемая частота запросов; дальше частота растет, пока запросы
+    упираются в нее и ответы успешны, и умножается на backoff при 429 (не
+    чаще раза в RATE_DECREASE_INTERVAL). Retry-After в ответе 429 или 503
+    приостанавливает выдачу токенов для всех потоков.
+    
+    Ответы 5xx и сетевые ошибки уменьшают предел одновременных запросов, а
+    не частоту; каждый из двух лимитов растет, только когда запрос
+    сдерживал именно он.
+    
+    Args:
+        rate: начальная частота (запросов в секунду; None - без ограничения до первого 429)
+        burst: запас токенов после простоя
+        min_rate, max_rate: границы частоты (max_rate=None - без верхней границы)
+        concurrency, min_concurrency, max_concurrency: начальный предел
+            одновременных запросов и его границы
+        backoff: множитель частоты и предела при перегрузке
+        latency_tolerance: во сколько раз задержка может превышать базовую
+        max_wait: сколько секунд запрос может ждать разрешения
+        max_pause: наибольшая пауза по Retry-After (секунды)
+    """
+    
+    def __init__(self, rate=None, burst=10, min_rate=1.0, max_rate=None, concurrency=8,
+                 min_concurrency=1, max_concurrency=32, backoff=0.5, latency_tolerance=2.0,
+                 max_wait=30.0, max_pause=60.0):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AdaptiveConcurrency(concurrency, min_concurrency, max_concurrency, backoff,
+                                               latency_tolerance=latency_tolerance)
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.max_pause = max_pause
+        self.throttled = 0
+        self.overloaded = 0
+        self._slow_start = True
+        self._last_rate_decrease = float("-inf")
+        self._window_started = time.monotonic()
+        self._window_requests = 0
+        self._observed_rate = 0.0
+        self._lock = threading.Lock()
+    
+    def _count_request(self, now):
+        # Наблюдаемая частота запросов - по последнему полному окну в секунду
+        with self._lock:
+            elapsed = now - self._window_started
+            if elapsed >= 1.0:
+                self._observed_rate = self._window_requests / elapsed
+                self._window_started = now
+                self._window_requests = 0
+            self._window_requests += 1
+    
+    def observed_rate(self):
+        with self._lock:
+            return self._observed_rate_locked()
+    
+    def _observed_rate_locked(self):
+        # Прошлое окно или текущее, если в нем уже больше запросов
+        elapsed = time.monotonic() - self._window_started
+        return max(self._observed_rate, self._window_requests / max(elapsed, 0.1))
+    
+    def acquire(self, sleep=time.sleep):
+        """
+        Ждет места в пределе одновременных запросов и токена частоты.
+        
+        Returns:
+            Permit: Разрешение; после ответа нужно вызвать permit.release(...)
+        
+        Raises:
+            RateLimitTimeout: Если разрешение не получено за max_wait секунд
+        """
+        requested = time.monotonic()
+        if not self.concurrency.acquire(self.max_wait):
+            raise RateLimitTimeout(f"Превышено время ожидания лимита одновременных запросов ({self.max_wait} с)")
+        bucket = self.bucket
+        delay = bucket.reserve() if bucket is not None else 0.0
+        if delay > self.max_wait - (time.monotonic() - requested):
+            bucket.refund()
+            self.concurrency.cancel()
+            raise RateLimitTimeout(f"Превышено время ожидания лимита частоты запросов ({delay:.1f} с)")
+        if delay > 0:
+            with self._lock:
+                self.throttled += 1
+            try:
+                sleep(delay)
+            except BaseException:
+                # Место в пределе уже занято: без возврата оно утечет
+                # (например, при KeyboardInterrupt во время ожидания)
+                bucket.refund()
+                self.concurrency.cancel()
+                raise
+        now = time.monotonic()
+        self._count_request(now)
+        return Permit(self, now, delay > 0)
+    
+    def _decrease_rate(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_rate_decrease < RATE_DECREASE_INTERVAL:
+                return
+            self._last_rate_decrease = now
+            self._slow_start = False
+            if self.bucket is None:
+                rate = max(self.min_rate, self.backoff * self._observed_rate_locked())
+                self.bucket = TokenBucket(rate, min(self.burst, rate))
+                return
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate * self.backoff))
+    
+    def _increase_rate(self):
+        rate = self.bucket.rate
+        step = 1.0 if self._slow_start else max(1.0, 0.1 * rate) / rate
+        rate += step
+        self.bucket.set_rate(min(self.max_rate, rate) if self.max_rate else rate)
+    
+    def release(self, permit, response=None, error=None):
+        status = response.status_code if response is not None else None
+        overloaded = status in OVERLOAD_STATUSES or isinstance(error, OVERLOAD_EXCEPTIONS)
+        latency = time.monotonic() - permit.started if response is not None and status != 429 else None
+        self.concurrency.release(permit.started, latency, overloaded, grow=not permit.throttled)
+        if status == 429 or overloaded:
+            with self._lock:
+                self.overloaded += 1
+        if status == 429:
+            self._decrease_rate()
+        if status in (429, 503):
+            retry_after = RetryPolicy.retry_after(response)
+            if retry_after and self.bucket is not None:
+                self.bucket.pause(min(retry_after, self.max_pause))
+        elif permit.throttled and response is not None and status < 400:
+            # Частота растет, только пока запросы действительно в нее упираются
+            self._increase_rate()
+    
+    def snapshot(self):
+        """
+        Текущие лимиты и состояние.
+        
+        Returns:
+            dict: rate (None - частота не ограничена), observed_rate,
+            concurrency, in_flight, latency_ms, baseline_ms, throttled, overloaded
+        """
+        concurrency = self.concurrency
+        bucket = self.bucket
+        return {
+            "rate": round(bucket.rate, 3) if bucket is not None else None,
+            "observed_rate": round(self.observed_rate(), 3),
+            "concurrency": int(concurrency.limit),
+            "in_flight": concurrency.in_flight,
+            "latency_ms": round(concurrency.smoothed * 1000, 3) if concurrency.smoothed is not None else None,
+            "baseline_ms": round(concurrency.baseline * 1000, 3) if concurrency.baseline is not None else None,
+            "throttled": self.throttled,
+            "overloaded": self.overloaded,
+        }
+
+
+class HostLimiters:
+    """
+    Набор планировщиков по хостам (создаются при первом обращении).
+    
+    Args:
+        host_limits: словарь {хост: аргументы HostLimiter} для отдельных хостов
+        **defaults: аргументы HostLimiter для остальных хостов
+    """
+    
+    def __init__(self, host_limits=None, **defaults):
+        self.defaults = defaults
+        self.host_limits = {host.lower(): limits for host, limits in (host_limits or {}).items()}
+        self._limiters = {}
+        self._lock = threading.Lock()
+    
+    def for_url(self, url):
+        host = urlsplit(url).netloc.lower()
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(host)
+                if limiter is None:
+                    limiter = self._limiters[host] = HostLimiter(
+                        **{**self.defaults, **self.host_limits.get(host, {})})
+        return limiter
+    
+    def acquire(self, url):
+        """
+        Разрешение на запрос к хосту url (см. HostLimiter.acquire).
+        """
+        return self.for_url(url).acquire()
+    
+    def limits(self):
+        """
+        Текущие лимиты по хостам.
+        
+        Returns:
+            dict: {хост: HostLimiter.snapshot()}
+        """
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {host: limiter.snapshot() for host, limiter in sorted(limiters.items())}
+    
+    def gauges(self):
+        """
+        Лимиты в виде показателей для MetricsRegistry.register_collector.
+        """
+        gauges = {}
+        for host, snapshot in self.limits().items():
+            labels = (("host", host),)
+            if snapshot["rate"] is not None:
+                gauges[("http_limit_rate", labels)] = snapshot["rate"]
+            gauges[("http_limit_observed_rate", labels)] = snapshot["observed_rate"]
+            gauges[("http_limit_concurrency", labels)] = snapshot["concurrency"]
+            gauges[("http_limit_in_flight", labels)] = snapshot["in_flight"]
+            gauges[("http_limit_throttled", labels)] = snapshot["throttled"]
+        return gauges
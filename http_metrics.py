@@ -0,0 +1,363 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+
+# Границы корзин гистограмм времени (секунды)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Файл, в который метрики сохраняются при завершении процесса (.json или текст Prometheus)
+METRICS_FILE_ENV = "HTTP_METRICS_FILE"
+
+_phase_timings = threading.local()
+
+
+def response_sizes(response):
+    """
+    Объем тела ответа по сети и после распаковки (Content-Encoding).
+    
+    По сети - сколько байт тела прочитано из соединения (для сжатого
+    ответа - сжатых), после распаковки - длина response.content. Пока тело
+    не прочитано (stream=True), по сети берется Content-Length, а объем
+    после распаковки неизвестен.
+    
+    Args:
+        response: requests.Response
+    
+    Returns:
+        dict: encoding, wire_bytes, decoded_bytes (None, если тело не прочитано)
+    """
+    encoding = response.headers.get("Content-Encoding", "identity").strip().lower() or "identity"
+    declared = int(response.headers.get("Content-Length") or 0)
+    if not response._content_consumed:
+        return {"encoding": encoding, "wire_bytes": declared, "decoded_bytes": None}
+    decoded = len(response._content or b"")
+    tell = getattr(response.raw, "tell", None)
+    wire = tell() if tell is not None else None
+    if not wire:
+        wire = declared or (decoded if encoding == "identity" else 0)
+    return {"encoding": encoding, "wire_bytes": wire, "decoded_bytes": decoded}
+
+
+def current_phases():
+    """
+    Словарь фаз запроса, который сейчас замеряет record_send в этом потоке (или None).
+    """
+    return getattr(_phase_timings, "current", None)
+
+
+def record_phase(name, seconds):
+    """
+    Добавляет длительность фазы name к замеру текущего запроса.
+    """
+    timings = current_phases()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин (как histogram в Prometheus).
+    """
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+    
+    def cumulative(self):
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in items) + "}"
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса: счетчики, гистограммы и внешние сборщики.
+    
+    Метрики можно выгрузить в JSON (as_dict / to_json) или в текстовом
+    формате Prometheus (to_prometheus).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+    
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+    
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Контекстный менеджер: записывает длительность блока в гистограмму name.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def register_collector(self, collector):
+        """
+        Добавляет функцию, которая при выгрузке возвращает {имя: значение}
+        для метрик-показателей (gauge), например счетчиков кэша. Вместо
+        имени можно вернуть кортеж (имя, (("метка", "значение"), ...)).
+        """
+        self._collectors.append(collector)
+    
+    def record_send(self, request, send):
+        """
+        Отправляет запрос через send и записывает его метрики: фазы, статус,
+        размер тела и ошибки.
+        
+        Args:
+            request: подготовленный запрос
+            send: функция, отправляющая запрос
+        
+        Returns:
+            requests.Response: Ответ send
+        """
+        host = urlsplit(request.url).netloc.lower()
+        timings = {}
+        _phase_timings.current = timings
+        started = time.perf_counter()
+        try:
+            response = send(request)
+        except Exception as e:
+            self.inc("http_request_errors_total", host=host, error=type(e).__name__)
+            raise
+        finally:
+            _phase_timings.current = None
+        total = time.perf_counter() - started
+        
+        timings["total"] = total
+        timings["ttfb"] = response.elapsed.total_seconds()
+        if response._content_consumed:
+            timings["download"] = max(0.0, total - timings["ttfb"])
+        for phase, seconds in timings.items():
+            self.observe("http_request_phase_seconds", seconds, host=host, phase=phase)
+        self.inc("http_requests_total", method=request.method, host=host, status=response.status_code)
+        
+        body = request.body
+        if body is not None and hasattr(body, "__len__"):
+            self.inc("http_request_bytes_total", len(body), host=host)
+        sizes = response_sizes(response)
+        if sizes["decoded_bytes"] is not None:
+            # Тело потокового ответа учитывается после чтения (http_stream.stream_to)
+            self.record_transfer(host, sizes["encoding"], sizes["wire_bytes"], sizes["decoded_bytes"])
+        response.timings = timings
+        response.transfer = sizes
+        return response
+    
+    def record_transfer(self, host, encoding, wire_bytes, decoded_bytes):
+        """
+        Записывает объем тела ответа по сети и после распаковки.
+        """
+        self.inc("http_response_wire_bytes_total", wire_bytes, host=host, encoding=encoding)
+        self.inc("http_response_bytes_total", decoded_bytes, host=host, encoding=encoding)
+    
+    def counter_values(self, name):
+        """
+        Значения счетчика name по всем наборам меток.
+        
+        Returns:
+            list: [(метки, значение)]
+        """
+        with self._lock:
+            return [(dict(labels), value) for (counter, labels), value in self._counters.items() if counter == name]
+    
+    def transfer_totals(self):
+        """
+        Итоги передачи тел ответов: байт по сети и после распаковки, по
+        кодировкам (Content-Encoding) и всего.
+        
+        Returns:
+            dict: wire_bytes, decoded_bytes, saved_bytes, ratio и by_encoding
+        """
+        by_encoding = {}
+        for counter, key in (("http_response_wire_bytes_total", "wire_bytes"),
+                             ("http_response_bytes_total", "decoded_bytes")):
+            for labels, value in self.counter_values(counter):
+                totals = by_encoding.setdefault(labels.get("encoding", "identity"),
+                                                {"wire_bytes": 0, "decoded_bytes": 0})
+                totals[key] += value
+        wire = sum(totals["wire_bytes"] for totals in by_encoding.values())
+        decoded = sum(totals["decoded_bytes"] for totals in by_encoding.values())
+        return {
+            "wire_bytes": wire,
+            "decoded_bytes": decoded,
+            "saved_bytes": decoded - wire,
+            "ratio": wire / decoded if decoded else 1.0,
+            "by_encoding": by_encoding,
+        }
+    
+    def as_dict(self):
+        """
+        Снимок всех метрик в виде словаря (для JSON).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.count, h.sum, h.cumulative()) for key, h in self._histograms.items()}
+        result = {"counters": [], "histograms": [], "gauges": []}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].append({"name": name, "labels": dict(labels), "value": value})
+        for (name, labels), (count, total, buckets) in sorted(histograms.items()):
+            result["histograms"].append({
+                "name": name,
+                "labels": dict(labels),
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else 0.0,
+                "buckets": {("+Inf" if bound == float("inf") else str(bound)): value for bound, value in buckets},
+            })
+        for (name, labels), value in sorted(self._collect().items()):
+            result["gauges"].append({"name": name, "labels": dict(labels), "value": value})
+        result["transfer"] = self.transfer_totals()
+        return result
+    
+    def to_json(self, indent=2):
+        return json.dumps(self.as_dict(), indent=indent, ensure_ascii=False)
+    
+    def to_prometheus(self):
+        """
+        Выгрузка в текстовом формате Prometheus (exposition format 0.0.4).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.count, h.sum, h.cumulative()) for key, h in self._histograms.items()}
+        lines = []
+        declared = set()
+        
+        def declare(name, kind):
+            if name in declared:
+                return
+            declared.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+        
+        for (name, labels), value in sorted(counters.items()):
+            declare(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (count, total, buckets) in sorted(histograms.items()):
+            declare(name, "histogram")
+            for bound, value in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {value}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for (name, labels), value in sorted(self._collect().items()):
+            declare(name, "gauge")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def _collect(self):
+        gauges = {}
+        for collector in list(self._collectors):
+            try:
+                values = collector()
+            except Exception:
+                continue
+            for key, value in values.items():
+                gauges[key if isinstance(key, tuple) else (key, ())] = value
+        return gauges
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Общий реестр метрик процесса
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("http_requests_total", "HTTP ответы по методу, хосту и статусу (каждая попытка)")
+REGISTRY.describe("http_request_errors_total", "Сетевые ошибки запросов по хосту и типу")
+REGISTRY.describe("http_request_retries_total", "Повторные попытки запросов по хосту")
+REGISTRY.describe("http_request_bytes_total", "Отправлено байт тела запроса")
+REGISTRY.describe("http_response_bytes_total", "Получено байт тела ответа после распаковки, по кодировке")
+REGISTRY.describe("http_response_wire_bytes_total", "Получено байт тела ответа по сети (сжатых), по кодировке")
+REGISTRY.describe("http_request_phase_seconds", "Длительность фаз запроса: dns, connect, tls, ttfb, download, total")
+
+
+def timed(name, registry=None, **labels):
+    """
+    Декоратор: записывает длительность вызова функции в гистограмму name.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with (registry or REGISTRY).timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_metrics(path, registry=None):
+    """
+    Сохраняет метрики в файл: JSON для *.json, иначе текстовый формат Prometheus.
+    """
+    registry = registry or REGISTRY
+    content = registry.to_json() if path.endswith(".json") else registry.to_prometheus()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _write_metrics_at_exit():
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path:
+        try:
+            write_metrics(path)
+        except OSError as e:
+            print(f"Ошибка записи метрик в {path}: {e}")
+
+
+atexit.register(_write_metrics_at_exit)
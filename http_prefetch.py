@@ -0,0 +1,265 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from http_metrics import REGISTRY
+
+# Хосты, соединения с которыми готовятся, пока интерактивное меню ждет ввода
+WARM_UP_URLS = (
+    "https://restcountries.com/v3.1",
+    "https://dog.ceo/api",
+)
+
+# Хост не прогревается повторно, пока его соединение, скорее всего, еще
+# живо (секунды): каждый прогрев - это запрос HEAD
+WARM_UP_INTERVAL = 30.0
+
+# Сколько записей держит кэш упреждающей загрузки по умолчанию
+DEFAULT_MAX_ENTRIES = 64
+
+# Сколько секунд упреждающе загруженная запись считается свежей
+DEFAULT_MAX_AGE = 300.0
+
+# Сколько секунд поиск ждет уже идущую упреждающую загрузку нужной записи
+DEFAULT_WAIT = 5.0
+
+REGISTRY.describe("http_warm_up_total", "Прогрев соединений по хосту и результату: ok, error")
+REGISTRY.describe("prefetch_total", "Упреждающая загрузка: scheduled, hit, miss, cancelled, error")
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+_warmed_at = {}
+
+
+def _warm_up(urls, interval):
+    # requests и клиент импортируются здесь, в фоне: импорт тоже часть
+    # задержки первого запроса
+    from urllib.parse import urlsplit
+    
+    from http_client import get_client
+    
+    client = get_client()
+    for url in urls:
+        host = urlsplit(url).netloc.lower()
+        if time.monotonic() - _warmed_at.get(host, float("-inf")) < interval:
+            continue
+        try:
+            client.preconnect(url)
+        except OSError:
+            # requests.exceptions.RequestException - подкласс OSError; прогрев
+            # необязателен, ошибку покажет сам запрос
+            REGISTRY.inc("http_warm_up_total", host=host, result="error")
+            continue
+        _warmed_at[host] = time.monotonic()
+        REGISTRY.inc("http_warm_up_total", host=host, result="ok")
+
+
+def warm_up(urls=WARM_UP_URLS, interval=WARM_UP_INTERVAL):
+    """
+    Прогревает соединения общего клиента в фоновом потоке: загружает
+    HTTP-клиент и запросом HEAD (HttpClient.preconnect) открывает
+    соединения к хостам urls, пока пользователь читает меню. Ввод не
+    блокируется.
+    
+    Если прогрев уже идет, новый поток не запускается; хост, прогретый
+    меньше interval секунд назад, пропускается, поэтому функцию можно
+    вызывать при каждом показе меню. Ошибки сети только учитываются в
+    метриках.
+    
+    Args:
+        urls: базовые URL хостов (на них отправляется HEAD)
+        interval: сколько секунд не прогревать хост повторно
+    
+    Returns:
+        threading.Thread: Поток прогрева (уже идущий или новый)
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None or not _warm_up_thread.is_alive():
+            _warm_up_thread = threading.Thread(target=_warm_up, args=(tuple(urls), interval),
+                                               name="http-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def _normalize(key):
+    return key.casefold().strip() if isinstance(key, str) else key
+
+
+class PrefetchCache:
+    """
+    Ограниченный кэш результатов упреждающей (спекулятивной) загрузки.
+    
+    Загрузки выполняются в одном фоновом потоке. Новый вызов schedule()
+    отменяет еще не начатые загрузки прошлого вызова: пользователь уже
+    перешел к другому результату, и старые догадки не нужны. Начатый
+    запрос не прерывается, но его результат попадает в кэш. Кэш хранит
+    не больше max_entries записей (вытесняются давно не использованные)
+    и не дольше max_age секунд.
+    
+    У записи может быть несколько ключей (например, код и названия страны):
+    поиск по любому из них находит одну и ту же запись.
+    
+    Args:
+        max_entries: максимальное число записей
+        max_age: время жизни записи в секундах
+    """
+    
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._aliases = {}
+        self._pending = {}
+        self._executor = None
+        # Отмена загрузки сразу вызывает _finish, который тоже берет блокировку
+        self._lock = threading.RLock()
+    
+    def schedule(self, keys, fetch, aliases=None):
+        """
+        Запускает фоновую загрузку записей keys, которых еще нет в кэше, и
+        отменяет не начатые загрузки прошлых вызовов.
+        
+        Args:
+            keys: основные ключи записей
+            fetch: функция fetch(missing_keys) -> {ключ: значение}
+            aliases: функция aliases(значение) -> дополнительные ключи записи
+        
+        Returns:
+            concurrent.futures.Future: Загрузка или None, если все уже в кэше
+        """
+        with self._lock:
+            self._cancel_locked()
+            missing = []
+            for key in dict.fromkeys(_normalize(key) for key in keys):
+                if key not in self._pending and self._get_locked(key, touch=False) is None:
+                    missing.append(key)
+            if not missing:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+            future = self._executor.submit(self._load, fetch, missing, aliases)
+            for key in missing:
+                self._pending[key] = future
+        future.add_done_callback(lambda done: self._finish(missing, done))
+        REGISTRY.inc("prefetch_total", len(missing), result="scheduled")
+        return future
+    
+    def _load(self, fetch, keys, aliases):
+        try:
+            results = fetch(keys)
+        except (OSError, ValueError):
+            # requests.exceptions.RequestException - подкласс OSError
+            REGISTRY.inc("prefetch_total", len(keys), result="error")
+            return {}
+        for key, value in results.items():
+            self.put(key, value, aliases(value) if aliases is not None else ())
+        return results
+    
+    def _finish(self, keys, future):
+        with self._lock:
+            for key in keys:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+        if future.cancelled():
+            REGISTRY.inc("prefetch_total", len(keys), result="cancelled")
+    
+    def _cancel_locked(self):
+        for future in set(self._pending.values()):
+            future.cancel()
+    
+    def cancel(self):
+        """
+        Отменяет еще не начатые загрузки.
+        """
+        with self._lock:
+            self._cancel_locked()
+    
+    def put(self, key, value, aliases=()):
+        """
+        Сохраняет запись под ключом key и дополнительными ключами aliases.
+        """
+        key = _normalize(key)
+        with self._lock:
+            self._remove_locked(key)
+            names = {key} | {_normalize(alias) for alias in aliases if alias}
+            for name in names:
+                if self._aliases.get(name, key) != key:
+                    # Ключ другой записи (например, общий alias) переходит к новой
+                    self._entries[self._aliases[name]][2].discard(name)
+                self._aliases[name] = key
+            self._entries[key] = (time.monotonic(), value, names)
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+    
+    def _remove_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for name in entry[2]:
+                if self._aliases.get(name) == key:
+                    del self._aliases[name]
+    
+    def _get_locked(self, key, touch=True):
+        primary = self._aliases.get(key)
+        entry = self._entries.get(primary) if primary is not None else None
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.max_age:
+            self._remove_locked(primary)
+            return None
+        if touch:
+            self._entries.move_to_end(primary)
+        return entry[1]
+    
+    def get(self, key, wait=DEFAULT_WAIT):
+        """
+        Возвращает запись по любому ее ключу.
+        
+        Если запись сейчас загружается или стоит в очереди, поиск ждет эту
+        загрузку (не больше wait секунд) вместо повторного запроса.
+        
+        Returns:
+            object: Значение или None, если записи нет
+        """
+        key = _normalize(key)
+        with self._lock:
+            value = self._get_locked(key)
+            future = self._pending.get(key) if value is None else None
+        if value is not None:
+            REGISTRY.inc("prefetch_total", result="hit")
+            return value
+        if future is not None and wait:
+            try:
+                future.result(timeout=wait)
+            except (CancelledError, FutureTimeoutError):
+                pass
+            with self._lock:
+                value = self._get_locked(key)
+            if value is not None:
+                REGISTRY.inc("prefetch_total", result="hit")
+                return value
+        REGISTRY.inc("prefetch_total", result="miss")
+        return None
+    
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "pending": len(self._pending)}
+    
+    def clear(self):
+        with self._lock:
+            self._cancel_locked()
+            self._entries.clear()
+            self._aliases.clear()
+    
+    def close(self):
+        """
+        Отменяет загрузки в очереди и останавливает фоновый поток, не
+        дожидаясь начатого запроса.
+        """
+        with self._lock:
+            self._cancel_locked()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
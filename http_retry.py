@@ -0,0 +1,262 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from http_cache import parse_http_date
+
+# Статусы, при которых запрос повторяется
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Методы, которые можно безопасно повторять (RFC 9110, 9.2.2)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+# Ошибки, при которых запрос повторяется
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+# Состояния предохранителя
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Запрос не отправлен: предохранитель для хоста разомкнут.
+    """
+
+
+class RetryPolicy:
+    """
+    Правила повторных попыток с экспоненциальной задержкой и случайным разбросом.
+    
+    Задержка перед попыткой n выбирается равномерно из [0, min(max_backoff,
+    backoff_base * 2^n)] ("full jitter"), чтобы клиенты не повторяли запросы
+    синхронно. Если сервер прислал Retry-After, ждем не меньше указанного.
+    
+    Args:
+        retries: сколько раз повторять запрос после первой попытки
+        backoff_base: базовая задержка в секундах
+        max_backoff: максимальная задержка между попытками
+        max_retry_after: максимальный Retry-After, который мы готовы ждать;
+            при большем значении ответ возвращается без повтора
+        statuses: статусы ответа, при которых запрос повторяется
+        methods: методы, которые можно повторять
+    """
+    
+    def __init__(self, retries=3, backoff_base=0.2, max_backoff=5.0, max_retry_after=30.0,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+    
+    def allows(self, method):
+        return method.upper() in self.methods
+    
+    def backoff(self, attempt):
+        """
+        Задержка перед повтором с номером attempt (начиная с 0).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * (2 ** attempt)))
+    
+    @staticmethod
+    def retry_after(response):
+        """
+        Значение заголовка Retry-After в секундах (число или HTTP дата).
+        
+        Returns:
+            float: Секунды ожидания или None, если заголовка нет
+        """
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        retry_at = parse_http_date(value)
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at - time.time())
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для одного хоста.
+    
+    После failure_threshold ошибок подряд предохранитель размыкается и
+    все запросы к хосту сразу завершаются CircuitOpenError. Через
+    reset_timeout секунд пропускается одна пробная попытка: при успехе
+    предохранитель замыкается, при ошибке снова размыкается.
+    
+    Args:
+        failure_threshold: число ошибок подряд для размыкания
+        reset_timeout: время в разомкнутом состоянии до пробной попытки
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Можно ли отправить запрос сейчас.
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = STATE_HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == STATE_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+    
+    def release(self):
+        """
+        Отменяет пробную попытку, которая завершилась не по вине хоста.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def retry_in(self):
+        """
+        Через сколько секунд будет разрешена пробная попытка (0 - уже можно).
+        """
+        with self._lock:
+            if self.state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class CircuitBreakers:
+    """
+    Набор предохранителей по хостам (создаются при первом обращении).
+    
+    Args:
+        failure_threshold: число ошибок подряд для размыкания
+        reset_timeout: время в разомкнутом состоянии до пробной попытки
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def for_url(self, url):
+        host = urlsplit(url).netloc.lower()
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    host, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        return breaker
+    
+    def states(self):
+        """
+        Текущее состояние предохранителей.
+        
+        Returns:
+            dict: {хост: состояние}
+        """
+        with self._lock:
+            return {host: breaker.state for host, breaker in self._breakers.items()}
+
+
+def send_with_retry(request, send, policy=None, breakers=None, sleep=time.sleep):
+    """
+    Отправляет подготовленный запрос с повторами и учетом предохранителя хоста.
+    
+    Запрос с потоковым телом (генератор, файл - все, кроме bytes и str)
+    не повторяется ни для какого метода: первая попытка уже прочитала
+    тело, и повтор отправил бы пустое или обрезанное.
+    
+    Args:
+        request: подготовленный запрос (requests.PreparedRequest)
+        send: функция, отправляющая подготовленный запрос
+        policy: RetryPolicy (None - без повторов)
+        breakers: CircuitBreakers (None - без предохранителей)
+        sleep: функция ожидания между попытками
+    
+    Returns:
+        requests.Response: Последний полученный ответ; атрибут retries
+        содержит число выполненных повторов
+    
+    Raises:
+        CircuitOpenError: Если предохранитель хоста разомкнут
+        requests.exceptions.RequestException: Если все попытки завершились ошибкой
+    """
+    breaker = breakers.for_url(request.url) if breakers is not None else None
+    max_retries = policy.retries if policy is not None and policy.allows(request.method) else 0
+    if not isinstance(request.body, (bytes, str, type(None))):
+        max_retries = 0
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                f"Хост временно недоступен, повтор через {breaker.retry_in():.0f} с: {request.url}",
+                request=request)
+        try:
+            response = send(request.copy())
+        except RETRY_EXCEPTIONS:
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt >= max_retries:
+                raise
+            sleep(policy.backoff(attempt))
+            attempt += 1
+            continue
+        except BaseException:
+            # Любое другое исключение (ошибка запроса, KeyboardInterrupt,
+            # ValueError планировщика) - не вина хоста, но пробную попытку
+            # нужно освободить, иначе предохранитель навсегда останется
+            # полуразомкнутым
+            if breaker is not None:
+                breaker.release()
+            raise
+        
+        if breaker is not None:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        
+        if attempt >= max_retries or response.status_code not in policy.statuses:
+            response.retries = attempt
+            return response
+        
+        delay = policy.backoff(attempt)
+        retry_after = policy.retry_after(response)
+        if retry_after is not None:
+            if retry_after > policy.max_retry_after:
+                response.retries = attempt
+                return response
+            delay = max(delay, retry_after)
+        response.close()
+        sleep(delay)
+        attempt += 1
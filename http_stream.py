@@ -0,0 +1,249 @@
+import argparse
+import codecs
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+from http_client import get_client
+
+# Размер читаемого блока (байты)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Сколько байт начала тела хранится в памяти для просмотра
+DEFAULT_MAX_BUFFER_BYTES = 64 * 1024
+
+
+class StreamStats:
+    """
+    Статистика потоковой загрузки.
+    
+    Attributes:
+        status_code: HTTP статус ответа
+        bytes_received: сколько байт тела получено (после распаковки)
+        wire_bytes: сколько байт тела пришло по сети (для сжатого ответа - сжатых)
+        encoding: Content-Encoding ответа ('identity' - без сжатия)
+        time_to_headers: время до получения заголовков (секунды)
+        time_to_first_byte: время до первого байта тела (секунды, None для пустого тела)
+        elapsed: полное время загрузки (секунды)
+        head: первые max_buffer_bytes байт тела
+    """
+    
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.bytes_received = 0
+        self.wire_bytes = 0
+        self.encoding = "identity"
+        self.time_to_headers = None
+        self.time_to_first_byte = None
+        self.elapsed = None
+        self.head = b""
+    
+    def as_dict(self):
+        return {
+            "status_code": self.status_code,
+            "bytes_received": self.bytes_received,
+            "wire_bytes": self.wire_bytes,
+            "encoding": self.encoding,
+            "time_to_headers": self.time_to_headers,
+            "time_to_first_byte": self.time_to_first_byte,
+            "elapsed": self.elapsed,
+        }
+
+
+def open_stream(method, url, **kwargs):
+    """
+    Отправляет запрос в потоковом режиме (stream=True) через общий клиент.
+    
+    Returns:
+        tuple: (response, started_at) - ответ с непрочитанным телом и время
+        отправки запроса по time.perf_counter()
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или таймауте
+    """
+    started_at = time.perf_counter()
+    response = get_client().request(method, url, stream=True, **kwargs)
+    return response, started_at
+
+
+def stream_to(response, output, started_at=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              max_buffer_bytes=DEFAULT_MAX_BUFFER_BYTES):
+    """
+    Записывает тело ответа в output по мере поступления блоков.
+    
+    В памяти хранится только текущий блок и первые max_buffer_bytes байт.
+    
+    Args:
+        response: ответ, полученный с stream=True
+        output: бинарный поток для записи (файл или sys.stdout.buffer)
+        started_at: время отправки запроса (time.perf_counter()) для расчета TTFB
+        chunk_size: размер читаемого блока
+        max_buffer_bytes: сколько байт начала тела сохранить в stats.head
+    
+    Returns:
+        StreamStats: Статистика загрузки
+    """
+    if started_at is None:
+        started_at = time.perf_counter()
+    stats = StreamStats(response.status_code)
+    stats.time_to_headers = time.perf_counter() - started_at
+    head = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            if stats.time_to_first_byte is None:
+                stats.time_to_first_byte = time.perf_counter() - started_at
+            stats.bytes_received += len(chunk)
+            if len(head) < max_buffer_bytes:
+                head.extend(chunk[:max_buffer_bytes - len(head)])
+            if output is not None:
+                output.write(chunk)
+                output.flush()
+        # До close: после закрытия urllib3 уже не знает, сколько прочитано
+        stats.wire_bytes = response.raw.tell() or stats.bytes_received
+    finally:
+        response.close()
+    stats.elapsed = time.perf_counter() - started_at
+    stats.head = bytes(head)
+    stats.encoding = response.headers.get("Content-Encoding", "identity").strip().lower() or "identity"
+    metrics = get_client().metrics
+    if metrics is not None:
+        metrics.record_transfer(urlsplit(response.url).netloc.lower(), stats.encoding,
+                                stats.wire_bytes, stats.bytes_received)
+    return stats
+
+
+def _iter_text(response, chunk_size):
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            yield decoder.decode(chunk)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_ndjson(response, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Построчно разбирает тело в формате NDJSON (JSON Lines).
+    
+    Yields:
+        object: Очередная запись; пустые строки пропускаются
+    """
+    buffer = ""
+    try:
+        for text in _iter_text(response, chunk_size):
+            buffer += text
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if buffer.strip():
+            yield json.loads(buffer)
+    finally:
+        response.close()
+
+
+def iter_json_array(response, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Инкрементально разбирает тело вида [obj, obj, ...], не загружая весь документ.
+    
+    В памяти хранится только еще не разобранный хвост буфера. Если тело
+    не является массивом, целиком выдается единственный объект.
+    
+    Yields:
+        object: Очередной элемент массива
+    
+    Raises:
+        ValueError: Если тело не является корректным JSON
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    in_array = None
+    finished = False
+    try:
+        texts = _iter_text(response, chunk_size)
+        while True:
+            text = next(texts, None)
+            if text is None:
+                finished = True
+            else:
+                buffer = buffer[position:] + text
+                position = 0
+            
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if position >= len(buffer):
+                    break
+                if in_array is None:
+                    in_array = buffer[position] == "["
+                    if in_array:
+                        position += 1
+                    continue
+                if in_array and buffer[position] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if finished:
+                        raise
+                    break
+                # Число в конце буфера может быть еще не дочитано
+                if end >= len(buffer) and not finished:
+                    break
+                position = end
+                yield item
+                if not in_array:
+                    return
+            
+            if finished:
+                if in_array:
+                    raise ValueError("Неожиданный конец JSON массива")
+                return
+    finally:
+        response.close()
+
+
+def main(argv=None):
+    """
+    Потоковая загрузка URL: вывод тела по мере получения или разбор записей.
+    """
+    parser = argparse.ArgumentParser(description="Потоковая загрузка HTTP ответа")
+    parser.add_argument("url", help="URL для запроса")
+    parser.add_argument("-X", "--method", default="GET", help="HTTP метод (по умолчанию GET)")
+    parser.add_argument("-o", "--output", help="файл для сохранения тела (по умолчанию stdout)")
+    parser.add_argument("--max-buffer", type=int, default=DEFAULT_MAX_BUFFER_BYTES,
+                        help="сколько байт тела держать в памяти")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--ndjson", action="store_true", help="разбирать тело как NDJSON")
+    mode.add_argument("--json-array", action="store_true", help="разбирать тело как JSON массив")
+    args = parser.parse_args(argv)
+    
+    response, started_at = open_stream(args.method, args.url)
+    print(f"Status Code: {response.status_code}", file=sys.stderr)
+    if args.ndjson or args.json_array:
+        records = iter_ndjson(response) if args.ndjson else iter_json_array(response)
+        count = 0
+        for record in records:
+            if count == 0:
+                print(f"Time to first record: {time.perf_counter() - started_at:.3f}s", file=sys.stderr)
+            print(json.dumps(record, ensure_ascii=False))
+            count += 1
+        print(f"Records: {count}", file=sys.stderr)
+        return
+    
+    if args.output:
+        with open(args.output, "wb") as f:
+            stats = stream_to(response, f, started_at, max_buffer_bytes=args.max_buffer)
+    else:
+        stats = stream_to(response, sys.stdout.buffer, started_at, max_buffer_bytes=args.max_buffer)
+    ttfb = f"{stats.time_to_first_byte:.3f}s" if stats.time_to_first_byte is not None else "-"
+    print(f"\nBytes: {stats.bytes_received}, TTFB: {ttfb}, Elapsed: {stats.elapsed:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
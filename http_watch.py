@@ -0,0 +1,454 @@
+import argparse
+import hashlib
+import heapq
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from http_metrics import REGISTRY
+
+# Интервал опроса по умолчанию (секунды)
+DEFAULT_INTERVAL = 30.0
+
+# Сколько адресов опрашивается одновременно
+DEFAULT_MAX_WORKERS = 8
+
+# До какой глубины JSON сравнивается по отдельным полям; более глубокие
+# объекты и массивы сравниваются целиком (и в изменениях выводятся целиком)
+DEFAULT_DIFF_DEPTH = 4
+
+# Сколько символов значения поля выводится в изменениях
+MAX_VALUE_CHARS = 120
+
+REGISTRY.describe("http_watch_polls_total",
+                  "Опросы наблюдаемых адресов по результату: initial, not_modified, unchanged, changed, error")
+
+
+def body_digest(content):
+    """
+    Хэш тела ответа (16 байт): по нему неизмененное тело узнается без
+    разбора JSON.
+    """
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _value_hash(value):
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big")
+
+
+def flatten(document, max_depth=DEFAULT_DIFF_DEPTH):
+    """
+    Раскладывает JSON документ на поля с путями вида 'name.common',
+    '[0].borders[2]'.
+    
+    Args:
+        document: разобранный JSON
+        max_depth: глубже этого уровня объекты и массивы - одно поле
+    
+    Yields:
+        tuple: (путь, значение); пустые объекты и массивы - тоже поля
+    """
+    stack = [("", document, 0)]
+    while stack:
+        path, value, depth = stack.pop()
+        if isinstance(value, dict) and value and depth < max_depth:
+            stack.extend((f"{path}.{key}" if path else str(key), item, depth + 1)
+                         for key, item in reversed(list(value.items())))
+        elif isinstance(value, list) and value and depth < max_depth:
+            stack.extend((f"{path}[{index}]", item, depth + 1)
+                         for index, item in reversed(list(enumerate(value))))
+        else:
+            yield path or "$", value
+
+
+def diff_fields(old, new_fields):
+    """
+    Сравнивает хэши полей прошлого ответа с полями нового.
+    
+    Args:
+        old: {путь: хэш значения} прошлого ответа
+        new_fields: [(путь, значение, хэш)] нового ответа
+    
+    Returns:
+        dict: added и changed - {путь: новое значение}, removed - [путь]
+    """
+    added = {}
+    changed = {}
+    for path, value, value_hash in new_fields:
+        previous = old.get(path)
+        if previous is None:
+            added[path] = value
+        elif previous != value_hash:
+            changed[path] = value
+    seen = {path for path, _, _ in new_fields}
+    removed = [path for path in old if path not in seen]
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+class WatchEntry:
+    """
+    Состояние одного наблюдаемого адреса между опросами.
+    
+    Хранится только необходимое для следующего опроса: валидаторы для
+    условного запроса (ETag, Last-Modified), хэш тела и 8-байтные хэши
+    полей JSON для структурного сравнения - но не само тело.
+    """
+    
+    __slots__ = ("url", "interval", "etag", "last_modified", "digest", "fields",
+                 "polls", "changes", "errors")
+    
+    def __init__(self, url, interval=DEFAULT_INTERVAL):
+        self.url = url
+        self.interval = interval
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.fields = None
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+    
+    def conditional_headers(self):
+        # no-store: ответ не проходит через кэш клиента - валидаторы и тело
+        # сравниваются здесь, и копия каждого тела в кэше не нужна
+        headers = {"Cache-Control": "no-store"}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "interval": self.interval,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "digest": self.digest.hex() if self.digest else None,
+            "fields": self.fields,
+        }
+    
+    def restore(self, state):
+        self.etag = state.get("etag")
+        self.last_modified = state.get("last_modified")
+        self.digest = bytes.fromhex(state["digest"]) if state.get("digest") else None
+        self.fields = state.get("fields")
+
+
+def poll(entry, client=None, timeout=None, max_depth=DEFAULT_DIFF_DEPTH):
+    """
+    Опрашивает адрес условным запросом и сравнивает ответ с прошлым.
+    
+    Ответ 304 и тело с тем же хэшем не разбираются. Измененное тело JSON
+    разбирается и сравнивается с прошлым по полям (flatten).
+    
+    Args:
+        entry: WatchEntry (обновляется)
+        client: HttpClient (по умолчанию общий клиент)
+        timeout: таймаут запроса в секундах
+        max_depth: глубина сравнения по полям
+    
+    Returns:
+        dict: Событие: url, result ('initial', 'not_modified', 'unchanged',
+        'changed' или 'error'), status, latency_ms и для изменений - diff
+        (или bytes, если тело не JSON)
+    """
+    if client is None:
+        from http_client import get_client
+        
+        client = get_client()
+    entry.polls += 1
+    event = {"url": entry.url}
+    started = time.perf_counter()
+    try:
+        response = client.get(entry.url, headers=entry.conditional_headers(), timeout=timeout)
+        content = response.content
+    except OSError as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        entry.errors += 1
+        event.update({"result": "error", "error": str(e)})
+        return event
+    event.update({"status": response.status_code, "latency_ms": round((time.perf_counter() - started) * 1000, 3)})
+    
+    if response.status_code == 304:
+        event["result"] = "not_modified"
+        return event
+    if response.status_code != 200:
+        entry.errors += 1
+        event.update({"result": "error", "error": f"Статус код {response.status_code}"})
+        return event
+    
+    entry.etag = response.headers.get("ETag")
+    entry.last_modified = response.headers.get("Last-Modified")
+    digest = body_digest(content)
+    if digest == entry.digest:
+        event["result"] = "unchanged"
+        return event
+    initial = entry.digest is None
+    entry.digest = digest
+    
+    try:
+        document = json.loads(content)
+    except ValueError:
+        entry.fields = None
+        event["bytes"] = len(content)
+    else:
+        new_fields = [(path, value, _value_hash(value)) for path, value in flatten(document, max_depth)]
+        if entry.fields is not None and not initial:
+            event["diff"] = diff_fields(entry.fields, new_fields)
+        entry.fields = {path: value_hash for path, _, value_hash in new_fields}
+        event["fields"] = len(new_fields)
+    if initial:
+        event["result"] = "initial"
+    else:
+        entry.changes += 1
+        event["result"] = "changed"
+    return event
+
+
+class Watcher:
+    """
+    Опрос набора адресов, у каждого - свой интервал.
+    
+    Очередь опросов - куча по времени следующего опроса, поэтому каждый
+    такт затрагивает только адреса, которым пора. Опросы выполняются
+    одновременно (не больше max_workers) по пулу соединений общего
+    клиента, и каждый обрабатывается, как только завершится: медленный
+    адрес не задерживает события и следующие опросы остальных.
+    
+    Args:
+        entries: список WatchEntry
+        max_workers: максимальное число одновременных опросов
+        timeout: таймаут запроса в секундах
+        max_depth: глубина сравнения по полям
+        client: HttpClient (по умолчанию общий клиент)
+    """
+    
+    def __init__(self, entries, max_workers=DEFAULT_MAX_WORKERS, timeout=None, max_depth=DEFAULT_DIFF_DEPTH,
+                 client=None):
+        self.entries = list(entries)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.client = client
+    
+    def run(self, on_event, count=None, duration=None):
+        """
+        Опрашивает адреса, пока не истечет duration секунд или каждый адрес
+        не будет опрошен count раз (None - без ограничения). Опросы, начатые
+        до истечения duration, дожидаются и тоже сообщаются.
+        
+        Args:
+            on_event: функция, вызываемая с каждым событием poll() в порядке
+                завершения опросов
+        """
+        if self.client is None:
+            from http_client import get_client
+            
+            self.client = get_client()
+        started = time.monotonic()
+        deadline = started + duration if duration is not None else None
+        queue = [(started, index) for index in range(len(self.entries))]
+        heapq.heapify(queue)
+        # Адрес либо в очереди, либо опрашивается - одновременно не больше одного его опроса
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="watch") as executor:
+            while queue or in_flight:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    queue.clear()
+                    if not in_flight:
+                        break
+                while queue and queue[0][0] <= now:
+                    due, index = heapq.heappop(queue)
+                    future = executor.submit(poll, self.entries[index], self.client, self.timeout, self.max_depth)
+                    in_flight[future] = (due, index)
+                wait_for = None
+                if queue:
+                    wait_for = queue[0][0] - now
+                    if deadline is not None:
+                        wait_for = min(wait_for, deadline - now)
+                if not in_flight:
+                    time.sleep(max(0.0, wait_for))
+                    continue
+                done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in done:
+                    due, index = in_flight.pop(future)
+                    event = future.result()
+                    REGISTRY.inc("http_watch_polls_total", result=event["result"])
+                    on_event(event)
+                    entry = self.entries[index]
+                    if count is None or entry.polls < count:
+                        # Без дрейфа: следующий опрос - от запланированного времени
+                        heapq.heappush(queue, (max(due + entry.interval, time.monotonic()), index))
+    
+    def summary(self):
+        return {
+            "urls": len(self.entries),
+            "polls": sum(entry.polls for entry in self.entries),
+            "changes": sum(entry.changes for entry in self.entries),
+            "errors": sum(entry.errors for entry in self.entries),
+        }
+
+
+def load_state(path, entries):
+    """
+    Восстанавливает состояние адресов из файла JSON (если он есть): первый
+    опрос после перезапуска сравнивается с последним сохраненным ответом.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = {state["url"]: state for state in json.load(f)}
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.url in saved:
+            entry.restore(saved[entry.url])
+
+
+def save_state(path, entries):
+    """
+    Сохраняет валидаторы и хэши адресов в файл JSON.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([entry.as_dict() for entry in entries], f, separators=(",", ":"))
+
+
+def read_watch_list(path, interval=DEFAULT_INTERVAL):
+    """
+    Читает список адресов: по строке 'URL [интервал в секундах]'; пустые
+    строки и строки с # пропускаются.
+    
+    Returns:
+        list: WatchEntry
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if parts:
+                entries.append(WatchEntry(parts[0], float(parts[1]) if len(parts) > 1 else interval))
+    return entries
+
+
+def country_url(country):
+    """
+    Адрес записи страны для наблюдения (поля полной карточки).
+    """
+    from urllib.parse import quote, urlencode
+    
+    from country_fields import fields_params
+    from country_render import FULL_VIEW_FIELDS
+    from country_search import resolve_country_code
+    from country_service import COUNTRY_API_URL
+    
+    code = resolve_country_code(country)
+    path = f"/alpha/{code}" if code else f"/name/{quote(country.strip(), safe='')}"
+    return f"{COUNTRY_API_URL}{path}?{urlencode(fields_params(FULL_VIEW_FIELDS))}"
+
+
+def _short(value):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 3] + "..."
+
+
+def print_event(event, verbose=False):
+    """
+    Выводит событие опроса: первое состояние - одной строкой, изменения -
+    по полям, без изменений - только при verbose.
+    """
+    stamp = time.strftime("%H:%M:%S")
+    result = event["result"]
+    if result == "error":
+        print(f"[{stamp}] ! {event['url']}: Ошибка: {event['error']}")
+    elif result in ("not_modified", "unchanged"):
+        if verbose:
+            reason = "304" if result == "not_modified" else "тело не изменилось"
+            print(f"[{stamp}] = {event['url']} ({reason}, {event['latency_ms']:.1f} мс)")
+    elif result == "initial":
+        size = f"{event['fields']} полей" if "fields" in event else f"{event['bytes']} байт (не JSON)"
+        print(f"[{stamp}] * {event['url']}: {event['status']}, {size}")
+    elif "diff" in event:
+        diff = event["diff"]
+        print(f"[{stamp}] ~ {event['url']}: изменено {len(diff['changed'])}, "
+              f"добавлено {len(diff['added'])}, удалено {len(diff['removed'])}")
+        for path, value in diff["changed"].items():
+            print(f"    ~ {path}: {_short(value)}")
+        for path, value in diff["added"].items():
+            print(f"    + {path}: {_short(value)}")
+        for path in diff["removed"]:
+            print(f"    - {path}")
+    else:
+        size = f"{event['fields']} полей" if "fields" in event else f"{event['bytes']} байт"
+        print(f"[{stamp}] ~ {event['url']}: тело изменилось ({size})")
+
+
+def main(argv=None):
+    """
+    Наблюдение за адресами: периодический условный опрос и вывод только
+    изменений.
+    
+    Returns:
+        int: 0 или 1, если были ошибки запросов
+    """
+    parser = argparse.ArgumentParser(description="Наблюдение за изменениями ответов GET")
+    parser.add_argument("urls", nargs="*", help="адреса для опроса")
+    parser.add_argument("-c", "--country", action="append", default=[], help="страна (можно повторять)")
+    parser.add_argument("-f", "--file", help="файл со строками 'URL [интервал]'")
+    parser.add_argument("-i", "--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"интервал опроса, с (по умолчанию {DEFAULT_INTERVAL:g})")
+    parser.add_argument("-n", "--count", type=int, help="опросить каждый адрес n раз и выйти")
+    parser.add_argument("--duration", type=float, help="наблюдать столько секунд и выйти")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"одновременных опросов (по умолчанию {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DIFF_DEPTH,
+                        help=f"глубина сравнения JSON по полям (по умолчанию {DEFAULT_DIFF_DEPTH})")
+    parser.add_argument("--timeout", type=float, help="таймаут запроса, с")
+    parser.add_argument("--state", help="файл JSON для сохранения состояния между запусками")
+    parser.add_argument("-v", "--verbose", action="store_true", help="выводить и опросы без изменений")
+    parser.add_argument("--json", action="store_true", help="события в формате NDJSON")
+    args = parser.parse_args(argv)
+    
+    try:
+        entries = [WatchEntry(url, args.interval) for url in args.urls]
+        entries += [WatchEntry(country_url(country), args.interval) for country in args.country]
+        if args.file:
+            entries += read_watch_list(args.file, args.interval)
+        if not entries:
+            parser.error("нужен хотя бы один адрес, --country или --file")
+        if args.state:
+            load_state(args.state, entries)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        return 1
+    
+    def on_event(event):
+        if args.json:
+            if args.verbose or event["result"] not in ("not_modified", "unchanged"):
+                print(json.dumps(event, ensure_ascii=False), flush=True)
+        else:
+            print_event(event, args.verbose)
+    
+    watcher = Watcher(entries, args.workers, args.timeout, args.depth)
+    try:
+        watcher.run(on_event, args.count, args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.state:
+            try:
+                save_state(args.state, entries)
+            except OSError as e:
+                print(f"Ошибка записи состояния в {args.state}: {e}")
+    
+    summary = watcher.summary()
+    # Итоги - в stderr, чтобы не смешиваться с NDJSON на stdout
+    print(f"Адресов: {summary['urls']}, опросов: {summary['polls']}, изменений: {summary['changes']}, "
+          f"ошибок: {summary['errors']}", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+import requests
+
+from cli_args import parse_header
+from http_client import HttpClient
+
+# Число значащих бит внутри одного диапазона гистограммы (точность ~0.8%)
+HISTOGRAM_SUB_BUCKET_BITS = 7
+
+# Перцентили, которые выводятся в отчете
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек в стиле HDR Histogram.
+    
+    Значения хранятся в микросекундах в логарифмически-линейных корзинах:
+    каждый диапазон [2^k, 2^(k+1)) делится на 2^HISTOGRAM_SUB_BUCKET_BITS
+    равных частей, поэтому относительная ошибка перцентилей не зависит от
+    масштаба, а память не зависит от числа записей.
+    """
+    
+    def __init__(self, sub_bucket_bits=HISTOGRAM_SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = Counter()
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+    
+    def _bucket(self, value):
+        shift = max(0, value.bit_length() - self.sub_bucket_bits)
+        return shift, value >> shift
+    
+    def record(self, seconds):
+        """
+        Добавляет значение задержки.
+        
+        Args:
+            seconds: задержка в секундах
+        """
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[self._bucket(value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+    
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+    
+    def percentile(self, percent):
+        """
+        Возвращает значение перцентиля в секундах (верхняя граница корзины).
+        """
+        if not self.total:
+            return 0.0
+        threshold = max(1, int(round(self.total * percent / 100)))
+        seen = 0
+        for shift, sub_bucket in sorted(self.counts):
+            seen += self.counts[(shift, sub_bucket)]
+            if seen >= threshold:
+                upper = ((sub_bucket + 1) << shift) - 1
+                return min(upper, self.max) / 1_000_000
+        return self.max / 1_000_000
+    
+    def mean(self):
+        return self.sum / self.total / 1_000_000 if self.total else 0.0
+
+
+class LoadResult:
+    """
+    Итоги нагрузочного теста.
+    """
+    
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.elapsed = 0.0
+    
+    @property
+    def requests(self):
+        return sum(self.statuses.values()) + sum(self.errors.values())
+    
+    @property
+    def throughput(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+    
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.statuses.update(other.statuses)
+        self.errors.update(other.errors)
+    
+    def as_dict(self):
+        histogram = self.histogram
+        latency = {f"p{p}": histogram.percentile(p) for p in REPORT_PERCENTILES}
+        latency.update({
+            "min": (histogram.min or 0) / 1_000_000,
+            "mean": histogram.mean(),
+            "max": histogram.max / 1_000_000,
+        })
+        return {
+            "requests": self.requests,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+            "errors": dict(self.errors),
+            "latency": latency,
+        }
+
+
+def run_load(url, method="GET", params=None, headers=None, data=None, json_body=None,
+             total=None, concurrency=10, rate=None, duration=None, timeout=10, client=None):
+    """
+    Выполняет нагрузочный тест URL.
+    
+    Запросы отправляются из concurrency потоков через пул keep-alive
+    соединений. Тест завершается, когда отправлено total запросов или
+    прошло duration секунд (что наступит раньше). Если задан rate, запросы
+    планируются равномерно с этой частотой, а задержка считается от
+    запланированного момента отправки, чтобы очередь на стороне клиента
+    не скрывала медленные ответы.
+    
+    Args:
+        url: URL для запроса
+        method: HTTP метод
+        params, headers, data, json_body: параметры запроса (как в get_request / post_request)
+        total: общее число запросов (None - без ограничения, нужен duration)
+        concurrency: число одновременных запросов
+        rate: целевая частота запросов в секунду (None - без ограничения)
+        duration: максимальная длительность теста в секундах
+        timeout: таймаут одного запроса
+        client: HttpClient (по умолчанию отдельный клиент без кэша)
+    
+    Returns:
+        LoadResult: Итоги теста
+    """
+    if total is None and duration is None:
+        raise ValueError("Нужно задать total или duration")
+    concurrency = max(1, concurrency)
+    own_client = client is None
+    if own_client:
+        client = HttpClient(timeout=timeout, pool_maxsize=concurrency, host_pool_sizes={})
+    
+    lock = threading.Lock()
+    counter = {"issued": 0}
+    started_at = time.perf_counter()
+    deadline = started_at + duration if duration is not None else None
+    results = [LoadResult() for _ in range(concurrency)]
+    
+    def next_ticket():
+        with lock:
+            index = counter["issued"]
+            if total is not None and index >= total:
+                return None
+            counter["issued"] += 1
+            return index
+    
+    def worker(result):
+        while True:
+            index = next_ticket()
+            if index is None:
+                return
+            scheduled = started_at + index / rate if rate else None
+            now = time.perf_counter()
+            if scheduled is not None and scheduled > now:
+                if deadline is not None and scheduled >= deadline:
+                    return
+                time.sleep(scheduled - now)
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            request_started = scheduled if scheduled is not None else time.perf_counter()
+            try:
+                response = client.request(method, url, params=params, headers=headers,
+                                          data=data, json=json_body, timeout=timeout)
+                response.content
+                result.statuses[response.status_code] += 1
+            except requests.exceptions.RequestException as e:
+                result.errors[type(e).__name__] += 1
+            result.histogram.record(time.perf_counter() - request_started)
+    
+    threads = [threading.Thread(target=worker, args=(result,), daemon=True) for result in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    summary = LoadResult()
+    for result in results:
+        summary.merge(result)
+    summary.elapsed = time.perf_counter() - started_at
+    if own_client:
+        client.close()
+    return summary
+
+
+def format_report(result):
+    """
+    Форматирует итоги нагрузочного теста для вывода в консоль.
+    """
+    report = result.as_dict()
+    latency = report["latency"]
+    lines = [
+        f"Запросов: {report['requests']} за {report['elapsed']:.2f} с ({report['throughput']:.1f} запр/с)",
+        "Статусы: " + (", ".join(f"{code}: {count}" for code, count in report["statuses"].items()) or "-"),
+    ]
+    if report["errors"]:
+        lines.append("Ошибки: " + ", ".join(f"{name}: {count}" for name, count in report["errors"].items()))
+    lines.append("Задержка (мс): " + ", ".join(
+        f"{name} {latency[name] * 1000:.2f}" for name in ("min", "mean", "p50", "p90", "p99", "max")))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Нагрузочный тест URL из командной строки.
+    
+    Returns:
+        int: 0 или 1, если были ошибки или ответы с кодом 4xx/5xx
+    """
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP endpoint")
+    parser.add_argument("url", help="URL для запроса")
+    parser.add_argument("-X", "--method", default="GET", help="HTTP метод (по умолчанию GET)")
+    parser.add_argument("-n", "--requests", type=int, dest="total", help="общее число запросов")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="число одновременных запросов")
+    parser.add_argument("-r", "--rate", type=float, help="целевая частота, запросов в секунду")
+    parser.add_argument("-d", "--duration", type=float, help="длительность теста в секундах")
+    parser.add_argument("-H", "--header", action="append", type=parse_header, default=[],
+                        help="заголовок 'Имя: значение' (можно повторять)")
+    parser.add_argument("--params", type=json.loads, help="параметры запроса в формате JSON")
+    parser.add_argument("--json-body", type=json.loads, help="JSON тело запроса")
+    parser.add_argument("--data", type=json.loads, help="form-data тело запроса в формате JSON")
+    parser.add_argument("--timeout", type=float, default=10, help="таймаут запроса в секундах")
+    parser.add_argument("--json", action="store_true", help="вывод итогов в формате JSON")
+    args = parser.parse_args(argv)
+    
+    if args.total is None and args.duration is None:
+        args.total = 100
+    result = run_load(args.url, method=args.method.upper(), params=args.params,
+                      headers=dict(args.header) or None, data=args.data, json_body=args.json_body,
+                      total=args.total, concurrency=args.concurrency, rate=args.rate,
+                      duration=args.duration, timeout=args.timeout)
+    if args.json:
+        print(json.dumps(result.as_dict(), indent=2))
+    else:
+        print(format_report(result))
+    return 1 if result.errors or any(status >= 400 for status in result.statuses) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,38 @@
-import requests
-from http_client import get
-
-try:
-    from country_info import get_country_info as get_full_country_info, display_country_info
-    from short_country_info import get_country_info as get_short_country_info, display_short_country_info
-    from colorama import Fore, Style, init
-    init(autoreset=True)
-except ImportError as e:
-    print(f"Ошибка импорта модулей: {e}")
-    get_full_country_info = None
-    display_country_info = None
-    get_short_country_info = None
-    display_short_country_info = None
-    Fore = None
-    Style = None
-
-
-def get_request(url, params=None, headers=None):
+import json as json_module
+import sys
+
+# requests, http_client и модули стран импортируются внутри функций, которым
+# они нужны: одноразовый вызов подкоманды загружает только свои зависимости
+
+
+def load_country_modules():
+    """
+    Импортирует модули для работы со странами.
+    
+    Returns:
+        dict: {'full': (get_country_info, display), 'short': (...)} или None,
+        если модули не удалось загрузить
+    """
+    try:
+        from country_info import get_country_info as get_full_country_info, display_country_info
+        from short_country_info import get_country_info as get_short_country_info, display_short_country_info
+    except ImportError as e:
+        print(f"Ошибка импорта модулей: {e}")
+        return None
+    return {
+        "full": (get_full_country_info, display_country_info),
+        "short": (get_short_country_info, display_short_country_info),
+    }
+
+
+def _print_transfer(response):
+    # Объем тела по сети и после распаковки (http_metrics.response_sizes)
+    sizes = getattr(response, "transfer", None)
+    if sizes and sizes["decoded_bytes"] is not None:
+        print(f"Transfer: {sizes['wire_bytes']} bytes ({sizes['encoding']}), decoded: {sizes['decoded_bytes']} bytes")
+
+
+def get_request(url, params=None, headers=None, stream=False, output=None):
     """
     Выполняет GET запрос к указанному URL.
     
@@ -24,16 +40,24 @@ def get_request(url, params=None, headers=None):
         url: URL для запроса
         params: словарь параметров запроса (опционально)
         headers: словарь заголовков (опционально)
+        stream: выводить тело по мере поступления, не загружая его в память целиком
+        output: файл для сохранения тела в потоковом режиме (по умолчанию вывод в консоль)
     """
+    if stream:
+        return stream_request("GET", url, output=output, params=params, headers=headers)
+    from http_client import get
+    
     response = get(url, params=params, headers=headers)
     if response:
         print(f"Status Code: {response.status_code}")
+        print(f"From Cache: {getattr(response, 'from_cache', False)}")
+        _print_transfer(response)
         print(f"Response Headers: {response.headers}")
         print(f"Response Body:\n{response.text}")
     return response
 
 
-def post_request(url, data=None, json=None, headers=None):
+def post_request(url, data=None, json=None, headers=None, stream=False, output=None):
     """
     Выполняет POST запрос к указанному URL.
     
@@ -42,10 +66,18 @@ def post_request(url, data=None, json=None, headers=None):
         data: данные для отправки (form-data, опционально)
         json: JSON данные для отправки (опционально)
         headers: словарь заголовков (опционально)
+        stream: выводить тело ответа по мере поступления
+        output: файл для сохранения тела в потоковом режиме (по умолчанию вывод в консоль)
     """
+    if stream:
+        return stream_request("POST", url, output=output, data=data, json=json, headers=headers)
+    import requests
+    from http_client import get_client
+    
     try:
-        response = requests.post(url, data=data, json=json, headers=headers)
+        response = get_client().post(url, data=data, json=json, headers=headers)
         print(f"Status Code: {response.status_code}")
+        _print_transfer(response)
         print(f"Response Headers: {response.headers}")
         print(f"Response Body:\n{response.text}")
         return response
@@ -53,54 +85,235 @@ def post_request(url, data=None, json=None, headers=None):
         print(f"Error: {e}")
         return None
 
+
+def stream_request(method, url, output=None, **kwargs):
+    """
+    Выполняет запрос в потоковом режиме: тело выводится (или пишется в файл)
+    блоками по мере поступления, в памяти хранится только начало тела.
+    
+    Args:
+        method: HTTP метод
+        url: URL для запроса
+        output: путь к файлу для сохранения тела (по умолчанию вывод в консоль)
+        **kwargs: параметры запроса (params, data, json, headers)
+    
+    Returns:
+        http_stream.StreamStats: Статистика загрузки или None при ошибке
+    """
+    import requests
+    from http_stream import open_stream, stream_to
+    
+    # Файл открывается до запроса: с недоступным путем запрос не отправляется
+    try:
+        output_file = open(output, "wb") if output else None
+    except OSError as e:
+        print(f"Ошибка: не удалось открыть файл для записи: {e}")
+        return None
+    try:
+        response, started_at = open_stream(method, url, **kwargs)
+        print(f"Status Code: {response.status_code}")
+        print(f"Response Headers: {response.headers}")
+        if output_file is not None:
+            stats = stream_to(response, output_file, started_at)
+            print(f"Response Body: сохранено в {output}")
+        else:
+            print("Response Body:")
+            sys.stdout.flush()
+            stats = stream_to(response, sys.stdout.buffer, started_at)
+            print()
+    except requests.exceptions.RequestException as e:
+        print(f"Error: {e}")
+        return None
+    except OSError as e:
+        # Ошибка записи (например, закончилось место на диске)
+        print(f"Ошибка записи тела: {e}")
+        return None
+    finally:
+        if output_file is not None:
+            output_file.close()
+    ttfb = f"{stats.time_to_first_byte * 1000:.1f} ms" if stats.time_to_first_byte is not None else "-"
+    print(f"Bytes: {stats.bytes_received} (wire: {stats.wire_bytes}, {stats.encoding}), Time to first byte: {ttfb}, Total: {stats.elapsed * 1000:.1f} ms")
+    return stats
+
 # GET запрос для страны
 def make_get_country_request(country: str):
     url = f"https://restcountries.com/v3.1/name/{country}"
     get_request(url)
 
 
-def get_random_dog():
+def get_random_dog(breed=None, count=1):
     """
-    Получает случайное изображение собаки и выводит ссылку.
+    Выводит ссылки на случайные изображения собак.
+    
+    Ссылки берутся из буфера dog_pool, который заранее загружает их пачками
+    и дозагружает в фоне, поэтому повторные вызовы не ждут сети.
+    
+    Args:
+        breed: порода ('hound' или 'hound/afghan'), None - любая
+        count: сколько ссылок вывести
+    
+    Returns:
+        str: Последняя ссылка или None при ошибке
     """
-    url = "https://dog.ceo/api/breeds/image/random"
-    response = get(url)
-    if response:
-        status_code = response.status_code
-        data = response.json()
-        if data.get('status') == 'success':
-            image_url = data.get('message', '')
-            print(f"\n=== Случайная собака ===")
-            # Вывод статус кода
-            if Fore and Style:
-                status_color = Fore.GREEN if 200 <= status_code < 300 else Fore.RED
-                print(f"{Fore.YELLOW}{Style.BRIGHT}HTTP Status Code:{Style.RESET_ALL} {status_color}{status_code}\n")
-            else:
-                print(f"HTTP Status Code: {status_code}\n")
-            print(f"Ссылка на изображение: {image_url}")
-            return image_url
-        else:
-            print("Ошибка: API вернул статус 'error'")
+    import requests
+    from dog_pool import get_dog_pools
+    
+    try:
+        pool = get_dog_pools().pool(breed)
+        images = pool.take(count)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return None
+    except TimeoutError as e:
+        print(f"Ошибка: {e}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Ошибка при запросе: {e}")
+        return None
+    if not images:
+        print("Ошибка: API не вернул изображений")
+        return None
+    
+    # Ссылки выдаются из буфера, часто без запроса к API, поэтому HTTP
+    # статуса у этого вызова нет
+    print(f"\n=== Случайная собака ===\n")
+    for image_url in images:
+        print(f"Ссылка на изображение: {image_url}")
+    return images[-1]
+
+
+def ask_stream_options():
+    """
+    Спрашивает, нужен ли потоковый режим и куда сохранять тело ответа.
+    
+    Returns:
+        tuple: (stream, output) - включен ли потоковый режим и путь к файлу (или None)
+    """
+    stream = input("Потоковый режим (y/N): ").strip().lower() in ("y", "yes", "д", "да")
+    output = None
+    if stream:
+        output = input("Файл для сохранения тела (Enter - вывод в консоль): ").strip() or None
+    return stream, output
+
+
+def ask_json(prompt, error_message):
+    """
+    Запрашивает необязательное значение в формате JSON.
+    
+    Returns:
+        tuple: (ok, value) - ok=False, если введен некорректный JSON
+    """
+    value = input(prompt).strip()
+    if not value:
+        return True, None
+    try:
+        return True, json_module.loads(value)
+    except json_module.JSONDecodeError:
+        print(error_message)
+        return False, None
+
+
+def ask_post_body():
+    """
+    Запрашивает тип и тело POST запроса: form-data или JSON.
+    
+    Returns:
+        tuple: (ok, data, json) - ok=False при неверном типе или некорректном
+        JSON; заполнено не больше одного из data и json
+    """
+    data_type = input("Тип данных (1 - form-data, 2 - JSON): ").strip()
+    if data_type == "1":
+        ok, data = ask_json("Данные (JSON формат, или Enter для пропуска): ",
+                            "Ошибка: неверный формат JSON для данных")
+        return ok, data, None
+    if data_type == "2":
+        ok, json_data = ask_json("JSON данные (JSON формат, или Enter для пропуска): ",
+                                 "Ошибка: неверный формат JSON")
+        return ok, None, json_data
+    print("Неверный выбор типа данных")
+    return False, None, None
+
+
+def ask_number(prompt, cast=int):
+    """
+    Запрашивает необязательное положительное число (Enter - None).
+    """
+    value = input(prompt).strip()
+    if not value:
+        return None
+    try:
+        number = cast(value)
+    except ValueError:
+        print("Ошибка: ожидалось число")
+        return None
+    return number if number > 0 else None
+
+
+def load_test_menu():
+    """
+    Запрашивает параметры запроса (как для GET/POST) и параметры нагрузки,
+    запускает нагрузочный тест и выводит итоги.
+    """
+    from load_test import run_load, format_report
+    
+    method = "POST" if input("Метод (1 - GET, 2 - POST): ").strip() == "2" else "GET"
+    url = input("Введите URL: ").strip()
+    if not url:
+        print("URL не может быть пустым")
+        return None
+    
+    ok, params = ask_json("Параметры запроса (JSON формат, или Enter для пропуска): ",
+                          "Ошибка: неверный формат JSON для параметров")
+    if not ok:
+        return None
+    ok, headers = ask_json("Заголовки (JSON формат, или Enter для пропуска): ",
+                           "Ошибка: неверный формат JSON для заголовков")
+    if not ok:
+        return None
+    data = json_body = None
+    if method == "POST":
+        ok, data, json_body = ask_post_body()
+        if not ok:
             return None
-    return None
+    
+    total = ask_number("Всего запросов (Enter - 100): ")
+    concurrency = ask_number("Одновременных запросов (Enter - 10): ") or 10
+    rate = ask_number("Целевая частота, запросов/с (Enter - без ограничения): ", float)
+    duration = ask_number("Длительность, с (Enter - без ограничения): ", float)
+    if total is None and duration is None:
+        total = 100
+    
+    print(f"\nЗапуск: {method} {url}...")
+    result = run_load(url, method=method, params=params, headers=headers, data=data, json_body=json_body,
+                      total=total, concurrency=concurrency, rate=rate, duration=duration)
+    print(format_report(result))
+    if input("Вывести итоги в JSON (y/N): ").strip().lower() in ("y", "yes", "д", "да"):
+        print(json_module.dumps(result.as_dict(), indent=2))
+    return result
 
 
-def main():
+def interactive_menu():
     """
-    Основная функция для выбора типа запроса.
+    Интерактивное меню для выбора типа запроса.
+    
+    Пока меню ждет ввода, в фоне прогреваются соединения к restcountries.com
+    и dog.ceo, а после полной карточки страны заранее загружаются ее соседи.
     """
     import json
+    from http_prefetch import warm_up
     
     while True:
+        warm_up()
         print("\n" + "="*50)
         print("Выберите тип запроса:")
         print("1 - GET запрос")
         print("2 - POST запрос")
         print("3 - GET запрос для страны")
         print("4 - Случайная собака")
-        print("5 - Выход")
+        print("5 - Нагрузочный тест")
+        print("6 - Выход")
         
-        choice = input("\nВведите номер (1-5): ").strip()
+        choice = input("\nВведите номер (1-6): ").strip()
         
         if choice == "1":
             print("\n=== GET запрос ===")
@@ -129,7 +342,8 @@ def main():
                     print("Ошибка: неверный формат JSON для заголовков")
                     continue
             
-            get_request(url, params=params, headers=headers)
+            stream, output = ask_stream_options()
+            get_request(url, params=params, headers=headers, stream=stream, output=output)
         
         elif choice == "2":
             print("\n=== POST запрос ===")
@@ -138,7 +352,6 @@ def main():
                 print("URL не может быть пустым")
                 continue
             
-            data_type = input("Тип данных (1 - form-data, 2 - JSON): ").strip()
             headers_input = input("Заголовки (JSON формат, или Enter для пропуска): ").strip()
             
             headers = None
@@ -149,35 +362,24 @@ def main():
                     print("Ошибка: неверный формат JSON для заголовков")
                     continue
             
-            if data_type == "1":
-                data_input = input("Данные (JSON формат): ").strip()
-                if data_input:
-                    try:
-                        data = json.loads(data_input)
-                        post_request(url, data=data, headers=headers)
-                    except json.JSONDecodeError:
-                        print("Ошибка: неверный формат JSON для данных")
-                else:
-                    post_request(url, data=None, headers=headers)
-            elif data_type == "2":
-                json_input = input("JSON данные (JSON формат): ").strip()
-                if json_input:
-                    try:
-                        json_data = json.loads(json_input)
-                        post_request(url, json=json_data, headers=headers)
-                    except json.JSONDecodeError:
-                        print("Ошибка: неверный формат JSON")
-                else:
-                    post_request(url, json=None, headers=headers)
-            else:
-                print("Неверный выбор типа данных")
+            stream, output = ask_stream_options()
+            
+            ok, data, json_data = ask_post_body()
+            if ok:
+                post_request(url, data=data, json=json_data, headers=headers, stream=stream, output=output)
         
         elif choice == "3":
-            if not get_full_country_info or not display_country_info:
+            country_modules = load_country_modules()
+            if not country_modules:
                 print("Ошибка: модули для работы со странами не загружены")
                 continue
+            get_full_country_info, display_country_info = country_modules["full"]
+            get_short_country_info, display_short_country_info = country_modules["short"]
+            
+            from country_service import cancel_prefetch, load_neighbours
             
             while True:
+                warm_up()
                 print("\n=== Информация о стране ===")
                 print("Выберите тип информации:")
                 print("1 - Полная информация по стране")
@@ -194,7 +396,7 @@ def main():
                     print(f"\nЗагрузка полной информации о {country}...")
                     status_code, country_data = get_full_country_info(country)
                     if country_data:
-                        display_country_info(country_data, status_code)
+                        display_country_info(country_data, status_code, load_neighbours(country_data))
                     else:
                         print("Не удалось получить информацию о стране")
                 
@@ -211,6 +413,7 @@ def main():
                         print("Не удалось получить информацию о стране")
                 
                 elif sub_choice == "3":
+                    cancel_prefetch()
                     break
                 
                 else:
@@ -218,15 +421,149 @@ def main():
         
         elif choice == "4":
             print("\n=== Случайная собака ===")
-            get_random_dog()
+            breed = input("Порода (например, hound или hound/afghan; Enter - любая): ").strip() or None
+            get_random_dog(breed)
         
         elif choice == "5":
+            print("\n=== Нагрузочный тест ===")
+            load_test_menu()
+        
+        elif choice == "6":
             print("Выход из программы.")
             break
         
         else:
-            print("Неверный выбор. Используйте 1, 2, 3, 4 или 5.")
+            print("Неверный выбор. Используйте 1, 2, 3, 4, 5 или 6.")
+
+
+
+# Подкоманды, которые передают аргументы в main() своего модуля
+DELEGATED_COMMANDS = {
+    "batch": "country_batch",
+    "load": "load_test",
+    "geo": "country_geo",
+    "borders": "country_borders",
+    "bulk": "http_bulk",
+    "watch": "http_watch",
+}
+
+
+def show_country(names, view="full"):
+    """
+    Выводит карточки стран без интерактивного ввода.
+    
+    Returns:
+        int: Код завершения (1, если хотя бы одну страну получить не удалось)
+    """
+    country_modules = load_country_modules()
+    if not country_modules:
+        return 1
+    fetch, display = country_modules[view]
+    results = [(country, *fetch(country)) for country in names]
+    if view == "full":
+        from functools import partial
+        
+        from country_borders import border_names
+        
+        # Названия соседей всех карточек - одним запросом, как в country_batch
+        display = partial(display, names=border_names(*(data for _, _, data in results if data)))
+    exit_code = 0
+    for country, status_code, country_data in results:
+        if country_data:
+            display(country_data, status_code)
+        else:
+            print(f"Не удалось получить информацию о стране '{country}'")
+            exit_code = 1
+    return exit_code
+
+
+def build_parser():
+    """
+    Парсер подкоманд командной строки.
+    """
+    import argparse
+    
+    from cli_args import parse_header
+    
+    parser = argparse.ArgumentParser(
+        description="HTTP клиент и информация о странах (без аргументов - интерактивное меню)")
+    commands = parser.add_subparsers(dest="command", metavar="команда")
+    
+    def add_request_options(command):
+        command.add_argument("url", help="URL для запроса")
+        command.add_argument("-H", "--header", action="append", type=parse_header, default=[],
+                             help="заголовок 'Имя: значение' (можно повторять)")
+        command.add_argument("--stream", action="store_true", help="выводить тело по мере поступления")
+        command.add_argument("-o", "--output", help="файл для сохранения тела (включает --stream)")
+    
+    get_command = commands.add_parser("get", help="GET запрос")
+    add_request_options(get_command)
+    get_command.add_argument("--params", type=json_module.loads, help="параметры запроса в формате JSON")
+    
+    post_command = commands.add_parser("post", help="POST запрос")
+    add_request_options(post_command)
+    body = post_command.add_mutually_exclusive_group()
+    body.add_argument("--data", type=json_module.loads, help="form-data тело в формате JSON")
+    body.add_argument("--json", type=json_module.loads, help="JSON тело")
+    
+    country_command = commands.add_parser("country", help="информация о стране")
+    country_command.add_argument("names", nargs="+", metavar="country", help="название страны")
+    view_group = country_command.add_mutually_exclusive_group()
+    view_group.add_argument("--full", dest="view", action="store_const", const="full",
+                            help="полная информация (по умолчанию)")
+    view_group.add_argument("--short", dest="view", action="store_const", const="short",
+                            help="краткая информация")
+    country_command.set_defaults(view="full")
+    
+    dog_command = commands.add_parser("dog", help="случайная собака")
+    dog_command.add_argument("-b", "--breed", help="порода ('hound' или 'hound/afghan')")
+    dog_command.add_argument("-n", "--count", type=int, default=1, help="сколько ссылок вывести")
+    
+    # Аргументы этих подкоманд разбирают сами модули (см. main)
+    commands.add_parser("batch", help="пакетный режим (аргументы country_batch.py)", add_help=False)
+    commands.add_parser("load", help="нагрузочный тест (аргументы load_test.py)", add_help=False)
+    commands.add_parser("geo", help="геопоиск стран (аргументы country_geo.py)", add_help=False)
+    commands.add_parser("borders", help="граф границ стран (аргументы country_borders.py)", add_help=False)
+    commands.add_parser("bulk", help="пакетная отправка запросов из NDJSON (аргументы http_bulk.py)",
+                        add_help=False)
+    commands.add_parser("watch", help="наблюдение за изменениями ответов GET (аргументы http_watch.py)",
+                        add_help=False)
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа: без аргументов - интерактивное меню, иначе подкоманда.
+    
+    Returns:
+        int: Код завершения процесса
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive_menu()
+        return 0
+    if argv[0] in DELEGATED_COMMANDS:
+        import importlib
+        
+        # main() модуля возвращает код завершения
+        return importlib.import_module(DELEGATED_COMMANDS[argv[0]]).main(argv[1:])
+    
+    args = build_parser().parse_args(argv)
+    if args.command == "get":
+        result = get_request(args.url, params=args.params, headers=dict(args.header) or None,
+                             stream=args.stream or bool(args.output), output=args.output)
+    elif args.command == "post":
+        result = post_request(args.url, data=args.data, json=args.json, headers=dict(args.header) or None,
+                              stream=args.stream or bool(args.output), output=args.output)
+    elif args.command == "country":
+        return show_country(args.names, args.view)
+    elif args.command == "dog":
+        result = get_random_dog(args.breed, max(1, args.count))
+    else:
+        build_parser().print_help()
+        return 2
+    return 0 if result is not None else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,549 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Записанные ответы по умолчанию (небольшой образец в формате API)
+DEFAULT_PAYLOADS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_payloads.json")
+
+# Хосты, запросы к которым обслуживает заглушка
+STUB_HOSTS = ("restcountries.com", "dog.ceo")
+
+# Больше изображений за один запрос /random/{n} Dog API не отдает
+MAX_DOG_IMAGES = 50
+
+# Больше полей /all настоящий API за один запрос не отдает
+MAX_ALL_FIELDS = 10
+
+# Retry-After (секунды) в ответах 429 при превышении rate_limit
+RATE_LIMIT_RETRY_AFTER = 1
+
+# Тела меньше этого размера отдаются без сжатия (как у большинства серверов)
+COMPRESS_MIN_BYTES = 256
+
+
+def server_encodings():
+    """
+    Кодировки сжатия, которые может отдавать заглушка, в порядке
+    предпочтения сервера. br и zstd - только при установленных brotli и
+    zstandard.
+    
+    Returns:
+        tuple: Названия кодировок
+    """
+    encodings = []
+    try:
+        import zstandard  # noqa: F401
+        encodings.append("zstd")
+    except ImportError:
+        pass
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        pass
+    return tuple(encodings + ["gzip", "deflate"])
+
+
+def negotiate_encoding(accept_encoding, available):
+    """
+    Выбирает кодировку ответа по заголовку Accept-Encoding.
+    
+    Args:
+        accept_encoding: значение заголовка (None - клиент сжатие не просил)
+        available: кодировки сервера в порядке предпочтения
+    
+    Returns:
+        str: Кодировка или 'identity'
+    """
+    if not accept_encoding:
+        return "identity"
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().lower().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in available:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return "identity"
+
+
+@lru_cache(maxsize=64)
+def compress_body(body, encoding):
+    """
+    Сжимает тело ответа (результат кэшируется: заглушка отдает одни и те
+    же ответы много раз).
+    """
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+    if encoding == "deflate":
+        return zlib.compress(body, 6)
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=5)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def load_payloads(path=DEFAULT_PAYLOADS_PATH):
+    """
+    Загружает записанные ответы API.
+    
+    Returns:
+        dict: {'countries': [...], 'breeds': {...}, 'recorded_at': ...}
+    
+    Raises:
+        OSError, ValueError: Если файл не читается или это не JSON
+    """
+    with open(path, encoding="utf-8") as f:
+        payloads = json.load(f)
+    payloads.setdefault("countries", [])
+    payloads.setdefault("breeds", {})
+    return payloads
+
+
+def record_payloads(path):
+    """
+    Записывает настоящие ответы restcountries.com и dog.ceo в файл для
+    последующей работы без сети.
+    
+    Returns:
+        dict: Записанные ответы
+    
+    Raises:
+        requests.exceptions.RequestException: При ошибках сети или неуспешном статусе
+    """
+    from http_client import get_client
+    from country_snapshot import CountrySnapshot
+    from dog_pool import DOG_API_URL
+    
+    countries = CountrySnapshot.download().countries
+    response = get_client().get(f"{DOG_API_URL}/breeds/list/all")
+    response.raise_for_status()
+    payloads = {
+        "recorded_at": time.time(),
+        "source": "recorded",
+        "countries": countries,
+        "breeds": response.json().get("message") or {},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payloads, f, ensure_ascii=False)
+    return payloads
+
+
+def _project(country_data, fields):
+    if not fields:
+        return country_data
+    return {field: country_data[field] for field in fields if field in country_data}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов: маршруты REST Countries v3.1 и Dog API.
+    """
+    
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        # Заголовки и тело уходят отдельными записями; без TCP_NODELAY
+        # алгоритм Нейгла вместе с отложенным ACK клиента добавляет ~40 мс
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status, payload, headers=None):
+        stub = self.server.stub
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = None
+        if stub.etags and status == 200 and self.command == "GET":
+            # Слабый валидатор: одно значение для тела в любой кодировке сжатия
+            etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if etag in (self.headers.get("If-None-Match") or ""):
+                stub.count_not_modified()
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        encoding = "identity"
+        if stub.encodings and len(body) >= COMPRESS_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"), stub.encodings)
+            body = compress_body(body, encoding)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        if stub.encodings:
+            self.send_header("Vary", "Accept-Encoding")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+    
+    def _inject(self, over_capacity=False):
+        # Ограничения, задержка и ошибка по настройкам заглушки; True - ошибка уже отправлена
+        stub = self.server.stub
+        if not stub.admit():
+            self._send_json(429, {"status": 429, "message": "Too Many Requests"},
+                            {"Retry-After": str(RATE_LIMIT_RETRY_AFTER)})
+            return True
+        if over_capacity:
+            self._send_json(503, {"status": 503, "message": "Service Unavailable"})
+            return True
+        delay, fail = stub.next_fault()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._send_json(stub.error_status, {"status": stub.error_status, "message": "Injected error"})
+        return fail
+    
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count_request()
+        with stub.in_flight() as over_capacity:
+            if self._inject(over_capacity):
+                return
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            path = unquote(parts.path).rstrip("/")
+            if path.startswith("/v3.1"):
+                fields = query["fields"][0].split(",") if query.get("fields") else None
+                status, payload = stub.countries_response(path[len("/v3.1"):], query, fields)
+            elif path.startswith("/api"):
+                status, payload = stub.dogs_response(path[len("/api"):])
+            else:
+                status, payload = 404, {"status": 404, "message": "Not Found"}
+            self._send_json(status, payload)
+    
+    def do_HEAD(self):
+        # Заголовки как у GET, без тела (так прогревает соединения HttpClient.preconnect)
+        self.do_GET()
+    
+    def _read_body(self):
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Завершающие заголовки (trailers) до пустой строки
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+    
+    def do_POST(self):
+        stub = self.server.stub
+        stub.count_request()
+        body = self._read_body()
+        with stub.in_flight() as over_capacity:
+            if self._inject(over_capacity):
+                return
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+            # Как httpbin.org/post: тело запроса возвращается обратно
+            self._send_json(200, {"url": self.path, "json": data, "data": body.decode("utf-8", "replace")})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # Очередь соединений по умолчанию (5) мала для замеров с десятками потоков
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubServer:
+    """
+    Локальная заглушка restcountries.com и dog.ceo для замеров без сети.
+    
+    Отвечает записанными данными (load_payloads) с настраиваемой задержкой
+    и долей ошибок. Работает в фоновом потоке; запросы к настоящим хостам
+    перенаправляются на нее через HttpClient.override_host (см. overrides).
+    
+    Args:
+        payloads: записанные ответы (по умолчанию - DEFAULT_PAYLOADS_PATH)
+        latency: задержка каждого ответа (секунды)
+        jitter: случайная добавка к задержке, равномерно из [0, jitter]
+        error_rate: доля запросов, на которые отвечать ошибкой (0..1)
+        error_status: статус ответа с ошибкой
+        seed: зерно генератора для воспроизводимых ошибок и задержек
+        host, port: адрес сервера (port=0 - любой свободный)
+        encodings: кодировки сжатия ответов в порядке предпочтения (по
+            умолчанию - server_encodings(); пустой кортеж - без сжатия)
+        rate_limit: запросов в секунду, сверх которых отвечать 429 с
+            Retry-After (None - без ограничения)
+        capacity: запросов, обрабатываемых одновременно, сверх которых
+            отвечать 503 (None - без ограничения)
+        etags: отдавать ли ETag в ответах GET и 304 на условные запросы
+            с If-None-Match
+    """
+    
+    def __init__(self, payloads=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 seed=None, host="127.0.0.1", port=0, encodings=None, rate_limit=None, capacity=None, etags=True):
+        payloads = payloads if payloads is not None else load_payloads()
+        self.countries = payloads["countries"]
+        self.breeds = payloads["breeds"]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.encodings = tuple(encodings) if encodings is not None else server_encodings()
+        self.capacity = capacity
+        self.etags = etags
+        self.rate_limit = rate_limit
+        self._bucket = None
+        if rate_limit:
+            from http_limiter import TokenBucket
+            
+            self._bucket = TokenBucket(rate_limit, max(1.0, rate_limit))
+        self.requests = 0
+        self.rejected = 0
+        self.not_modified = 0
+        self._in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._codes = {}
+        for country_data in self.countries:
+            for key in ("cca2", "cca3", "ccn3"):
+                if country_data.get(key):
+                    self._codes.setdefault(country_data[key].upper(), country_data)
+        self._httpd = _StubHTTPServer((host, port), StubHandler)
+        self._httpd.stub = self
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def overrides(self):
+        """
+        Подмена хостов для HttpClient(host_overrides=...) или HTTP_HOST_OVERRIDES.
+        """
+        return {host: self.url for host in STUB_HOSTS}
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+    
+    def join(self):
+        """
+        Ждет остановки сервера (для запуска из командной строки).
+        """
+        self._thread.join()
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+    
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+    
+    def admit(self):
+        """
+        Укладывается ли запрос в rate_limit (False - ответить 429).
+        """
+        if self._bucket is None:
+            return True
+        if self._bucket.reserve() > 0:
+            self._bucket.refund()
+            with self._lock:
+                self.rejected += 1
+            return False
+        return True
+    
+    @contextmanager
+    def in_flight(self):
+        """
+        Учитывает обрабатываемый запрос; значение - превышен ли capacity.
+        """
+        with self._lock:
+            self._in_flight += 1
+            over_capacity = self.capacity is not None and self._in_flight > self.capacity
+            if over_capacity:
+                self.rejected += 1
+        try:
+            yield over_capacity
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def next_fault(self):
+        """
+        Задержка и признак ошибки для очередного запроса.
+        
+        Returns:
+            tuple: (задержка в секундах, отвечать ли ошибкой)
+        """
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, fail
+    
+    def countries_response(self, path, query, fields):
+        """
+        Ответ REST Countries v3.1: /all, /name/{name}, /alpha/{code}, /alpha?codes=.
+        
+        Как и настоящий API, /all без fields= или с большим числом полей
+        отклоняется (400).
+        
+        Returns:
+            tuple: (статус, тело ответа)
+        """
+        not_found = (404, {"status": 404, "message": "Not Found"})
+        if path == "/all":
+            if not fields or len(fields) > MAX_ALL_FIELDS:
+                return 400, {"status": 400, "message": f"'fields' query not specified or more than {MAX_ALL_FIELDS}"}
+            return 200, [_project(country_data, fields) for country_data in self.countries]
+        if path.startswith("/name/"):
+            name = path[len("/name/"):].casefold()
+            found = [_project(country_data, fields) for country_data in self.countries
+                     if name in country_data["name"]["common"].casefold()
+                     or name in country_data["name"]["official"].casefold()]
+            return (200, found) if found else not_found
+        if path.startswith("/alpha/"):
+            country_data = self._codes.get(path[len("/alpha/"):].upper())
+            return (200, [_project(country_data, fields)]) if country_data else not_found
+        if path == "/alpha" and query.get("codes"):
+            codes = query["codes"][0].upper().split(",")
+            found = [_project(self._codes[code], fields) for code in dict.fromkeys(codes) if code in self._codes]
+            return (200, found) if found else not_found
+        return not_found
+    
+    def _images(self, breed, count):
+        with self._lock:
+            numbers = [self._random.randrange(10000, 99999) for _ in range(count)]
+        return [f"https://images.dog.ceo/breeds/{breed.replace('/', '-')}/n{number}.jpg" for number in numbers]
+    
+    def _random_breed(self):
+        with self._lock:
+            return self._random.choice(sorted(self.breeds)) if self.breeds else "hound"
+    
+    def dogs_response(self, path):
+        """
+        Ответ Dog API: /breeds/list/all, /breeds/image/random[/{n}],
+        /breed/{порода}[/{подпорода}]/images[/random[/{n}]].
+        
+        Returns:
+            tuple: (статус, тело ответа)
+        """
+        if path == "/breeds/list/all":
+            return 200, {"message": self.breeds, "status": "success"}
+        if path.startswith("/breeds/image/random"):
+            count = path[len("/breeds/image/random"):].strip("/")
+            if count and not count.isdigit():
+                return self._no_route()
+            if not count:
+                return 200, {"message": self._images(self._random_breed(), 1)[0], "status": "success"}
+            images = [self._images(self._random_breed(), 1)[0] for _ in range(min(int(count), MAX_DOG_IMAGES))]
+            return 200, {"message": images, "status": "success"}
+        if path.startswith("/breed/") and "/images" in path:
+            breed, _, rest = path[len("/breed/"):].partition("/images")
+            main_breed, _, sub_breed = breed.partition("/")
+            if main_breed not in self.breeds or (sub_breed and sub_breed not in self.breeds[main_breed]):
+                return 404, {"status": "error", "message": "Breed not found (main breed does not exist)", "code": 404}
+            count = rest[len("/random"):].strip("/") if rest.startswith("/random") else None
+            if count and not count.isdigit():
+                return self._no_route()
+            if count is None:
+                return 200, {"message": self._images(breed, 20), "status": "success"}
+            if not count:
+                return 200, {"message": self._images(breed, 1)[0], "status": "success"}
+            return 200, {"message": self._images(breed, min(int(count), MAX_DOG_IMAGES)), "status": "success"}
+        return self._no_route()
+    
+    @staticmethod
+    def _no_route():
+        return 404, {"status": "error", "message": "No route found", "code": 404}
+
+
+def main(argv=None):
+    """
+    Запуск заглушки API из командной строки или запись ответов API в файл.
+    """
+    parser = argparse.ArgumentParser(description="Локальная заглушка restcountries.com и dog.ceo")
+    parser.add_argument("--port", type=int, default=8766, help="порт (0 - любой свободный)")
+    parser.add_argument("--payloads", default=DEFAULT_PAYLOADS_PATH, help="файл с записанными ответами")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов с ошибкой (0..1)")
+    parser.add_argument("--error-status", type=int, default=503, help="статус ответов с ошибкой")
+    parser.add_argument("--seed", type=int, help="зерно генератора задержек и ошибок")
+    parser.add_argument("--rate-limit", type=float, help="запросов в секунду, сверх которых отвечать 429")
+    parser.add_argument("--capacity", type=int, help="одновременных запросов, сверх которых отвечать 503")
+    parser.add_argument("--encodings", help="кодировки сжатия через запятую (по умолчанию - все доступные)")
+    parser.add_argument("--no-compression", action="store_true", help="отдавать ответы без сжатия")
+    parser.add_argument("--no-etag", action="store_true", help="не отдавать ETag и не отвечать 304")
+    parser.add_argument("--record", metavar="FILE", help="записать настоящие ответы API в файл и выйти")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.record:
+            payloads = record_payloads(args.record)
+            print(f"Записано: {len(payloads['countries'])} стран, {len(payloads['breeds'])} пород -> {args.record}")
+            return
+        encodings = () if args.no_compression else None
+        if args.encodings and not args.no_compression:
+            encodings = tuple(encoding.strip().lower() for encoding in args.encodings.split(",") if encoding.strip())
+            unknown = set(encodings) - set(server_encodings())
+            if unknown:
+                raise ValueError(f"Недоступные кодировки: {', '.join(sorted(unknown))}")
+        server = StubServer(load_payloads(args.payloads), args.latency, args.jitter, args.error_rate,
+                            args.error_status, args.seed, port=args.port, encodings=encodings,
+                            rate_limit=args.rate_limit, capacity=args.capacity, etags=not args.no_etag)
+    except (OSError, ValueError) as e:
+        # requests.exceptions.RequestException - подкласс OSError
+        print(f"Ошибка: {e}")
+        return
+    
+    overrides = ",".join(f"{host}={url}" for host, url in server.overrides().items())
+    print(f"Заглушка API: {server.url} ({len(server.countries)} стран, {len(server.breeds)} пород, "
+          f"сжатие: {', '.join(server.encodings) or 'нет'})")
+    print(f"Для работы программ через заглушку: export HTTP_HOST_OVERRIDES={overrides}")
+    try:
+        server.start().join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from collections import deque
+
+import pytest
+
+from country_borders import BorderGraph
+
+# Часть Европы; граница FRA-ESP указана только у Франции, у Исландии и
+# Великобритании с Ирландией сухопутных соседей на континенте нет
+COUNTRIES = [
+    {"cca3": "PRT", "name": {"common": "Portugal"}, "borders": ["ESP"]},
+    {"cca3": "ESP", "name": {"common": "Spain"}, "borders": ["PRT", "AND"]},
+    {"cca3": "AND", "name": {"common": "Andorra"}, "borders": ["ESP", "FRA"]},
+    {"cca3": "FRA", "name": {"common": "France"}, "borders": ["AND", "ESP", "BEL", "DEU", "CHE"]},
+    {"cca3": "BEL", "name": {"common": "Belgium"}, "borders": ["FRA", "DEU", "NLD"]},
+    {"cca3": "NLD", "name": {"common": "Netherlands"}, "borders": ["BEL", "DEU"]},
+    {"cca3": "CHE", "name": {"common": "Switzerland"}, "borders": ["FRA", "DEU", "AUT"]},
+    {"cca3": "DEU", "name": {"common": "Germany"}, "borders": ["FRA", "BEL", "NLD", "CHE", "AUT", "POL"]},
+    {"cca3": "AUT", "name": {"common": "Austria"}, "borders": ["DEU", "CHE"]},
+    {"cca3": "POL", "name": {"common": "Poland"}, "borders": ["DEU"]},
+    {"cca3": "GBR", "name": {"common": "United Kingdom"}, "borders": ["IRL"]},
+    {"cca3": "IRL", "name": {"common": "Ireland"}, "borders": ["GBR"]},
+    {"cca3": "ISL", "name": {"common": "Iceland"}, "borders": []},
+]
+
+
+def build_graph():
+    return BorderGraph.from_countries(COUNTRIES)
+
+
+def bfs_distance(graph, source, target):
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        code = queue.popleft()
+        for neighbour in graph.adjacency[code]:
+            if neighbour not in distances:
+                distances[neighbour] = distances[code] + 1
+                queue.append(neighbour)
+    return distances.get(target)
+
+
+def test_borders_are_symmetric():
+    graph = build_graph()
+    assert "FRA" in graph.neighbours("ESP")
+    assert all(code in graph.adjacency[neighbour] for code in graph.adjacency for neighbour in graph.adjacency[code])
+
+
+def test_within_hops():
+    graph = build_graph()
+    assert graph.within_hops("prt", hops=2) == {"ESP": 1, "AND": 2, "FRA": 2}
+    assert graph.within_hops("ISL", hops=3) == {}
+
+
+def test_shortest_path_is_a_shortest_border_walk():
+    graph = build_graph()
+    codes = sorted(code for code in graph.adjacency if graph.component_of(code) is graph.component_of("DEU"))
+    for source in codes:
+        for target in codes:
+            path = graph.shortest_path(source, target)
+            assert path[0] == source and path[-1] == target
+            assert all(b in graph.adjacency[a] for a, b in zip(path, path[1:]))
+            assert len(path) - 1 == bfs_distance(graph, source, target)
+
+
+def test_shortest_path_between_components():
+    graph = build_graph()
+    assert graph.shortest_path("PRT", "IRL") is None
+    assert graph.shortest_path("ISL", "ISL") == ["ISL"]
+    assert graph.shortest_path("gbr", "irl") == ["GBR", "IRL"]
+
+
+def test_components_largest_first():
+    components = build_graph().components()
+    assert [len(component) for component in components] == [10, 2, 1]
+    assert components[1] == {"GBR", "IRL"}
+
+
+def test_unknown_country():
+    with pytest.raises(ValueError):
+        build_graph().shortest_path("PRT", "XXX")
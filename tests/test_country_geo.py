@@ -0,0 +1,108 @@
+import math
+import random
+
+import pytest
+
+from country_geo import (CountryGeoIndex, KDTree, chord_to_km, haversine_km, km_to_chord, unit_vector)
+
+# Центры и столицы по данным restcountries.com
+COUNTRIES = [
+    {"cca3": "NOR", "cca2": "NO", "name": {"common": "Norway", "official": "Kingdom of Norway"},
+     "latlng": [62.0, 10.0], "capital": ["Oslo"], "capitalInfo": {"latlng": [59.92, 10.75]}},
+    {"cca3": "SWE", "cca2": "SE", "name": {"common": "Sweden", "official": "Kingdom of Sweden"},
+     "latlng": [62.0, 15.0], "capital": ["Stockholm"], "capitalInfo": {"latlng": [59.33, 18.05]}},
+    {"cca3": "DEU", "cca2": "DE", "name": {"common": "Germany", "official": "Federal Republic of Germany"},
+     "latlng": [51.0, 9.0], "capital": ["Berlin"], "capitalInfo": {"latlng": [52.52, 13.4]}},
+    {"cca3": "JPN", "cca2": "JP", "name": {"common": "Japan", "official": "Japan"},
+     "latlng": [36.0, 138.0], "capital": ["Tokyo"], "capitalInfo": {"latlng": [35.68, 139.75]}},
+    {"cca3": "FJI", "cca2": "FJ", "name": {"common": "Fiji", "official": "Republic of Fiji"},
+     "latlng": [-18.0, 175.0], "capital": ["Suva"], "capitalInfo": {"latlng": [-18.13, 178.42]}},
+    {"cca3": "ATA", "name": {"common": "Antarctica"}, "latlng": [-90.0, 0.0]},
+]
+
+
+def random_points(count, seed):
+    rng = random.Random(seed)
+    return [(math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)) for _ in range(count)]
+
+
+def brute_force(vectors, vector):
+    return sorted((sum((a - b) ** 2 for a, b in zip(vector, other)), i) for i, other in enumerate(vectors))
+
+
+def test_chord_matches_haversine():
+    for (lat1, lng1), (lat2, lng2) in zip(random_points(50, 1), random_points(50, 2)):
+        chord = math.dist(unit_vector(lat1, lng1), unit_vector(lat2, lng2))
+        assert chord_to_km(chord) == pytest.approx(haversine_km(lat1, lng1, lat2, lng2), abs=1e-6)
+        assert km_to_chord(chord_to_km(chord)) == pytest.approx(chord)
+
+
+def test_unit_vector_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        unit_vector(91, 0)
+    with pytest.raises(ValueError):
+        unit_vector(0, -181)
+
+
+@pytest.mark.parametrize("k", [1, 3, 20])
+def test_kd_tree_nearest_matches_brute_force(k):
+    vectors = [unit_vector(lat, lng) for lat, lng in random_points(500, 3)]
+    tree = KDTree(vectors)
+    for lat, lng in random_points(30, 4):
+        query = unit_vector(lat, lng)
+        expected = brute_force(vectors, query)[:k]
+        found = tree.nearest(query, k)
+        assert [i for _, i in found] == [i for _, i in expected]
+        assert [distance for distance, _ in found] == pytest.approx([distance for distance, _ in expected])
+
+
+def test_kd_tree_within_matches_brute_force():
+    vectors = [unit_vector(lat, lng) for lat, lng in random_points(500, 5)]
+    tree = KDTree(vectors)
+    radius = km_to_chord(1500)
+    for lat, lng in random_points(30, 6):
+        query = unit_vector(lat, lng)
+        expected = [(distance, i) for distance, i in brute_force(vectors, query) if distance <= radius ** 2]
+        assert [i for _, i in tree.within(query, radius)] == [i for _, i in expected]
+
+
+def test_kd_tree_edge_cases():
+    assert KDTree([]).nearest(unit_vector(0, 0)) == []
+    assert KDTree([unit_vector(0, 0)]).nearest(unit_vector(10, 10), k=0) == []
+    assert len(KDTree([unit_vector(0, 0)]).nearest(unit_vector(10, 10), k=5)) == 1
+
+
+def test_nearest_crosses_antimeridian():
+    index = CountryGeoIndex.from_countries(COUNTRIES)
+    # Точка к востоку от 180-го меридиана ближе всего к Фиджи
+    assert index.nearest(-17.0, -179.0, k=1)[0].point.cca3 == "FJI"
+
+
+def test_within_radius():
+    index = CountryGeoIndex.from_countries(COUNTRIES)
+    results = index.within(59.92, 10.75, 600, kind="capital")
+    assert [result.point.capital for result in results] == ["Oslo", "Stockholm"]
+    assert results[0].distance_km == pytest.approx(0, abs=1e-3)
+    assert results[1].distance_km == pytest.approx(haversine_km(59.92, 10.75, 59.33, 18.05))
+
+
+def test_locate_uses_capitals():
+    index = CountryGeoIndex.from_countries(COUNTRIES)
+    # Рядом с Берлином центр Германии дальше, чем ее столица
+    located = index.locate(52.4, 13.1)
+    assert located.point.cca3 == "DEU" and located.point.capital == "Berlin"
+
+
+def test_neighbours_exclude_origin():
+    index = CountryGeoIndex.from_countries(COUNTRIES)
+    assert [result.point.cca3 for result in index.neighbours("nor", k=2)] == ["SWE", "DEU"]
+    with pytest.raises(ValueError):
+        index.neighbours("ATA", kind="capital")
+    with pytest.raises(ValueError):
+        index.nearest(0, 0, kind="city")
+
+
+def test_resolve_codes_and_names():
+    index = CountryGeoIndex.from_countries(COUNTRIES)
+    assert index.resolve("se") == "SWE"
+    assert index.resolve(" Federal Republic of Germany ") == "DEU"
@@ -0,0 +1,89 @@
+from country_search import (SCORE_EXACT, SCORE_FUZZY, SCORE_PREFIX, CountrySearchIndex, edit_distance,
+                            normalize, trigrams)
+
+COUNTRIES = [
+    {"cca3": "KOR", "cca2": "KR", "name": {"common": "South Korea", "official": "Republic of Korea"},
+     "altSpellings": ["Hanguk"]},
+    {"cca3": "PRK", "cca2": "KP", "name": {"common": "North Korea",
+                                           "official": "Democratic People's Republic of Korea"}},
+    {"cca3": "ALA", "cca2": "AX", "name": {"common": "Åland Islands", "official": "Åland Islands"}},
+    {"cca3": "NOR", "cca2": "NO", "name": {"common": "Norway", "official": "Kingdom of Norway",
+                                           "nativeName": {"nno": {"common": "Noreg", "official": "Kongeriket Noreg"}}},
+     "translations": {"rus": {"common": "Норвегия", "official": "Королевство Норвегия"}}},
+    {"cca3": "NIU", "cca2": "NU", "name": {"common": "Niue", "official": "Niue"}},
+    {"cca3": "MLI", "cca2": "ML", "name": {"common": "Mali", "official": "Republic of Mali"}},
+    {"cca3": "MLT", "cca2": "MT", "name": {"common": "Malta", "official": "Republic of Malta"}},
+]
+
+
+def build_index():
+    return CountrySearchIndex.from_countries(COUNTRIES)
+
+
+def test_normalize_strips_case_diacritics_and_spaces():
+    assert normalize("  Åland   ISLANDS ") == "aland islands"
+    assert normalize("Côte d'Ivoire") == "cote d'ivoire"
+
+
+def test_trigrams_are_padded():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_edit_distance():
+    assert edit_distance("norway", "norway") == 0
+    assert edit_distance("norwya", "norway") == 2
+    assert edit_distance("kitten", "sitting") == 3
+    # Досрочный выход возвращает max_distance + 1
+    assert edit_distance("mali", "madagascar", max_distance=2) == 3
+
+
+def test_exact_match_by_any_spelling():
+    index = build_index()
+    for query in ("Norway", "noreg", "NO", "Норвегия", "kingdom of norway"):
+        results = index.search(query)
+        assert results[0].cca3 == "NOR" and results[0].score == SCORE_EXACT, query
+
+
+def test_prefix_matches_word_starts():
+    index = build_index()
+    codes = {result.cca3 for result in index.prefix("korea")}
+    assert codes == {"KOR", "PRK"}
+    assert all(result.score == SCORE_PREFIX for result in index.prefix("korea"))
+    assert index.prefix("zzz") == []
+
+
+def test_prefix_returns_shorter_names_first():
+    # Обход trie в ширину: совпадения с меньшим остатком после префикса раньше
+    names = [result.name for result in build_index().prefix("mal")]
+    assert names[0] == "Mali"
+    assert names.index("Republic of Mali") < names.index("Malta")
+
+
+def test_fuzzy_finds_typos():
+    results = build_index().fuzzy("Norwey")
+    assert results[0].cca3 == "NOR"
+    assert results[0].score == SCORE_FUZZY + 1
+    assert build_index().fuzzy("Xyzzyq") == []
+
+
+def test_search_lists_each_country_once():
+    results = build_index().search("Korea", limit=5)
+    codes = [result.cca3 for result in results]
+    assert sorted(codes) == ["KOR", "PRK"]
+    assert len(codes) == len(set(codes))
+
+
+def test_resolve():
+    index = build_index()
+    assert index.resolve("aland") == "ALA"
+    assert index.resolve("Norwey") == "NOR"
+    # Обе Кореи подходят одинаково - ответа нет
+    assert index.resolve("korea") is None
+    assert index.resolve("") is None
+
+
+def test_first_country_wins_duplicate_spelling():
+    index = CountrySearchIndex()
+    index.add("Congo", "COG")
+    index.add("Congo", "COD")
+    assert index.search("congo")[0].cca3 == "COG"
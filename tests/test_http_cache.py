@@ -0,0 +1,170 @@
+import email.utils
+
+import pytest
+import requests
+
+from http_cache import CacheEntry, DiskCache, HttpCache, MAX_HEURISTIC_FRESHNESS, parse_cache_control
+from http_client import HttpClient
+from stub_server import StubServer
+
+URL = "https://restcountries.com/v3.1/alpha/NOR"
+NOW = 1_700_000_000.0
+
+
+def http_date(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def make_entry(headers, stored_at=NOW):
+    return CacheEntry(URL, 200, headers, b"{}", {}, stored_at)
+
+
+def make_request(headers=None):
+    return requests.Request("GET", URL, headers=headers).prepare()
+
+
+def make_response(request, status=200, headers=None, content=b'{"cca3": "NOR"}'):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response._content = content
+    response.url = request.url
+    response.request = request
+    return response
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('Max-Age=60, no-cache, private="Set-Cookie"') == {
+        "max-age": "60", "no-cache": True, "private": "Set-Cookie"}
+    assert parse_cache_control(None) == {}
+
+
+def test_max_age_wins_over_expires():
+    entry = make_entry({"Cache-Control": "max-age=60", "Date": http_date(NOW),
+                        "Expires": http_date(NOW + 3600)})
+    assert entry.freshness_lifetime() == 60
+    assert entry.is_fresh(now=NOW + 59)
+    assert not entry.is_fresh(now=NOW + 60)
+
+
+def test_age_header_counts_towards_current_age():
+    entry = make_entry({"Cache-Control": "max-age=60", "Age": "50"})
+    assert entry.current_age(now=NOW + 5) == 55
+    assert not entry.is_fresh(now=NOW + 10)
+
+
+def test_no_cache_and_invalid_max_age_are_stale():
+    assert make_entry({"Cache-Control": "max-age=60, no-cache"}).freshness_lifetime() == 0
+    assert make_entry({"Cache-Control": "max-age=soon"}).freshness_lifetime() == 0
+
+
+def test_expires_is_relative_to_date():
+    entry = make_entry({"Date": http_date(NOW - 100), "Expires": http_date(NOW + 200)})
+    assert entry.freshness_lifetime() == 300
+    assert make_entry({"Expires": "0"}).freshness_lifetime() == 0
+
+
+def test_heuristic_freshness_from_last_modified():
+    entry = make_entry({"Date": http_date(NOW), "Last-Modified": http_date(NOW - 1000)})
+    assert entry.freshness_lifetime() == 100
+    old = make_entry({"Date": http_date(NOW), "Last-Modified": http_date(NOW - 10 ** 8)})
+    assert old.freshness_lifetime() == MAX_HEURISTIC_FRESHNESS
+
+
+def test_make_entry_drops_connection_headers():
+    request = make_request()
+    response = make_response(request, headers={
+        "Cache-Control": "max-age=60", "CONTENT-ENCODING": "gzip", "Keep-Alive": "timeout=5",
+        "Connection": "keep-alive, X-Trace", "x-trace": "abc", "Content-Type": "application/json"})
+    entry = HttpCache._make_entry(request, response)
+    assert set(entry.headers) == {"Cache-Control", "Content-Type"}
+
+
+@pytest.mark.parametrize("status, headers", [
+    (200, {"Cache-Control": "no-store, max-age=60"}),
+    (200, {"Cache-Control": "max-age=60", "Vary": "*"}),
+    (500, {"Cache-Control": "max-age=60"}),
+    (200, {}),
+])
+def test_make_entry_rejects_uncacheable(status, headers):
+    request = make_request()
+    assert HttpCache._make_entry(request, make_response(request, status, headers)) is None
+
+
+def test_fresh_entry_is_served_without_network():
+    cache = HttpCache()
+    calls = []
+    
+    def send(request):
+        calls.append(request)
+        return make_response(request, headers={"Cache-Control": "max-age=600"})
+    
+    first = cache.send(make_request(), send)
+    second = cache.send(make_request(), send)
+    assert len(calls) == 1
+    assert not first.from_cache and second.from_cache
+    assert second.json() == {"cca3": "NOR"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_entry_is_revalidated():
+    cache = HttpCache()
+    sent = []
+    
+    def send(request):
+        sent.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return make_response(request, 304, {"ETag": '"v1"', "Cache-Control": "max-age=600"}, b"")
+        return make_response(request, headers={"ETag": '"v1"'})
+    
+    cache.send(make_request(), send)
+    revalidated = cache.send(make_request(), send)
+    assert revalidated.status_code == 200 and revalidated.from_cache
+    assert revalidated.content == b'{"cca3": "NOR"}'
+    # 304 продлил свежесть: третий запрос в сеть не идет
+    assert cache.send(make_request(), send).from_cache
+    assert len(sent) == 2
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_vary_mismatch_is_a_miss():
+    cache = HttpCache()
+    
+    def send(request):
+        return make_response(request, headers={"Cache-Control": "max-age=600", "Vary": "Accept-Language"})
+    
+    cache.send(make_request({"Accept-Language": "ru"}), send)
+    assert cache.send(make_request({"Accept-Language": "ru"}), send).from_cache
+    assert not cache.send(make_request({"Accept-Language": "en"}), send).from_cache
+
+
+def test_disk_cache_round_trip(tmp_path):
+    disk = DiskCache(str(tmp_path))
+    entry = CacheEntry(URL, 200, {"ETag": '"v1"', "Content-Type": "application/json"},
+                       b'\n{"name": "Norge"}\n', {"Accept-Encoding": "gzip"}, NOW)
+    disk.set(URL, entry)
+    loaded = DiskCache(str(tmp_path)).get(URL)
+    assert (loaded.url, loaded.status_code, loaded.headers, loaded.content, loaded.vary_values, loaded.stored_at) == (
+        entry.url, entry.status_code, entry.headers, entry.content, entry.vary_values, entry.stored_at)
+
+
+def test_disk_cache_discards_corrupt_files(tmp_path):
+    disk = DiskCache(str(tmp_path))
+    disk.set(URL, make_entry({"ETag": '"v1"'}))
+    with open(disk._path(URL), "wb") as f:
+        f.write(b"\x80\x04\x95 not json")
+    assert disk.get(URL) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_client_revalidates_against_stub():
+    with StubServer(encodings=()) as stub:
+        client = HttpClient(cache=HttpCache(), host_overrides=stub.overrides())
+        try:
+            first = client.get(URL)
+            second = client.get(URL)
+        finally:
+            client.close()
+    assert first.status_code == 200 and not first.from_cache
+    assert second.from_cache and second.json() == first.json()
+    assert stub.not_modified == 1
@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from http_client import SingleFlight
+
+WORKERS = 8
+
+# Сколько ждать, пока остальные потоки присоединятся к идущему вызову
+JOIN_WAIT = 0.1
+
+
+def run_shared(flight, key, func, started, release):
+    """
+    Запускает WORKERS одинаковых вызовов: первый ведущий, остальные
+    присоединяются к нему, пока он ждет release.
+    
+    Returns:
+        list: Future вызовов, ведущий первым
+    """
+    with ThreadPoolExecutor(WORKERS) as pool:
+        futures = [pool.submit(flight.do, key, func)]
+        assert started.wait(5)
+        futures += [pool.submit(flight.do, key, func) for _ in range(WORKERS - 1)]
+        time.sleep(JOIN_WAIT)
+        release.set()
+    return futures
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "NOR"
+    
+    results = [future.result() for future in run_shared(flight, "NOR", fetch, started, release)]
+    assert len(calls) == 1
+    assert results[0] == ("NOR", False)
+    assert results[1:] == [("NOR", True)] * (WORKERS - 1)
+    assert flight.in_flight() == 0
+
+
+def test_error_is_shared_and_key_is_freed():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def fail():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise ValueError("нет ответа")
+    
+    for future in run_shared(flight, "DEU", fail, started, release):
+        with pytest.raises(ValueError):
+            future.result()
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+    assert flight.do("DEU", lambda: "ok") == ("ok", False)
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("NOR", lambda: 1) == (1, False)
+    assert flight.do("DEU", lambda: 2) == (2, False)
@@ -0,0 +1,167 @@
+import time
+
+import pytest
+import requests
+
+from http_limiter import AdaptiveConcurrency, HostLimiter, HostLimiters, RateLimitTimeout, TokenBucket
+
+URL = "https://restcountries.com/v3.1/alpha/NOR"
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    return response
+
+
+def fill(concurrency):
+    """
+    Занимает все места предела; возвращает время отправки.
+    """
+    started = time.monotonic()
+    for _ in range(int(concurrency.limit)):
+        assert concurrency.acquire(timeout=0)
+    return started
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0] * 3
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    bucket.refund()
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=100, burst=5)
+    bucket.pause(2.0)
+    assert bucket.reserve() == pytest.approx(2.01, abs=0.02)
+
+
+def test_concurrency_limit_blocks():
+    concurrency = AdaptiveConcurrency(initial=2)
+    fill(concurrency)
+    assert not concurrency.acquire(timeout=0.01)
+    concurrency.cancel()
+    assert concurrency.acquire(timeout=0)
+
+
+def test_slow_start_then_additive_increase():
+    concurrency = AdaptiveConcurrency(initial=2, maximum=10)
+    started = fill(concurrency)
+    assert concurrency.release(started, latency=0.01) == "increase"
+    assert concurrency.limit == 3
+    concurrency.release(started, latency=0.01, overloaded=True)
+    limit = concurrency.limit
+    started = fill(concurrency)
+    concurrency.release(started, latency=0.01)
+    assert concurrency.limit == pytest.approx(limit + 1 / limit)
+
+
+def test_increase_only_when_saturated():
+    concurrency = AdaptiveConcurrency(initial=4)
+    assert concurrency.acquire(timeout=0)
+    assert concurrency.release(time.monotonic(), latency=0.01) is None
+    assert concurrency.limit == 4
+
+
+def test_overload_decreases_once_per_wave():
+    concurrency = AdaptiveConcurrency(initial=8, minimum=2, backoff=0.5)
+    started = fill(concurrency)
+    assert concurrency.release(started, overloaded=True) == "decrease"
+    assert concurrency.limit == 4
+    # Ответы на запросы той же волны предел больше не уменьшают
+    assert concurrency.release(started, overloaded=True) is None
+    assert concurrency.limit == 4
+    for _ in range(6):
+        concurrency.cancel()
+    for _ in range(3):
+        assert concurrency.acquire(timeout=0)
+        concurrency.release(time.monotonic(), overloaded=True)
+    assert concurrency.limit == 2
+
+
+def test_latency_growth_decreases_to_initial_only():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=32, latency_backoff=0.5)
+    for _ in range(20):
+        started = fill(concurrency)
+        concurrency.release(started, latency=0.01)
+        while concurrency.in_flight:
+            concurrency.cancel()
+    grown = concurrency.limit
+    assert grown > 4
+    for _ in range(50):
+        assert concurrency.acquire(timeout=0)
+        concurrency.release(time.monotonic(), latency=1.0)
+    assert 4 <= concurrency.limit < grown
+
+
+def test_permit_release_frees_slot():
+    limiter = HostLimiter(concurrency=1)
+    permit = limiter.acquire(sleep=pytest.fail)
+    assert limiter.snapshot()["in_flight"] == 1
+    permit.release(make_response(200))
+    permit.release(make_response(200))
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_interrupted_wait_returns_slot_and_token():
+    limiter = HostLimiter(rate=1, burst=1, concurrency=2)
+    limiter.acquire(sleep=pytest.fail).release(make_response(200))
+    
+    def interrupt(delay):
+        raise KeyboardInterrupt
+    
+    tokens = limiter.bucket.tokens
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire(sleep=interrupt)
+    assert limiter.snapshot()["in_flight"] == 0
+    assert limiter.bucket.tokens == pytest.approx(tokens, abs=0.01)
+
+
+def test_rate_wait_over_max_wait_times_out():
+    limiter = HostLimiter(rate=1, burst=1, max_wait=0.5)
+    limiter.acquire(sleep=pytest.fail).release(make_response(200))
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(sleep=pytest.fail)
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_concurrency_wait_over_max_wait_times_out():
+    limiter = HostLimiter(concurrency=1, max_wait=0.01)
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire()
+
+
+def test_too_many_requests_enables_rate_limit():
+    limiter = HostLimiter(min_rate=2)
+    assert limiter.snapshot()["rate"] is None
+    limiter.acquire().release(make_response(429, {"Retry-After": "1"}))
+    snapshot = limiter.snapshot()
+    assert snapshot["rate"] >= 2
+    assert snapshot["overloaded"] == 1
+    # Retry-After приостанавливает выдачу токенов, затем токен ждет по частоте
+    delays = []
+    limiter.acquire(sleep=delays.append).release(make_response(200))
+    assert 0.9 <= delays[0] <= 1.0 + 1 / snapshot["rate"]
+
+
+def test_server_errors_reduce_concurrency_not_rate():
+    limiter = HostLimiter(concurrency=8, backoff=0.5)
+    limiter.acquire().release(make_response(503))
+    snapshot = limiter.snapshot()
+    assert snapshot["concurrency"] == 4
+    assert snapshot["rate"] is None
+
+
+def test_host_limits_override_defaults():
+    limiters = HostLimiters({"Restcountries.com": {"concurrency": 2}}, concurrency=6)
+    limiters.acquire(URL).release(make_response(200))
+    limiters.acquire("https://dog.ceo/api/breeds/image/random").release(make_response(200))
+    limits = limiters.limits()
+    assert limits["restcountries.com"]["concurrency"] == 2
+    assert limits["dog.ceo"]["concurrency"] == 6
+    assert limiters.for_url(URL) is limiters.for_url(URL.upper().replace("HTTPS", "https"))
@@ -0,0 +1,159 @@
+import pytest
+import requests
+
+from http_retry import (STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, CircuitBreakers,
+                        CircuitOpenError, RetryPolicy, send_with_retry)
+
+URL = "https://restcountries.com/v3.1/alpha/NOR"
+
+
+def make_request(method="GET", data=None):
+    return requests.Request(method, URL, data=data).prepare()
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response._content = b""
+    response._content_consumed = True
+    return response
+
+
+class FakeSend:
+    """
+    Отдает заранее заданные исходы по очереди: статус ответа или исключение.
+    """
+    
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+    
+    def __call__(self, request):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return make_response(*outcome)
+        return make_response(outcome)
+
+
+def test_backoff_is_full_jitter_with_cap():
+    policy = RetryPolicy(backoff_base=0.5, max_backoff=2.0)
+    for attempt in range(6):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= min(2.0, 0.5 * 2 ** attempt)
+
+
+def test_retry_after_seconds_and_date():
+    assert RetryPolicy.retry_after(make_response(429, {"Retry-After": "7"})) == 7.0
+    assert RetryPolicy.retry_after(make_response(429, {"Retry-After": "Thu, 01 Jan 1970 00:00:00 GMT"})) == 0.0
+    assert RetryPolicy.retry_after(make_response(429)) is None
+
+
+def test_retries_statuses_until_success():
+    send = FakeSend(503, 502, 200)
+    sleeps = []
+    response = send_with_retry(make_request(), send, RetryPolicy(retries=3), sleep=sleeps.append)
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert send.calls == 3 and len(sleeps) == 2
+
+
+def test_returns_last_response_when_retries_run_out():
+    send = FakeSend(503, 503, 503)
+    response = send_with_retry(make_request(), send, RetryPolicy(retries=2), sleep=lambda _: None)
+    assert response.status_code == 503 and response.retries == 2
+
+
+def test_retries_connection_errors_then_raises():
+    send = FakeSend(requests.exceptions.ConnectionError(), requests.exceptions.Timeout())
+    with pytest.raises(requests.exceptions.Timeout):
+        send_with_retry(make_request(), send, RetryPolicy(retries=1), sleep=lambda _: None)
+    assert send.calls == 2
+
+
+def test_waits_for_retry_after():
+    send = FakeSend((429, {"Retry-After": "3"}), 200)
+    sleeps = []
+    send_with_retry(make_request(), send, RetryPolicy(retries=1, max_backoff=0.1), sleep=sleeps.append)
+    assert sleeps == [3.0]
+
+
+def test_gives_up_when_retry_after_is_too_long():
+    send = FakeSend((503, {"Retry-After": "120"}), 200)
+    response = send_with_retry(make_request(), send, RetryPolicy(retries=3, max_retry_after=30),
+                               sleep=pytest.fail)
+    assert response.status_code == 503 and response.retries == 0
+
+
+def test_post_is_not_retried():
+    send = FakeSend(503, 200)
+    response = send_with_retry(make_request("POST", b"{}"), send, RetryPolicy(retries=3), sleep=pytest.fail)
+    assert response.status_code == 503 and send.calls == 1
+
+
+def test_streamed_body_is_not_retried():
+    send = FakeSend(503, 200)
+    request = make_request("PUT", iter([b"chunk"]))
+    response = send_with_retry(request, send, RetryPolicy(retries=3), sleep=pytest.fail)
+    assert response.status_code == 503 and send.calls == 1
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert 0 < breaker.retry_in() <= 60
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED and breaker.allow()
+
+
+def test_open_breaker_rejects_without_sending():
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=60)
+    send = FakeSend(500, 500)
+    send_with_retry(make_request(), send, RetryPolicy(retries=1), breakers, sleep=lambda _: None)
+    with pytest.raises(CircuitOpenError):
+        send_with_retry(make_request(), send, RetryPolicy(retries=1), breakers, sleep=lambda _: None)
+    assert send.calls == 2
+    assert breakers.states() == {"restcountries.com": STATE_OPEN}
+
+
+def test_client_errors_do_not_open_breaker():
+    breakers = CircuitBreakers(failure_threshold=1)
+    send_with_retry(make_request(), FakeSend(404), breakers=breakers)
+    assert breakers.states() == {"restcountries.com": STATE_CLOSED}
+
+
+def test_interrupted_trial_is_released():
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0)
+    breaker = breakers.for_url(URL)
+    breaker.record_failure()
+    with pytest.raises(KeyboardInterrupt):
+        send_with_retry(make_request(), FakeSend(KeyboardInterrupt()), breakers=breakers)
+    # Пробная попытка освобождена: следующий запрос может ее занять
+    assert breaker.allow()
@@ -0,0 +1,100 @@
+import json
+
+import requests
+
+from http_client import HttpClient
+from http_watch import WatchEntry, country_url, diff_fields, flatten, poll, _value_hash
+from stub_server import StubServer
+
+URL = "https://restcountries.com/v3.1/alpha/NOR"
+
+DOCUMENT = {"name": {"common": "Norway"}, "borders": ["FIN", "SWE"], "tags": [], "area": 323802}
+
+
+def fields(document, max_depth=4):
+    return [(path, value, _value_hash(value)) for path, value in flatten(document, max_depth)]
+
+
+def hashes(document):
+    return {path: value_hash for path, _, value_hash in fields(document)}
+
+
+class FakeClient:
+    """
+    Отдает заранее заданные ответы по очереди и запоминает заголовки запросов.
+    """
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.headers = []
+    
+    def get(self, url, headers=None, timeout=None):
+        self.headers.append(headers)
+        status, body, response_headers = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(response_headers)
+        response._content = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        return response
+
+
+def test_flatten_paths():
+    assert list(flatten(DOCUMENT)) == [
+        ("name.common", "Norway"), ("borders[0]", "FIN"), ("borders[1]", "SWE"), ("tags", []), ("area", 323802)]
+    assert list(flatten([{"cca3": "NOR"}])) == [("[0].cca3", "NOR")]
+    assert list(flatten(5)) == [("$", 5)]
+
+
+def test_flatten_stops_at_max_depth():
+    assert list(flatten(DOCUMENT, max_depth=1)) == [
+        ("name", {"common": "Norway"}), ("borders", ["FIN", "SWE"]), ("tags", []), ("area", 323802)]
+
+
+def test_diff_fields():
+    new = dict(DOCUMENT, borders=["FIN", "RUS", "SWE"], area=385207)
+    del new["tags"]
+    diff = diff_fields(hashes(DOCUMENT), fields(new))
+    assert diff == {"added": {"borders[2]": "SWE"}, "changed": {"borders[1]": "RUS", "area": 385207},
+                    "removed": ["tags"]}
+    assert diff_fields(hashes(DOCUMENT), fields(DOCUMENT)) == {"added": {}, "changed": {}, "removed": []}
+
+
+def test_poll_sequence():
+    changed = dict(DOCUMENT, area=385207)
+    client = FakeClient((200, DOCUMENT, {"ETag": '"v1"'}), (304, b"", {}), (200, DOCUMENT, {"ETag": '"v1"'}),
+                        (200, changed, {"ETag": '"v2"'}), (500, b"", {}), (200, b"<html>", {}))
+    entry = WatchEntry(URL)
+    results = [poll(entry, client) for _ in range(6)]
+    assert [event["result"] for event in results] == [
+        "initial", "not_modified", "unchanged", "changed", "error", "changed"]
+    assert client.headers[1]["If-None-Match"] == '"v1"'
+    assert results[3]["diff"] == {"added": {}, "changed": {"area": 385207}, "removed": []}
+    assert results[5]["bytes"] == 6 and entry.fields is None
+    assert (entry.polls, entry.changes, entry.errors) == (6, 2, 1)
+
+
+def test_state_round_trip():
+    entry = WatchEntry(URL)
+    poll(entry, FakeClient((200, DOCUMENT, {"ETag": '"v1"'})))
+    restored = WatchEntry(URL)
+    restored.restore(json.loads(json.dumps(entry.as_dict())))
+    assert poll(restored, FakeClient((200, DOCUMENT, {"ETag": '"v1"'})))["result"] == "unchanged"
+
+
+def test_poll_against_stub():
+    with StubServer() as stub:
+        client = HttpClient(host_overrides=stub.overrides())
+        try:
+            entry = WatchEntry(URL)
+            results = [poll(entry, client)["result"] for _ in range(2)]
+        finally:
+            client.close()
+    assert results == ["initial", "not_modified"]
+    assert stub.not_modified == 1
+
+
+def test_country_url_quotes_names(monkeypatch):
+    monkeypatch.setattr("country_search.resolve_country_code", lambda country: None)
+    assert country_url(" Côte d'Ivoire/x ").split("?")[0].endswith("/name/C%C3%B4te%20d%27Ivoire%2Fx")
+    monkeypatch.setattr("country_search.resolve_country_code", lambda country: "NOR")
+    assert "/alpha/NOR?fields=" in country_url("Norway")
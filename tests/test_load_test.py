@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from load_test import LatencyHistogram
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+    assert histogram.mean() == 0.0
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for microseconds in range(1, 101):
+        histogram.record(microseconds / 1_000_000)
+    assert histogram.percentile(50) == pytest.approx(50e-6)
+    assert histogram.percentile(100) == pytest.approx(100e-6)
+    assert histogram.min == 1 and histogram.max == 100
+
+
+@pytest.mark.parametrize("percent", [50, 90, 99, 99.9])
+def test_percentile_relative_error_is_bounded(percent):
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(-4, 1.5) for _ in range(20_000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    exact = values[max(1, int(round(len(values) * percent / 100))) - 1]
+    # Верхняя граница корзины: не меньше точного значения и не больше на 1/2^(bits-1)
+    error = 1 / 2 ** (histogram.sub_bucket_bits - 1)
+    assert exact - 1e-6 <= histogram.percentile(percent) <= exact * (1 + error) + 1e-6
+
+
+def test_memory_does_not_grow_with_records():
+    histogram = LatencyHistogram()
+    for _ in range(10_000):
+        histogram.record(0.25)
+    assert len(histogram.counts) == 1
+    assert histogram.total == 10_000
+
+
+def test_merge_matches_single_histogram():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 2) for _ in range(1000)]
+    whole, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i, value in enumerate(values):
+        whole.record(value)
+        (left if i % 2 else right).record(value)
+    left.merge(right)
+    assert left.counts == whole.counts
+    assert (left.total, left.min, left.max, left.sum) == (whole.total, whole.min, whole.max, whole.sum)
+    assert left.percentile(99) == whole.percentile(99)